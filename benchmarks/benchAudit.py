@@ -0,0 +1,72 @@
+"""
+This script compares the vault audit with checking the entries one by one like evaluatePassword does.
+The Pwned Passwords API is replaced by a stand-in that waits LATENCY seconds per request, so no requests are sent.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchAudit.py
+"""
+import time
+from unittest import mock
+
+import checkPwned
+import vaultAudit
+from checkPassword import checkPassword, checkDuplicate
+from checkPwned import hashPassword
+from entry import entry
+
+SIZES = [1000, 10000]
+# The per-entry loop waits for every request in turn, it is only run on a sample and extrapolated
+SAMPLE = 100
+LATENCY = 0.05
+ROUNDS = 1
+
+def makeEntries(count: int) -> list:
+    """
+    Create entries with distinct passwords, every tenth one shares the password of the one before
+    """
+    return [entry(f"site{idx}.example.com", f"Password{idx - idx % 10 // 9}!x", f"user{idx}@mail.de",
+                  [float(1700000000 + idx)], "", [""]) for idx in range(count)]
+
+def fakeRange(prefix: str) -> dict:
+    """
+    Answer like the API after LATENCY seconds, the range holds no hash of the vault
+    """
+    time.sleep(LATENCY)
+    return {prefix * 7: 1}
+
+def checkOneByOne(userEntries: list) -> None:
+    """
+    Check the strength, reuse and breaches of each entry separately
+    """
+    for position, userEntry in enumerate(userEntries):
+        checkPassword(userEntry.password)
+        checkDuplicate(userEntry.password, userEntries[:position] + userEntries[position + 1:])
+        passwordHash = hashPassword(userEntry.password)
+        fakeRange(passwordHash[:5]).get(passwordHash[5:], 0)
+
+def measure(function: object, *args: object) -> float:
+    """
+    Return the best time of ROUNDS runs in milliseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(*args) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    """
+    Print the time of the audit and the extrapolated time of the per-entry loop
+    """
+    print(f"{'entries':>8} {'one by one ms':>14} {'audit ms':>10} {'requests':>9}")
+    with mock.patch.object(checkPwned, "fetchRange", side_effect=fakeRange) as fetch:
+        for size in SIZES:
+            userEntries = makeEntries(size)
+            oneByOne = measure(checkOneByOne, userEntries[:SAMPLE]) * size / SAMPLE
+            fetch.reset_mock()
+            audit = measure(vaultAudit.auditVault, userEntries)
+            print(f"{size:>8} {oneByOne:>14.0f} {audit:>10.0f} {fetch.call_count // ROUNDS:>9}")
+
+if __name__ == "__main__":
+    main()
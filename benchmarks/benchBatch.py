@@ -0,0 +1,106 @@
+"""
+This script compares checking passwords one by one with a fresh connection per request, one by one over the pooled
+session, with checkPawnedBatch and with checkPawnedBatchAsync. The API is replaced by a local HTTP server that answers after LATENCY seconds,
+so no requests are sent. On localhost there is no TLS, the real API also saves a handshake per reused connection.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchBatch.py
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+import checkPwned
+from checkPwned import checkPawned, checkPawnedBatch, hashPassword
+from checkPwnedAsync import checkPawnedBatchAsync, rangeClient
+
+SIZES = [100, 1000]
+LATENCY = 0.005
+ROUNDS = 1
+
+class slowHandler(BaseHTTPRequestHandler):
+    """
+    Answers every range after LATENCY seconds with one hash, keeping the connection open
+    """
+    protocol_version = "HTTP/1.1" #pylint: disable=C0103
+    disable_nagle_algorithm = True #pylint: disable=C0103
+
+    def do_GET(self) -> None: #pylint: disable=C0103
+        """
+        Answers a range request
+        """
+        time.sleep(LATENCY)
+        body = f"{'0' * 35}:1".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None: #pylint: disable=W0622
+        pass
+
+class slowServer(ThreadingHTTPServer):
+    """
+    A server that accepts all connections of a batch at once, the default backlog of 5 makes clients retry after a second
+    """
+    request_queue_size = 128 #pylint: disable=C0103
+
+def checkFreshConnections(passwords: list) -> None:
+    """
+    Check the passwords like checkPawned did before the session, with a new connection for every request
+    """
+    for password in passwords:
+        passwordHash = hashPassword(password)
+        requests.get(checkPwned.API_URL + passwordHash[:5], timeout=3)
+
+def checkOneByOne(passwords: list) -> None:
+    """
+    Check the passwords with checkPawned
+    """
+    for password in passwords:
+        checkPawned(password)
+
+def checkAsync(passwords: list, url: str) -> None:
+    """
+    Check the passwords with checkPawnedBatchAsync in a new event loop
+    """
+    async def run() -> None:
+        async with rangeClient(url) as client:
+            await checkPawnedBatchAsync(passwords, client=client)
+    asyncio.run(run())
+
+def measure(function: object, *args: object) -> float:
+    """
+    Return the best time of ROUNDS runs in milliseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(*args) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    """
+    Print the time of each way to check the passwords
+    """
+    server = slowServer(("127.0.0.1", 0), slowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/range/"
+    print(f"{'passwords':>9} {'fresh ms':>9} {'session ms':>11} {'batch ms':>9} {'async ms':>9}")
+    with mock.patch.object(checkPwned, "API_URL", url), mock.patch.object(checkPwned, "SOURCE", checkPwned.ONLINE):
+        for size in SIZES:
+            passwords = [f"Password{idx}!x" for idx in range(size)]
+            fresh = measure(checkFreshConnections, passwords)
+            session = measure(checkOneByOne, passwords)
+            batch = measure(checkPawnedBatch, passwords)
+            asynchronous = measure(checkAsync, passwords, url)
+            print(f"{size:>9} {fresh:>9.0f} {session:>11.0f} {batch:>9.0f} {asynchronous:>9.0f}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+This script compares the size of the vault file and the time to write and read it with and without compression.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchCompression.py
+"""
+import os
+import tempfile
+import time
+
+from entry import entry
+from vaultFormat import COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_LZMA, getVaultPath, readVault, writeVault
+
+SIZES = [100, 1000, 10000]
+SETTINGS = [("none", COMPRESSION_NONE, 0), ("zlib 1", COMPRESSION_ZLIB, 1), ("zlib 6", COMPRESSION_ZLIB, 6),
+            ("zlib 9", COMPRESSION_ZLIB, 9), ("lzma 0", COMPRESSION_LZMA, 0), ("lzma 6", COMPRESSION_LZMA, 6)]
+ROUNDS = 3
+KEY = bytes(range(32))
+SALT = bytes(16)
+USER = "bench_user"
+
+def makeEntries(count: int) -> list:
+    """
+    Create entries with notes and a password history like a vault that has been used for a while
+    """
+    return [entry(f"site{idx}.example.com", f"Password{idx}!x", f"user{idx}@mail.de",
+                  [float(1700000000 + idx + step) for step in range(8)],
+                  f"Recovery codes for site{idx}: " + " ".join(f"{idx:04d}-{code:04d}" for code in range(12)),
+                  [f"OldPassword{idx}{step}!" for step in range(8)]) for idx in range(count)]
+
+def measure(function: object, *args: object) -> float:
+    """
+    Return the best time of ROUNDS runs in milliseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(*args) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    """
+    Print the file size and the write and read times of every setting for every vault size
+    """
+    workingDirectory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.mkdir("resources")
+        try:
+            print(f"{'entries':>8} {'setting':>8} {'bytes':>10} {'ratio':>6} {'write ms':>9} {'read ms':>8}")
+            for size in SIZES:
+                userEntries = makeEntries(size)
+                uncompressedSize = 0
+                for name, compression, level in SETTINGS:
+                    writeTime = measure(writeVault, USER, KEY, SALT, userEntries, 1, 0, compression, level)
+                    fileSize = os.path.getsize(getVaultPath(USER))
+                    uncompressedSize = uncompressedSize or fileSize
+                    readTime = measure(readVault, USER, KEY)
+                    print(f"{size:>8} {name:>8} {fileSize:>10} {fileSize / uncompressedSize:>6.2f} {writeTime:>9.1f} {readTime:>8.1f}")
+        finally:
+            os.chdir(workingDirectory)
+
+if __name__ == "__main__":
+    main()
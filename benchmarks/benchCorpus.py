@@ -0,0 +1,73 @@
+"""
+This script measures the offline breach check: converting a hash file, and looking up hashes in the mapped corpus
+compared with a dict of all hashes in memory.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchCorpus.py
+"""
+import hashlib
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from pwnedCorpus import convertCorpus, hashCorpus
+
+SIZES = [100000, 1000000]
+LOOKUPS = 100000
+ROUNDS = 3
+
+def writeHashes(path: str, count: int) -> list:
+    """
+    Write count random hashes in the text format of the downloader and return them
+    """
+    hashes = [hashlib.sha1(idx.to_bytes(8, "big")).hexdigest().upper() for idx in range(count)]
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(f"{passwordHash}:{idx % 1000 + 1}\r\n" for idx, passwordHash in enumerate(hashes))
+    return hashes
+
+def measure(function: object, queries: list) -> float:
+    """
+    Return the best time of ROUNDS runs per lookup in microseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for query in queries:
+            function(query) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+def main() -> None:
+    """
+    Print the conversion time, the lookup times and the memory of both ways to look up hashes
+    """
+    print(f"{'hashes':>8} {'convert s':>10} {'file MB':>8} {'mmap us':>8} {'dict us':>8} {'mmap KB':>8} {'dict MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            source = os.path.join(directory, "hashes.txt")
+            target = os.path.join(directory, "corpus.bin")
+            hashes = writeHashes(source, size)
+            start = time.perf_counter()
+            convertCorpus(source, target)
+            convert = time.perf_counter() - start
+            # Half of the lookups are breached
+            queries = random.sample(hashes, LOOKUPS // 2) + [hashlib.sha1(str(idx).encode()).hexdigest().upper()
+                                                             for idx in range(LOOKUPS // 2)]
+            tracemalloc.start()
+            corpus = hashCorpus(target)
+            mapped = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            tracemalloc.start()
+            counts = {passwordHash: idx % 1000 + 1 for idx, passwordHash in enumerate(hashes)}
+            inMemory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            mmapLookup = measure(corpus.count, queries)
+            dictLookup = measure(lambda query, counts=counts: counts.get(query, 0), queries)
+            print(f"{size:>8} {convert:>10.1f} {os.path.getsize(target) / 2**20:>8.1f} {mmapLookup:>8.2f} "
+                  f"{dictLookup:>8.2f} {mapped / 1024:>8.1f} {inMemory / 2**20:>8.1f}")
+            corpus.close()
+
+if __name__ == "__main__":
+    main()
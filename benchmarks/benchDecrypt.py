@@ -0,0 +1,65 @@
+"""
+This script compares the peak memory and the time of decrypting a buffer by concatenation and into a reused buffer.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchDecrypt.py
+"""
+import os
+import time
+import tracemalloc
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives import padding
+from cryptographyManager import decryptInto, encryptBytes, wipeBuffer
+
+SIZES = [1 << 16, 1 << 20, 1 << 24]
+ROUNDS = 5
+KEY = bytes(range(32))
+
+def decryptConcatenated(encryptedContent: bytes, _: bytearray) -> bytes:
+    """
+    Decrypt the way decryptContent did before, every step allocates a new copy of the plaintext
+    """
+    cipher = Cipher(algorithms.AES(KEY), modes.CBC(encryptedContent[:16]))
+    decryptor = cipher.decryptor()
+    decryptedData = decryptor.update(encryptedContent[16:])
+    decryptedData += decryptor.finalize()
+    unpadder = padding.PKCS7(128).unpadder()
+    return unpadder.update(decryptedData) + unpadder.finalize()
+
+def decryptReused(encryptedContent: bytes, buffer: bytearray) -> None:
+    """
+    Decrypt into the preallocated buffer and wipe it afterwards
+    """
+    decryptInto(encryptedContent, KEY, buffer).release()
+    wipeBuffer(buffer)
+
+def measure(function: object, encryptedContent: bytes, buffer: bytearray) -> tuple:
+    """
+    Return the best time in milliseconds and the peak of memory allocated during one run in KiB
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(encryptedContent, buffer) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(encryptedContent, buffer) # type: ignore[operator]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+def main() -> None:
+    """
+    Print the time and the peak memory of both ways for every size
+    """
+    print(f"{'bytes':>10} {'method':>13} {'ms':>8} {'peak KiB':>10}")
+    for size in SIZES:
+        encryptedContent = encryptBytes(os.urandom(size), KEY)
+        buffer = bytearray(len(encryptedContent))
+        for name, function in (("concatenated", decryptConcatenated), ("reused", decryptReused)):
+            elapsed, peak = measure(function, encryptedContent, buffer)
+            print(f"{size:>10} {name:>13} {elapsed:>8.2f} {peak:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+This script measures the memory of large vaults with the slotted entry class and with the class it replaced,
+which kept its fields in a __dict__ and the timestamps in a list.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchEntryMemory.py
+"""
+import gc
+import time
+import tracemalloc
+
+from entry import entry
+
+SIZES = [10000, 100000]
+# Most users have a few usernames that they use on many websites
+USERNAMES = 20
+TIMESTAMPS = 3
+OLD_PASSWORDS = 2
+
+class legacyEntry:
+    """
+    The fields of the entry class before it used slots
+    """
+    #pylint: disable=R0903
+    def __init__(self, website: str, password: str, username: str, timestamps: list, notes: str, oldPasswords: list) -> None:
+        self.website = website
+        self.password = password
+        self.username = username
+        self.notes = notes
+        self.oldPasswords = oldPasswords
+        self.timestamps = timestamps
+
+def makeEntries(entryClass: type, count: int) -> list:
+    """
+    Create entries like a decoded vault, every string is a new object as if it was read from disk
+    """
+    return [entryClass(f"site{idx}.example.com", f"Password{idx}!x", f"user{idx % USERNAMES}@mail.de",
+                       [float(1700000000 + idx + step) for step in range(TIMESTAMPS)], "",
+                       [f"Old{idx}-{step}" for step in range(OLD_PASSWORDS)]) for idx in range(count)]
+
+def measure(entryClass: type, count: int) -> tuple:
+    """
+    Return the bytes per entry that stay allocated and the time to create the entries in milliseconds
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    userEntries = makeEntries(entryClass, count)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del userEntries
+    return size / count, elapsed * 1000
+
+def main() -> None:
+    """
+    Print the bytes per entry and creation time of both classes
+    """
+    print(f"{'entries':>8} {'class':>8} {'bytes/entry':>12} {'create ms':>10}")
+    for size in SIZES:
+        for name, entryClass in (("legacy", legacyEntry), ("slotted", entry)):
+            perEntry, elapsed = measure(entryClass, size)
+            print(f"{size:>8} {name:>8} {perEntry:>12.0f} {elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
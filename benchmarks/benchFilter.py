@@ -0,0 +1,80 @@
+"""
+This script measures the breach filter in front of the exact lookups: the time per check with the corpus alone and
+with the filter first, and the share of checks the filter answers alone. Like in a vault, most checked passwords
+were never breached.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchFilter.py
+"""
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from pwnedCorpus import convertCorpus, hashCorpus
+from pwnedFilter import buildFilter, hashFilter
+
+SIZES = [100000, 1000000]
+RATES = [0.1, 0.01]
+LOOKUPS = 100000
+BREACHED_SHARE = 0.05
+ROUNDS = 3
+
+def measure(function: object, queries: list) -> float:
+    """
+    Return the best time of ROUNDS runs per lookup in microseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for query in queries:
+            function(query) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries) * 1e6
+
+def makeCorpus(directory: str, size: int) -> tuple:
+    """
+    Write size random hashes in the text format of the downloader, convert them and return the text file,
+    the corpus and the lookups, BREACHED_SHARE of them are in the corpus
+    """
+    hashes = [hashlib.sha1(idx.to_bytes(8, "big")).hexdigest().upper() for idx in range(size)]
+    source = os.path.join(directory, "hashes.txt")
+    with open(source, "w", encoding="utf-8") as file:
+        file.writelines(f"{passwordHash}:1\r\n" for passwordHash in hashes)
+    convertCorpus(source, os.path.join(directory, "corpus.bin"))
+    breached = int(LOOKUPS * BREACHED_SHARE)
+    queries = random.sample(hashes, breached) + [hashlib.sha1(str(idx).encode()).hexdigest().upper()
+                                                 for idx in range(LOOKUPS - breached)]
+    return source, hashCorpus(os.path.join(directory, "corpus.bin")), queries
+
+def filteredCount(passwordFilter: hashFilter, corpus: hashCorpus) -> object:
+    """
+    Return a lookup that only asks the corpus if the filter lets the hash through
+    """
+    return lambda query: passwordFilter.mightContain(query) and corpus.count(query)
+
+def main() -> None:
+    """
+    Print the build time, size and lookup times of the filter at each false positive rate
+    """
+    print(f"{'hashes':>8} {'rate':>5} {'build s':>8} {'filter MB':>10} {'corpus us':>10} {'filtered us':>12} {'skipped':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            source, corpus, queries = makeCorpus(directory, size)
+            corpusLookup = measure(corpus.count, queries)
+            for rate in RATES:
+                target = os.path.join(directory, "filter.bin")
+                start = time.perf_counter()
+                buildFilter(source, target, rate)
+                build = time.perf_counter() - start
+                passwordFilter = hashFilter(target)
+                filtered = measure(filteredCount(passwordFilter, corpus), queries)
+                skipped = sum(not passwordFilter.mightContain(query) for query in queries) / len(queries)
+                print(f"{size:>8} {rate:>5} {build:>8.1f} {os.path.getsize(target) / 2**20:>10.2f} {corpusLookup:>10.2f} "
+                      f"{filtered:>12.2f} {skipped:>8.1%}")
+                passwordFilter.close()
+            corpus.close()
+
+if __name__ == "__main__":
+    main()
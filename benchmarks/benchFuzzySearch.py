@@ -0,0 +1,53 @@
+"""
+This script measures the fuzzy search over the websites and usernames of large vaults.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchFuzzySearch.py
+"""
+import random
+import time
+
+from entry import entry
+from findPasswords import fuzzyCorpus
+
+SIZES = [1000, 10000, 50000]
+# Typos of names that are in the vault, a name that is not and a username
+PATTERNS = ["gtihub", "amazn", "spotfy12", "microsfot", "zzzzzz", "user4242"]
+NAMES = ["github", "gitlab", "google", "amazon", "netflix", "paypal", "reddit", "twitter", "spotify", "dropbox",
+         "linkedin", "microsoft", "apple", "steam", "discord"]
+ROUNDS = 5
+
+def makeEntries(count: int) -> list:
+    """
+    Create entries with a few common website names and distinct usernames
+    """
+    generator = random.Random(0)
+    return [entry(f"{generator.choice(NAMES)}{idx}.example.com", f"Password{idx}!x", f"user{idx}@mail.de", [float(1700000000 + idx)],
+                  "", []) for idx in range(count)]
+
+def measure(function: object, *args: object) -> float:
+    """
+    Return the best time of ROUNDS runs in milliseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(*args) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    """
+    Print the build time of the corpus and the time and number of results of every pattern
+    """
+    print(f"{'entries':>8} {'pattern':>10} {'matches':>8} {'ms':>8}")
+    for size in SIZES:
+        userEntries = makeEntries(size)
+        print(f"{size:>8} {'(build)':>10} {'':>8} {measure(fuzzyCorpus, userEntries):>8.2f}")
+        corpus = fuzzyCorpus(userEntries)
+        for pattern in PATTERNS:
+            matches = len(corpus.search(pattern))
+            print(f"{size:>8} {pattern:>10} {matches:>8} {measure(corpus.search, pattern):>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+This script compares the time of a pattern search by a linear scan and through the trigram index.
+
+Run it from the project root after sourcing setup.sh:
+    python benchmarks/benchSearch.py
+"""
+import time
+
+from entry import entry
+from findPasswords import findPasswordByPattern, trigramIndex
+
+SIZES = [1000, 10000, 50000]
+PATTERNS = ["site4242", "user77@", "codes for site123", "example"]
+ROUNDS = 5
+
+def makeEntries(count: int) -> list:
+    """
+    Create entries with notes like a vault that has been used for a while
+    """
+    return [entry(f"site{idx}.example.com", f"Password{idx}!x", f"user{idx}@mail.de", [float(1700000000 + idx)],
+                  f"Recovery codes for site{idx}: " + " ".join(f"{idx:04d}-{code:04d}" for code in range(4)), [])
+            for idx in range(count)]
+
+def measure(function: object, *args: object) -> float:
+    """
+    Return the best time of ROUNDS runs in milliseconds
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function(*args) # type: ignore[operator]
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    """
+    Print the build time of the index and the time of every pattern with and without it
+    """
+    print(f"{'entries':>8} {'pattern':>18} {'matches':>8} {'scan ms':>8} {'index ms':>9}")
+    for size in SIZES:
+        userEntries = makeEntries(size)
+        start = time.perf_counter()
+        index = trigramIndex(userEntries)
+        print(f"{size:>8} {'(build)':>18} {'':>8} {'':>8} {(time.perf_counter() - start) * 1000:>9.1f}")
+        for pattern in PATTERNS:
+            matches = len(findPasswordByPattern(userEntries, pattern, index))
+            scanTime = measure(findPasswordByPattern, userEntries, pattern)
+            indexTime = measure(findPasswordByPattern, userEntries, pattern, index)
+            print(f"{size:>8} {pattern:>18} {matches:>8} {scanTime:>8.2f} {indexTime:>9.2f}")
+
+if __name__ == "__main__":
+    main()
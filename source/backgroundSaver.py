@@ -0,0 +1,159 @@
+""" This module contains the write-behind saver that keeps disk writes off the UI thread """
+import threading
+
+from diskManagement import commitChanges, saveSessionToDisk, replayChanges
+from vaultLock import vaultConflictError
+from vaultSession import vaultSession
+
+IDLE = "idle"
+PENDING = "pending"
+SAVED = "saved"
+FAILED = "failed"
+CONFLICT = "conflict"
+SAVE_DELAY = 0.5  # changes submitted within half a second are written together
+
+class backgroundSaver:
+    """
+    Writes the user's changes on a background thread, changes that are submitted close together are merged into one write
+
+    Methods
+    -------
+    submit(userEntries: list, changes: list|None) -> None
+        Hands the latest entries and their changes to the saver
+    flush(timeout: float|None) -> bool
+        Writes the pending changes right away and waits for them
+    retry() -> None
+        Tries a failed write again without waiting for it
+    rebase(userEntries: list) -> None
+        Applies the pending changes to entries reloaded after a conflict
+    stop(timeout: float|None) -> bool
+        Flushes the pending changes and ends the thread
+    """
+    def __init__(self, session: vaultSession, delay: float = SAVE_DELAY) -> None:
+        self.session = session
+        self.delay = delay
+        self._userEntries: list = []
+        # None stands for a write of all entries as a new snapshot
+        self._changes: list|None = []
+        self._state = IDLE
+        self._writing = False
+        self._retry = False
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def state(self) -> str:
+        """
+        IDLE before the first change, PENDING while changes wait for the disk, SAVED or FAILED after the last write.
+        CONFLICT if another session saved in between, the entries have to be reloaded and passed to rebase.
+        """
+        return self._state
+
+    def submit(self, userEntries: list, changes: list|None = None) -> None:
+        """
+        Hands the latest entries and their changes to the saver, the call doesn't wait for the disk
+
+        Parameters:
+        - userEntries: A list of the users entries, including the changes.
+        - changes: List of (operation, website, changedEntry) tuples, None writes all entries as a new snapshot.
+        """
+        with self._condition:
+            self._userEntries = list(userEntries)
+            self._changes = None if changes is None or self._changes is None else self._changes + changes
+            self._state = PENDING
+            self._condition.notify_all()
+
+    def flush(self, timeout: float|None = None) -> bool:
+        """
+        Writes the pending changes without waiting for more of them
+
+        Returns:
+        - True if all changes are on disk, False if the write failed or the timeout passed.
+        """
+        with self._condition:
+            if self._stopped:
+                return not self._hasPending()
+            self.retry()
+            written = self._condition.wait_for(
+                lambda: not self._writing and (not self._hasPending() or self._state in (FAILED, CONFLICT) and not self._retry),
+                timeout)
+            return written and not self._hasPending()
+
+    def retry(self) -> None:
+        """
+        Tries a failed write again, e.g. after the session was unlocked again
+        """
+        with self._condition:
+            if self._hasPending():
+                self._retry = True
+                self._condition.notify_all()
+
+    def rebase(self, userEntries: list) -> None:
+        """
+        Applies the pending changes to the entries that were reloaded after a conflict and writes them again.
+        A pending write of all entries writes the reloaded entries, so the changes of the other session are kept.
+
+        Parameters:
+        - userEntries: The reloaded entries, the pending changes are applied to this list.
+        """
+        with self._condition:
+            if self._changes:
+                replayChanges(userEntries, self._changes)
+            self._userEntries = list(userEntries)
+            self._state = PENDING if self._hasPending() else SAVED
+            self._condition.notify_all()
+
+    def stop(self, timeout: float|None = None) -> bool:
+        """
+        Flushes the pending changes and ends the thread
+
+        Returns:
+        - True if all changes are on disk.
+        """
+        saved = self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return saved
+
+    def _hasPending(self) -> bool:
+        return self._changes != []
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or self._hasPending() and (self._state not in (FAILED, CONFLICT) or self._retry))
+                if self._stopped:
+                    return
+                # Wait a moment so changes that follow close behind are part of the same write
+                self._condition.wait_for(lambda: self._retry or self._stopped, self.delay)
+                userEntries, changes = self._userEntries, self._changes
+                self._changes = []
+                self._retry = False
+                self._writing = True
+            state = self._write(userEntries, changes)
+            with self._condition:
+                self._writing = False
+                if state == SAVED:
+                    self._state = PENDING if self._hasPending() else SAVED
+                else:
+                    # Keep the changes for the next attempt
+                    self._changes = None if changes is None or self._changes is None else changes + self._changes
+                    self._state = state
+                self._condition.notify_all()
+
+    def _write(self, userEntries: list, changes: list|None) -> str:
+        try:
+            if changes is None:
+                saved = saveSessionToDisk(self.session, userEntries)
+            else:
+                saved = commitChanges(self.session, userEntries, changes)
+        except vaultConflictError:
+            return CONFLICT
+        except (RuntimeError, OSError, ValueError):
+            return FAILED
+        return SAVED if saved else FAILED
@@ -1,4 +1,93 @@
 """ Module for checking password strength and duplicates """
+import hashlib
+import os
+from typing import Iterable
+
+from entry import entry
+from entryIndex import entryIndex
+
+class reuseIndex(entryIndex):
+    """
+    Keyed hashes of the current and old passwords of all entries, with a count per entry, so a reuse check is one dict probe.
+    The index doesn't hold the passwords themselves, the hashes are keyed with a random key that only lives in memory.
+
+    Methods
+    -------
+    rebuild(userEntries: list) -> None
+        Indexes the entries from scratch
+    add(userEntry: entry) -> None
+        Indexes the passwords of a new entry
+    update(userEntry: entry) -> None
+        Indexes the passwords of an entry again after they changed
+    remove(userEntry: entry) -> None
+        Removes the passwords of an entry
+    isReused(password: str) -> bool
+        Checks if any entry uses or used the password
+    entriesUsing(password: str) -> list
+        Returns the entries that use or used the password
+    """
+    def __init__(self, userEntries: list|None = None, key: bytes|None = None) -> None:
+        super().__init__()
+        # blake2b takes the key itself, it is several times faster than an HMAC when the whole vault is indexed.
+        # Copying the keyed state also skips hashing the key block for every password.
+        self._hasher = hashlib.blake2b(key=key if key is not None else os.urandom(32), digest_size=16)
+        # hash -> {id of an entry: how often the entry has the password, as current or old password}
+        self._counts: dict = {}
+        self.rebuild(userEntries or [])
+
+    def isReused(self, password: str) -> bool:
+        """
+        Checks if any entry uses the password or used it before
+
+        Parameters:
+        - password: The password to check.
+
+        Returns:
+        - True if the password is or was the password of an entry.
+        """
+        return self._hash(password) in self._counts
+
+    def entriesUsing(self, password: str) -> list:
+        """
+        Returns the entries that use the password or used it before
+
+        Parameters:
+        - password: The password to check.
+
+        Returns:
+        - The entries, in the order they were indexed.
+        """
+        return [self._entries[key] for key in self._counts.get(self._hash(password), {})]
+
+    def _keysOf(self, userEntry: entry) -> list:
+        return [self._hash(password) for password in _passwordsOf(userEntry)]
+
+    def _post(self, key: int, keys: Iterable) -> None:
+        for passwordHash in keys:
+            owners = self._counts.setdefault(passwordHash, {})
+            owners[key] = owners.get(key, 0) + 1
+
+    def _unpost(self, key: int, keys: Iterable) -> None:
+        for passwordHash in keys:
+            owners = self._counts[passwordHash]
+            owners[key] -= 1
+            if not owners[key]:
+                del owners[key]
+            if not owners:
+                del self._counts[passwordHash]
+
+    def _clear(self) -> None:
+        self._counts.clear()
+
+    def _hash(self, password: str) -> bytes:
+        hasher = self._hasher.copy()
+        hasher.update(password.encode())
+        return hasher.digest()
+
+def _passwordsOf(userEntry: entry) -> list:
+    # Old passwords start as [""] for new entries, the empty placeholder is no password
+    passwords = [userEntry.password] + list(userEntry.oldPasswords or [])
+    return [password for password in passwords if password]
 
 def checkPassword(password: str) -> bool:
     """
@@ -46,12 +135,15 @@ def _checkSpecial(password: str) -> bool:
     """
     return any(not char.isalnum() for char in password)
 
-def checkDuplicate(password: str, userEntries: list) -> bool:
+def checkDuplicate(password: str, userEntries: list, index: reuseIndex|None = None) -> bool:
     """
     Check if a password has been used before
+    With a reuse index of the entries this is a single lookup instead of collecting all passwords
     """
+    if index is not None:
+        return index.isReused(password)
     passwords = []
-    for entry in userEntries:
-        passwords.append(entry.password)
-        passwords.extend(entry.oldPasswords)
+    for userEntry in userEntries:
+        passwords.append(userEntry.password)
+        passwords.extend(userEntry.oldPasswords)
     return password in passwords
@@ -3,25 +3,272 @@ This script checks if a password has been pawned using the API from https://have
 """
 
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Iterable
+
 import requests
 
+from pwnedCache import cachedRange, rangeCache, defaultCache, parseRange
+from pwnedCorpus import openCorpus
+from pwnedFilter import openFilter
+
+API_URL = 'https://api.pwnedpasswords.com/range/'
+REQUEST_TIMEOUT = 3  # seconds to wait for the API
+REVALIDATE_TIMEOUT = 1  # seconds to wait for the API when a cached range can be used instead
+BATCH_WORKERS = 64  # concurrent requests of a batch and connections kept open, the requests mostly wait for the network
+ONLINE = "online"  # ask the API every time
+CACHED = "cached"  # ask the API and keep the ranges in the cache of the logged in user
+OFFLINE = "offline"  # only look at the converted corpus in CORPUS_FILE, see pwnedCorpus
+SOURCES = (ONLINE, CACHED, OFFLINE)
+SOURCE = os.environ.get("PWNED_SOURCE", CACHED)
+CORPUS_FILE = os.environ.get("PWNED_CORPUS", "resources/pwned_corpus.bin")
+FILTER_FILE = os.environ.get("PWNED_FILTER", "resources/pwned_filter.bin")  # only used if it exists, see pwnedFilter
+
 def checkPawned(password: str) -> int:
     """
-    Check if a password has been pawned using the API from https://haveibeenpawned.com
+    Check if a password has been pawned using the API from https://haveibeenpawned.com,
+    or the local corpus if SOURCE is OFFLINE. Passwords the filter in FILTER_FILE rules out are never looked up.
     """
     password = hashPassword(password)
-    url = 'https://api.pwnedpasswords.com/range/' + password[:5]
+    if not mightBeBreached(password):
+        return 0
+    if SOURCE == OFFLINE:
+        return openCorpus(CORPUS_FILE).count(password)
+    count: int = fetchRange(password[:5]).get(password[5:], 0)
+    return count
+
+def checkPawnedBatch(passwords: Iterable[str], workers: int = BATCH_WORKERS) -> list:
+    """
+    Check many passwords at once, like checkPawned but each range is fetched once for all passwords whose hashes
+    share its prefix and the ranges are fetched concurrently
+
+    Parameters:
+    - passwords: The passwords to check.
+    - workers: The number of concurrent requests.
+
+    Returns:
+    - How often each password was breached, in the order of the passwords.
+
+    Raises:
+    - RuntimeError: If a range can't be fetched, see fetchRange.
+    """
+    hashes = [hashPassword(password) for password in passwords]
+    counts = fetchCounts(hashes, workers=workers)
+    return [counts[passwordHash] for passwordHash in hashes]
+
+def fetchCounts(hashes: Iterable[str], errors: list|None = None, workers: int = BATCH_WORKERS) -> dict:
+    """
+    Look up many hashes at once. Hashes the filter in FILTER_FILE rules out aren't breached, the range of every
+    distinct prefix of the others is fetched once and the ranges are fetched concurrently.
+    After the first failure the remaining ranges aren't fetched, if the API is down waiting for their timeouts won't help.
+
+    Parameters:
+    - hashes: SHA1 hashes like hashPassword returns them.
+    - errors: The distinct messages of failures are added to it, without it the first failure is raised.
+    - workers: The number of concurrent requests.
+
+    Returns:
+    - How often each hash was breached, hashes that couldn't be looked up are missing.
+
+    Raises:
+    - RuntimeError: If errors is None and a hash can't be looked up.
+    """
+    counts, prefixes = splitHashes(hashes, errors)
+    if prefixes:
+        _fetchPrefixes(prefixes, counts, errors, workers)
+    return counts
+
+def splitHashes(hashes: Iterable[str], errors: list|None = None) -> tuple[dict, dict]:
+    """
+    Answers the hashes that don't need a range: hashes the filter in FILTER_FILE rules out aren't breached
+    and if SOURCE is OFFLINE the corpus is asked directly, that is faster than reading its ranges
+
+    Parameters:
+    - hashes: SHA1 hashes like hashPassword returns them, duplicates are only looked up once.
+    - errors: The message is added to it if the filter or the corpus can't be opened, without it the error is raised.
+
+    Returns:
+    - The counts of the answered hashes and the distinct remaining hashes by prefix, both empty after an error.
+
+    Raises:
+    - RuntimeError: If errors is None and the filter or the corpus can't be opened.
+    """
+    counts: dict = {}
+    prefixes: dict = {}
     try:
-        response = requests.get(url, timeout=3)
+        for passwordHash in dict.fromkeys(hashes):
+            if not mightBeBreached(passwordHash):
+                counts[passwordHash] = 0
+            elif SOURCE == OFFLINE:
+                counts[passwordHash] = openCorpus(CORPUS_FILE).count(passwordHash)
+            else:
+                prefixes.setdefault(passwordHash[:5], []).append(passwordHash)
+    except RuntimeError as error:
+        if errors is None:
+            raise
+        errors.append(str(error))
+        return {}, {}
+    return counts, prefixes
+
+def _fetchPrefixes(prefixes: dict, counts: dict, errors: list|None, workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(prefixes)), 1)) as executor:
+        futures = {executor.submit(fetchRange, prefix): prefix for prefix in prefixes}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                suffixes = future.result()
+            except RuntimeError as error:
+                for pending in futures:
+                    pending.cancel()
+                if errors is None:
+                    raise
+                if str(error) not in errors:
+                    errors.append(str(error))
+                continue
+            for passwordHash in prefixes[futures[future]]:
+                counts[passwordHash] = suffixes.get(passwordHash[5:], 0)
+
+def fetchRange(prefix: str, cache: rangeCache|None = None) -> dict:
+    """
+    Fetch all breached hashes that start with a prefix, one request answers every password with that prefix.
+    SOURCE picks where the range comes from:
+    - CACHED: a cached range is used without a request for RANGE_TTL and revalidated with its ETag after that.
+      If the API is slow or down, a cached range is used even if it is older.
+    - ONLINE: the API is asked every time unless a cache is passed.
+    - OFFLINE: the range is read from the corpus in CORPUS_FILE, nothing is sent.
+
+    Parameters:
+    - prefix: The first five characters of an upper case SHA1 hash.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+
+    Returns:
+    - The remaining 35 characters of each hash mapped to how often it was breached.
+
+    Raises:
+    - RuntimeError: If the API can't be reached or doesn't answer with the hashes and the range isn't cached,
+      the corpus can't be opened or SOURCE is unknown.
+    """
+    local, cache, cached = localRange(prefix, cache)
+    if local is not None:
+        return local
+    headers, timeout = revalidation(cached)
+    try:
+        response = defaultSession().get(API_URL + prefix, headers=headers, timeout=timeout)
     except requests.exceptions.RequestException as error:
-        raise RuntimeError(f'Error fetching: {error}, check the API and try again') from error
-    if response.status_code != 200:
-        raise RuntimeError(f'Error fetching: {response.status_code}, check the API and try again') from None
-    hashes = (line.split(':') for line in response.text.splitlines())
-    for myHash, count in hashes:
-        if myHash == password[5:]:
-            return int(count)
-    return 0
+        return failedRange(cached, error)
+    return receivedRange(prefix, cache, cached, response.status_code, response.content, response.headers.get("ETag"))
+
+def localRange(prefix: str, cache: rangeCache|None) -> tuple[dict|None, rangeCache|None, cachedRange|None]:
+    """
+    Answers a range without the API if SOURCE allows it, the first step of fetchRange
+
+    Parameters:
+    - prefix: The first five characters of an upper case SHA1 hash.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+
+    Returns:
+    - The counts of the range or None if the API has to be asked, the cache to use and the cached range.
+
+    Raises:
+    - RuntimeError: If the corpus can't be opened or SOURCE is unknown.
+    """
+    if SOURCE not in SOURCES:
+        raise RuntimeError(f"Unknown breach source {SOURCE}, use one of {', '.join(SOURCES)}")
+    if SOURCE == OFFLINE:
+        return openCorpus(CORPUS_FILE).range(prefix), None, None
+    if cache is None and SOURCE == CACHED:
+        cache = defaultCache()
+    cached = cache.get(prefix) if cache is not None else None
+    if cached is not None and cached.fresh:
+        return cached.counts, cache, cached
+    return None, cache, cached
+
+def revalidation(cached: cachedRange|None) -> tuple:
+    """
+    Returns the headers and the timeout of a range request, a cached range is sent with its ETag
+    and with a cached range at hand there is no need to wait long for the API
+    """
+    headers = {"If-None-Match": cached.etag} if cached is not None and cached.etag else {}
+    return headers, REVALIDATE_TIMEOUT if cached is not None else REQUEST_TIMEOUT
+
+def failedRange(cached: cachedRange|None, error: Exception) -> dict:
+    """
+    Answers a range whose request failed, the cached range is used even if it is older
+
+    Parameters:
+    - cached: The cached range or None.
+    - error: The error of the request.
+
+    Returns:
+    - The counts of the cached range.
+
+    Raises:
+    - RuntimeError: If the range isn't cached.
+    """
+    if cached is not None:
+        return cached.counts
+    raise RuntimeError(f'Error fetching: {str(error) or type(error).__name__}, check the API and try again') from error
+
+def receivedRange(prefix: str, cache: rangeCache|None, cached: cachedRange|None,
+                  status: int, body: bytes, etag: str|None) -> dict:
+    """
+    Turns the answer of the API into the counts of the range, the last step of fetchRange
+
+    Parameters:
+    - prefix: The first five characters of an upper case SHA1 hash.
+    - cache: The cache the range is stored in or refreshed.
+    - cached: The cached range, it is used if the API didn't answer with the hashes.
+    - status: The status code of the response.
+    - body: The body of the response.
+    - etag: The ETag header of the response.
+
+    Returns:
+    - The remaining 35 characters of each hash mapped to how often it was breached.
+
+    Raises:
+    - RuntimeError: If the API doesn't answer with the hashes and the range isn't cached.
+    """
+    if status == 304 and cache is not None and cached is not None:
+        cache.refresh(prefix)
+        return cached.counts
+    if status != 200:
+        if cached is not None:
+            return cached.counts
+        raise RuntimeError(f'Error fetching: {status}, check the API and try again')
+    if cache is None:
+        return parseRange(body.decode())
+    return cache.put(prefix, body, etag)
+
+@lru_cache(maxsize=1)
+def defaultSession() -> requests.Session:
+    """
+    Returns the session all requests to the API go through, it keeps up to BATCH_WORKERS connections open
+    so later requests skip the TCP and TLS handshakes. Sessions can be used from several threads.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=BATCH_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def mightBeBreached(passwordHash: str) -> bool:
+    """
+    Checks the hash against the filter in FILTER_FILE before it is looked up in the corpus or the API
+
+    Parameters:
+    - passwordHash: The SHA1 hash of the password in hex, like hashPassword returns it.
+
+    Returns:
+    - False if the hash is certainly not breached, True if it has to be looked up or there is no filter.
+
+    Raises:
+    - RuntimeError: If FILTER_FILE exists, but isn't a filter.
+    """
+    hashFilter = openFilter(FILTER_FILE)
+    return hashFilter is None or hashFilter.mightContain(passwordHash)
 
 def hashPassword(password: str) -> str:
     """
@@ -0,0 +1,326 @@
+"""
+This module checks passwords against the Pwned Passwords API without blocking an asyncio event loop.
+It shares the source, the filter, the corpus, the cache and the parsing with checkPwned, only the requests are sent
+over asyncio streams instead of requests. The cache is a local SQLite file and answers in well under a millisecond,
+so it is used directly.
+
+Cancelling a check closes the connections of its requests that are still running, for example:
+    task = asyncio.create_task(checkPawnedBatchAsync(passwords))
+    ...
+    task.cancel()  # the user left the screen
+
+The client only speaks the part of HTTP/1.1 the range API uses. Redirects aren't followed, a redirect is an answer
+without the hashes like any other status but 200 and 304. Every line, the headers and the body are limited in size,
+a response that exceeds a limit is an invalid response. It needs Python 3.11 for asyncio.timeout.
+"""
+import asyncio
+import re
+import ssl
+import sys
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from checkPwned import (hashPassword, failedRange, localRange, receivedRange, revalidation, splitHashes,
+                        API_URL, REQUEST_TIMEOUT)
+from pwnedCache import rangeCache
+
+if sys.version_info < (3, 11):
+    raise ImportError("checkPwnedAsync needs Python 3.11 or newer")
+
+ASYNC_WORKERS = 64  # concurrent requests of a check and connections kept open
+USER_AGENT = "PPP-PM"
+MAX_LINE = 8 * 1024  # bytes of the status line, a header or a chunk size line
+MAX_HEADERS = 100  # headers of a response, including the trailers of a chunked body
+MAX_BODY = 1024 * 1024  # bytes of a response body, a range is about 30 KB
+_DECIMAL = re.compile(rb"[0-9]{1,10}")
+_HEX = re.compile(rb"[0-9A-Fa-f]{1,8}")
+
+class rangeClient:
+    """
+    Sends range requests over up to `connections` kept open HTTP/1.1 connections.
+    Use it as an async context manager or close it, connections belong to the event loop they were opened in.
+
+    Attributes
+    ----------
+    url: str
+        The URL the prefix is appended to
+    timeout: float
+        The longest a request may take in seconds, requests that only revalidate a cached range wait less
+
+    Methods
+    -------
+    get(prefix: str, headers: dict, timeout: float) -> tuple
+        Requests a range
+    close() -> None
+        Closes the kept open connections
+    """
+    def __init__(self, url: str = API_URL, connections: int = ASYNC_WORKERS, timeout: float = REQUEST_TIMEOUT) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.connections = connections
+        parts = urlsplit(url)
+        self._host = parts.hostname or ""
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._hostHeader = parts.netloc
+        self._path = parts.path
+        self._ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self._idle: list = []
+
+    async def __aenter__(self) -> "rangeClient":
+        return self
+
+    async def __aexit__(self, *exception: object) -> None:
+        await self.close()
+
+    async def get(self, prefix: str, headers: dict, timeout: float) -> tuple:
+        """
+        Requests a range, a kept open connection is reused if there is one
+
+        Parameters:
+        - prefix: The first five characters of an upper case SHA1 hash.
+        - headers: Additional request headers.
+        - timeout: Seconds to wait for the whole response, at most the timeout of the client.
+
+        Returns:
+        - The status code, the body and the ETag header of the response.
+
+        Raises:
+        - OSError: If the connection fails.
+        - EOFError: If the connection is closed before the response is complete.
+        - TimeoutError: If the response takes longer than the timeout.
+        - ValueError: If the response isn't HTTP.
+        """
+        lines = [f"GET {self._path}{prefix} HTTP/1.1", f"Host: {self._hostHeader}", f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: identity"] + [f"{name}: {value}" for name, value in headers.items()]
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        async with asyncio.timeout(min(timeout, self.timeout)):
+            while self._idle:
+                # The server may have closed a kept open connection in the meantime, then a new one is opened
+                reader, writer = self._idle.pop()
+                try:
+                    return await self._exchange(reader, writer, request)
+                except (OSError, EOFError):
+                    continue
+            reader, writer = await asyncio.open_connection(self._host, self._port, ssl=self._ssl, limit=MAX_LINE)
+            return await self._exchange(reader, writer, request)
+
+    async def close(self) -> None:
+        """
+        Closes the kept open connections
+        """
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in idle), return_exceptions=True)
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes) -> tuple:
+        """
+        Sends a request and reads the response, the connection is kept open only if the response was read completely
+        """
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, headers, body = await _readResponse(reader)
+        except BaseException:
+            writer.close()
+            raise
+        if headers.get("connection", "").lower() == "close" or len(self._idle) >= self.connections:
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, body, headers.get("etag")
+
+async def checkPawnedAsync(password: str, client: rangeClient|None = None, cache: rangeCache|None = None) -> int:
+    """
+    Check if a password has been pawned like checkPawned, without blocking the event loop
+
+    Parameters:
+    - password: The password to check.
+    - client: The client that sends the request, a new one by default.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+
+    Returns:
+    - How often the password was breached.
+
+    Raises:
+    - RuntimeError: If the range can't be fetched, see checkPwned.fetchRange.
+    """
+    count: int = (await checkPawnedBatchAsync([password], client=client, cache=cache))[0]
+    return count
+
+async def checkPawnedBatchAsync(passwords: Iterable[str], workers: int = ASYNC_WORKERS, client: rangeClient|None = None,
+                                cache: rangeCache|None = None) -> list:
+    """
+    Check many passwords at once like checkPawnedBatch, without blocking the event loop
+
+    Parameters:
+    - passwords: The passwords to check.
+    - workers: The number of concurrent requests.
+    - client: The client that sends the requests, a new one by default.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+
+    Returns:
+    - How often each password was breached, in the order of the passwords.
+
+    Raises:
+    - RuntimeError: If a range can't be fetched, see checkPwned.fetchRange.
+    """
+    hashes = [hashPassword(password) for password in passwords]
+    counts = await fetchCountsAsync(hashes, workers=workers, client=client, cache=cache)
+    return [counts[passwordHash] for passwordHash in hashes]
+
+async def fetchCountsAsync(hashes: Iterable[str], errors: list|None = None, workers: int = ASYNC_WORKERS,
+                           client: rangeClient|None = None, cache: rangeCache|None = None) -> dict:
+    """
+    Look up many hashes at once like checkPwned.fetchCounts, which describes hashes, errors, workers and the result.
+    At most `workers` requests run at the same time and after the first failure the others are cancelled.
+    If the lookup itself is cancelled, its requests are cancelled and their connections closed before the
+    cancellation is passed on.
+
+    Parameters:
+    - client: The client that sends the requests, a new one that is closed afterwards by default.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+    """
+    counts, prefixes = splitHashes(hashes, errors)
+    if not prefixes:
+        return counts
+    requestClient = rangeClient(connections=workers) if client is None else client
+    try:
+        tasks = await _fetchPrefixes(prefixes, requestClient, cache, workers)
+    finally:
+        if client is None:
+            await requestClient.close()
+    for task, prefix in tasks.items():
+        if task.cancelled():
+            continue
+        failure = task.exception()
+        if failure is not None:
+            if errors is None or not isinstance(failure, RuntimeError):
+                raise failure
+            if str(failure) not in errors:
+                errors.append(str(failure))
+            continue
+        for passwordHash in prefixes[prefix]:
+            counts[passwordHash] = task.result().get(passwordHash[5:], 0)
+    return counts
+
+async def fetchRangeAsync(prefix: str, client: rangeClient, cache: rangeCache|None = None) -> dict:
+    """
+    Fetch all breached hashes that start with a prefix like checkPwned.fetchRange, without blocking the event loop
+
+    Parameters:
+    - prefix: The first five characters of an upper case SHA1 hash.
+    - client: The client that sends the request.
+    - cache: The cache of the ranges, the one of the logged in user by default if SOURCE is CACHED.
+
+    Returns:
+    - The remaining 35 characters of each hash mapped to how often it was breached.
+
+    Raises:
+    - RuntimeError: If the API can't be reached or doesn't answer with the hashes and the range isn't cached,
+      the corpus can't be opened or SOURCE is unknown.
+    """
+    local, cache, cached = localRange(prefix, cache)
+    if local is not None:
+        return local
+    try:
+        status, body, etag = await client.get(prefix, *revalidation(cached))
+    except (OSError, EOFError, TimeoutError, ValueError) as error:
+        return failedRange(cached, error)
+    return receivedRange(prefix, cache, cached, status, body, etag)
+
+async def _fetchPrefixes(prefixes: Iterable[str], client: rangeClient, cache: rangeCache|None, workers: int) -> dict:
+    """
+    Fetches the ranges until all are done or the first one failed, the others are cancelled then.
+    The requests are also cancelled and awaited if this is cancelled, so no connection stays open.
+
+    Returns:
+    - The finished or cancelled task of every prefix mapped to the prefix.
+    """
+    slots = asyncio.Semaphore(workers)
+
+    async def fetch(prefix: str) -> dict:
+        async with slots:
+            return await fetchRangeAsync(prefix, client, cache)
+
+    tasks = {asyncio.create_task(fetch(prefix)): prefix for prefix in prefixes}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return tasks
+
+async def _readResponse(reader: asyncio.StreamReader) -> tuple:
+    """
+    Reads a HTTP/1.1 response with a Content-Length, a chunked body or a body that ends with the connection
+
+    Returns:
+    - The status code, the headers with lower case names and the body.
+
+    Raises:
+    - EOFError: If the connection is closed before the response is complete.
+    - ValueError: If the response isn't HTTP or exceeds MAX_LINE, MAX_HEADERS or MAX_BODY.
+    """
+    statusLine = await reader.readline()
+    if not statusLine:
+        raise EOFError("Connection closed")
+    parts = statusLine.split()
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/") or len(parts[1]) != 3:
+        raise ValueError(f"Invalid response: {statusLine[:80]!r}")
+    status = _parseSize(parts[1], _DECIMAL)
+    headers = await _readHeaders(reader)
+    if status in (204, 304) or status < 200:
+        body = b""
+    elif "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        length = 0
+        while True:
+            size = _parseSize((await reader.readline()).split(b";")[0].strip(), _HEX)
+            if not size:
+                await _readHeaders(reader)
+                break
+            length += size
+            if length > MAX_BODY:
+                raise ValueError(f"Response body larger than {MAX_BODY} bytes")
+            chunks.append(await reader.readexactly(size))
+            if await reader.readexactly(2) != b"\r\n":
+                raise ValueError("Invalid chunk")
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        size = _parseSize(headers["content-length"].encode("latin-1"), _DECIMAL)
+        if size > MAX_BODY:
+            raise ValueError(f"Response body larger than {MAX_BODY} bytes")
+        body = await reader.readexactly(size)
+    else:
+        body = await reader.read(MAX_BODY + 1)
+        while len(body) <= MAX_BODY and not reader.at_eof():
+            body += await reader.read(MAX_BODY + 1 - len(body))
+        if len(body) > MAX_BODY:
+            raise ValueError(f"Response body larger than {MAX_BODY} bytes")
+        headers["connection"] = "close"
+    return status, headers, body
+
+async def _readHeaders(reader: asyncio.StreamReader) -> dict:
+    """
+    Reads header lines up to the empty line, lines longer than the limit of the reader raise a ValueError
+    """
+    headers: dict = {}
+    for _ in range(MAX_HEADERS + 1):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            return headers
+        if not line.endswith(b"\n"):
+            raise EOFError("Connection closed")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError(f"Response has more than {MAX_HEADERS} headers")
+
+def _parseSize(value: bytes, pattern: re.Pattern[bytes]) -> int:
+    """
+    Parses a status code, Content-Length or chunk size, int() would also accept signs, spaces and underscores
+    """
+    if not pattern.fullmatch(value):
+        raise ValueError(f"Invalid number in response: {value[:20]!r}")
+    return int(value, 16 if pattern is _HEX else 10)
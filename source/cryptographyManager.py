@@ -1,11 +1,20 @@
 """this module is responsible for encrypting and decrypting the content of a file
 """
+import ctypes
 import os
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
+from vaultLock import writeAtomic
+
+SALT_SIZE = 16
+NONCE_SIZE = 12
+KDF_ITERATIONS = 100000
 
 def decryptContent(password: str, username: str) -> str:
     """Decrypt the content of a file and returns it as a string
@@ -17,81 +26,176 @@ def decryptContent(password: str, username: str) -> str:
     Returns:
         str: decrypted content
     """
-    # Read the encrypted content from the file
-    filePath = f'resources/{username}_entries.enc'
-    try:
-        with open(filePath, 'rb') as file:
-            encryptedContent = file.read()
-    except FileNotFoundError:
+    salt = readSalt(username)
+    if salt is None:
         return ""
+    return decryptWithKey(deriveKey(password, salt), username)
 
-    # Extract the salt and IV from the encrypted content
-    salt = encryptedContent[:16]
-    initializationVector = encryptedContent[16:32]
+def encryptContent(content: str, password: str, username: str) -> bool:
+    """Encrypts the content and writes it to a file
 
-    # Extract the actual encrypted data
-    encryptedData = encryptedContent[32:]
+    Args:
+        content (str): content to encrypt
+        password (str): password to encrypt the content
+        username (str): username for the file to encrypt
 
-    # Derive a key from the password using PBKDF2HMAC
+    Returns:
+        bool: True if the file was written successfully, False otherwise
+    """
+    # Generate a salt for PBKDF2HMAC key derivation
+    salt = os.urandom(SALT_SIZE)
+    return encryptWithKey(content, deriveKey(password, salt), salt, username)
+
+def deriveKey(password: str, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
+    """Derive the AES key from a password using PBKDF2HMAC
+
+    Args:
+        password (str): password to derive the key from
+        salt (bytes): salt stored in front of the encrypted file
+        iterations (int): PBKDF2 iterations, files record the count they were written with
+
+    Returns:
+        bytes: 32 byte key
+    """
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100000,
+        iterations=iterations,
         backend=default_backend()
     )
-    key = kdf.derive(password.encode())
+    return kdf.derive(password.encode())
 
-    # Create an AES cipher with CBC mode
+def deriveSubkey(key: bytes|bytearray, info: bytes) -> bytes:
+    """Derive a separate key for another purpose from the vault key using HKDF
+
+    Args:
+        key (bytes|bytearray): key derived with deriveKey
+        info (bytes): name of the purpose the key is used for
+
+    Returns:
+        bytes: 32 byte key
+    """
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=info,
+        backend=default_backend()
+    )
+    return hkdf.derive(bytes(key))
+
+def readSalt(username: str) -> bytes|None:
+    """Read the salt of the users encrypted file
+
+    Args:
+        username (str): username for the file
+
+    Returns:
+        bytes|None: the salt, None if the file is missing or holds no salt yet
+    """
+    filePath = f'resources/{username}_entries.enc'
     try:
-        cipher = Cipher(algorithms.AES(key), modes.CBC(initializationVector), backend=default_backend())
-    except ValueError:
-        return ""
-    # Decrypt the encrypted data
-    decryptor = cipher.decryptor()
-    decryptedContent = decryptor.update(encryptedData)
+        with open(filePath, 'rb') as file:
+            salt = file.read(SALT_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(salt) < SALT_SIZE:
+        return None
+    return salt
+
+def decryptWithKey(key: bytes|bytearray, username: str) -> str:
+    """Decrypt the content of a file with an already derived key
+
+    Args:
+        key (bytes|bytearray): key derived with deriveKey
+        username (str): username for the file to decrypt
 
+    Returns:
+        str: decrypted content
+    """
+    # Read the encrypted content from the file
+    filePath = f'resources/{username}_entries.enc'
     try:
-        decryptedContent += decryptor.finalize()
-    except ValueError:
+        with open(filePath, 'rb') as file:
+            encryptedContent = bytearray(os.fstat(file.fileno()).st_size)
+            file.readinto(encryptedContent)
+    except FileNotFoundError:
         return ""
 
-    # Create an unpadder with PKCS7 padding scheme
-    unpadder = padding.PKCS7(128).unpadder()
-    # Unpad the decrypted content
+    # The salt is in front of the IV and the actual encrypted data, the plaintext is only decoded once from the buffer
+    buffer = bytearray(len(encryptedContent))
     try:
-        unpaddedContent = unpadder.update(decryptedContent) + unpadder.finalize()
-    except ValueError:
+        return str(decryptInto(memoryview(encryptedContent)[SALT_SIZE:], key, buffer), 'utf-8')
+    except (ValueError, UnicodeDecodeError):
         return ""
+    finally:
+        wipeBuffer(buffer)
 
-    # Return the decrypted content
-    return unpaddedContent.decode()
-
-def encryptContent(content: str, password: str, username: str) -> bool:
-    """Encrypts the content and writes it to a file
+def encryptWithKey(content: str, key: bytes|bytearray, salt: bytes, username: str) -> bool:
+    """Encrypts the content with an already derived key and writes it to a file
 
     Args:
         content (str): content to encrypt
-        password (str): password to encrypt the content
+        key (bytes|bytearray): key derived from the password and salt
+        salt (bytes): salt the key was derived with
         username (str): username for the file to encrypt
 
     Returns:
         bool: True if the file was written successfully, False otherwise
     """
-    # Generate a salt for PBKDF2HMAC key derivation
-    salt = os.urandom(16)
+    encryptedContent = encryptBytes(content.encode(), key)
 
-    # Derive a key from the password using PBKDF2HMAC
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=default_backend()
-    )
-    key = kdf.derive(password.encode())
+    # Write the salt, IV, and encrypted content to the file, a crash leaves the old file intact
+    filePath = f'resources/{username}_entries.enc'
+    try:
+        writeAtomic(filePath, salt + encryptedContent)
+        return True
+    except FileNotFoundError:
+        return False
+
+def decryptInto(encryptedContent: bytes|bytearray|memoryview, key: bytes|bytearray, buffer: bytearray) -> memoryview:
+    """Decrypt data written by encryptBytes into a preallocated buffer, the plaintext is written once and unpadded by slicing
+
+    Args:
+        encryptedContent (bytes|bytearray|memoryview): IV followed by the encrypted data
+        key (bytes|bytearray): key derived with deriveKey
+        buffer (bytearray): buffer for the plaintext, at least as long as the encrypted content, it can be reused
+
+    Raises:
+        ValueError: if the data can't be decrypted with the key, the buffer is wiped then
+
+    Returns:
+        memoryview: the plaintext inside the buffer, wipe the buffer with wipeBuffer once it is no longer needed
+    """
+    view = memoryview(encryptedContent)
+    # The IV is followed by the actual encrypted data
+    encryptedData = view[16:]
+    if not encryptedData or len(encryptedData) % 16 or len(buffer) < len(view):
+        raise ValueError("Invalid encrypted content")
+    cipher = Cipher(algorithms.AES(key), modes.CBC(bytes(view[:16])), backend=default_backend())
+    decryptor = cipher.decryptor()
+    length = decryptor.update_into(encryptedData, buffer)
+    decryptor.finalize()
+
+    # Check the PKCS7 padding and cut it off without copying the plaintext
+    paddingLength = buffer[length - 1]
+    if not 1 <= paddingLength <= 16 or buffer.count(paddingLength, length - paddingLength, length) != paddingLength:
+        wipeBuffer(buffer)
+        raise ValueError("Invalid padding bytes.")
+    return memoryview(buffer)[:length - paddingLength]
 
-    # Generate a random IV
+def encryptBytes(content: bytes, key: bytes|bytearray) -> bytes:
+    """Encrypt data with AES-CBC and a fresh IV
+
+    Args:
+        content (bytes): data to encrypt
+        key (bytes|bytearray): key derived with deriveKey
+
+    Returns:
+        bytes: IV followed by the encrypted data
+    """
+    # Generate a random IV, a new one is needed for every write
     initializationVector = os.urandom(16)
     # Create an AES cipher with CBC mode
     cipher = Cipher(algorithms.AES(key), modes.CBC(initializationVector), backend=default_backend())
@@ -99,16 +203,65 @@ def encryptContent(content: str, password: str, username: str) -> bool:
 
     # Pad the content using PKCS7 padding scheme
     padder = padding.PKCS7(128).padder()
-    paddedData = padder.update(content.encode()) + padder.finalize()
+    paddedData = padder.update(content) + padder.finalize()
 
     # Encrypt the padded data
-    encryptedContent = encryptor.update(paddedData) + encryptor.finalize()
+    return initializationVector + encryptor.update(paddedData) + encryptor.finalize()
 
-    # Write the salt, IV, and encrypted content to the file
-    filePath = f'resources/{username}_entries.enc'
+def encryptAead(content: bytes, key: bytes|bytearray, associatedData: bytes) -> bytes:
+    """Encrypt and authenticate data with AES-GCM and a fresh nonce
+
+    Args:
+        content (bytes): data to encrypt
+        key (bytes|bytearray): key derived with deriveKey
+        associatedData (bytes): data that is authenticated but not encrypted, e.g. the file header
+
+    Returns:
+        bytes: nonce followed by the encrypted data and the tag
+    """
+    nonce = os.urandom(NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, content, associatedData)
+
+def decryptAeadInto(encryptedContent: bytes|bytearray|memoryview, key: bytes|bytearray, associatedData: bytes,
+                    buffer: bytearray) -> memoryview:
+    """Decrypt data written by encryptAead into a preallocated buffer
+
+    Args:
+        encryptedContent (bytes|bytearray|memoryview): nonce followed by the encrypted data and the tag
+        key (bytes|bytearray): key derived with deriveKey
+        associatedData (bytes): the associated data used for encryption
+        buffer (bytearray): buffer for the plaintext, at least as long as the encrypted content, it can be reused
+
+    Raises:
+        ValueError: if the key is wrong or the data or associated data was changed, the buffer is wiped then
+
+    Returns:
+        memoryview: the plaintext inside the buffer, wipe the buffer with wipeBuffer once it is no longer needed
+    """
+    view = memoryview(encryptedContent)
+    if len(view) < NONCE_SIZE + 16 or len(buffer) < len(view):
+        raise ValueError("Invalid encrypted content")
+    cipher = Cipher(algorithms.AES(key), modes.GCM(bytes(view[:NONCE_SIZE]), bytes(view[-16:])), backend=default_backend())
+    decryptor = cipher.decryptor()
+    decryptor.authenticate_additional_data(associatedData)
+    length = decryptor.update_into(view[NONCE_SIZE:-16], buffer)
     try:
-        with open(filePath, 'wb') as file:
-            file.write(salt + initializationVector + encryptedContent)
-        return True
-    except FileNotFoundError:
-        return False
+        decryptor.finalize()
+    except InvalidTag:
+        # The plaintext was written before the tag was checked
+        wipeBuffer(buffer)
+        raise ValueError("Invalid key or encrypted content") from None
+    return memoryview(buffer)[:length]
+
+def wipeBuffer(buffer: bytearray|memoryview) -> None:
+    """Overwrite a buffer that held plaintext or key material with zeros
+
+    Args:
+        buffer (bytearray|memoryview): buffer or the part of a buffer to wipe
+    """
+    if not buffer:
+        return
+    # memset writes the zeros in place, assigning a zero-filled bytes object would allocate a buffer of the same size
+    window = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+    ctypes.memset(window, 0, len(buffer))
+    del window
@@ -1,40 +1,266 @@
 """ This module is responsible for managing the user's entries on disk """
 import json
 import os
+from typing import Iterator
 from entry import entry
-from cryptographyManager import decryptContent, encryptContent
+from journal import ADD, EDIT, DELETE, JOURNAL_KEY_INFO, JOURNAL_LIMIT, appendChanges, readChanges, clearJournal, getJournalSize
+from entryCodec import entryFromValues, parseLegacyEntries
+from vaultFormat import CHUNK_SIZE, COMPRESSION_NONE, COMPRESSION_LEVEL, vaultHeader, getVaultPath, readHeader, readIndex, \
+    readRecord, iterRecords, writeVault
+from vaultLock import vaultLock, vaultConflictError
+from vaultSession import vaultSession
+from vault import vault
 
 def saveToDisk(user: str, password :str, userEntries: list) -> bool:
     """
     Save the user's entries to disk
     """
     filename = f"resources/{user}_entries.enc"
-    if os.path.exists(filename):
-        return bool(encryptContent(str([entry.__dict__ for entry in userEntries]), password, user))
-    return False
+    if not os.path.exists(filename):
+        return False
+    session = vaultSession(user)
+    if not session.unlock(password):
+        return False
+    saved = saveSessionToDisk(session, userEntries)
+    session.lock()
+    return saved
 
 def loadFromDisk(user: str, password : str) -> list:
     """
     Load the user's entries from disk
     """
-    userEntries = []
     filename = f"resources/{user}_entries.enc"
-    if os.path.exists(filename):
-        try:
-            decryptedEntries = decryptContent(password,user)
-            contents = json.loads(decryptedEntries.replace("'", "\""))
-            for value in contents:
-                website = value["website"]
-                password = value["password"]
-                username = value["username"]
-                notes = value["notes"]
-                oldPasswords = value["oldPasswords"]
-                timestamps = value["timestamps"]
-                userEntries.append(entry(website, password, username, timestamps, notes, oldPasswords))
-        except json.JSONDecodeError:
-            pass
+    if not os.path.exists(filename):
+        return []
+    session = vaultSession(user)
+    if not session.unlock(password):
+        return []
+    userEntries = loadSessionFromDisk(session)
+    session.lock()
+    return userEntries
+
+def saveSessionToDisk(session: vaultSession, userEntries: list, compression: int|None = None, level: int = COMPRESSION_LEVEL) -> bool:
+    """
+    Save the user's entries to disk with the key of an unlocked session
+    This writes a new snapshot, the changes in the journal are part of it afterwards
+
+    Parameters:
+    - session: The unlocked vault session of the user.
+    - userEntries: A list of the users entries.
+    - compression: The compression of the new snapshot, None keeps the compression of the file.
+    - level: The compression level, only used together with compression.
+
+    Raises:
+    - vaultConflictError: if another session saved since the session loaded the entries.
+    - ValueError: if the compression or its level is unknown.
+    """
+    filename = f"resources/{session.username}_entries.enc"
+    if not os.path.exists(filename):
+        return False
+    try:
+        with vaultLock(session.username, exclusive=True):
+            return _writeSnapshot(session, userEntries, _checkVersion(session), None if compression is None else (compression, level))
+    except vaultConflictError:
+        raise
+    except (RuntimeError, OSError):
+        return False
+
+def commitChanges(session: vaultSession, userEntries: list, changes: list) -> bool:
+    """
+    Append the changes to the user's journal instead of rewriting all entries
+    The journal is compacted into a new snapshot once it is larger than JOURNAL_LIMIT,
+    files written before the AES-GCM format are migrated to a new snapshot instead
+
+    Parameters:
+    - session: The unlocked vault session of the user.
+    - userEntries: A list of the users entries, including the changes.
+    - changes: List of (operation, website, changedEntry) tuples, website is the name before the change.
+
+    Raises:
+    - vaultConflictError: if another session saved since the session loaded the entries.
+    """
+    filename = f"resources/{session.username}_entries.enc"
+    if not os.path.exists(filename):
+        return False
+    try:
+        with vaultLock(session.username, exclusive=True):
+            header = _checkVersion(session)
+            if header is None or header.version < 2:
+                return _writeSnapshot(session, userEntries, header)
+            journalSize = appendChanges(session.username, session.subkey(JOURNAL_KEY_INFO), header.snapshotId, changes)
+            session.loadedVersion = (header.generation, journalSize)
+            if journalSize > JOURNAL_LIMIT:
+                return _writeSnapshot(session, userEntries, header)
+            return True
+    except vaultConflictError:
+        raise
+    except (RuntimeError, OSError):
+        return False
+
+def _checkVersion(session: vaultSession) -> vaultHeader|None:
+    """
+    Read the header of the user's file and check that nobody saved since the session loaded the entries,
+    the lock has to be held by the caller
+    """
+    header = readHeader(session.username)
+    currentVersion = (header.generation if header else 0, getJournalSize(session.username))
+    if session.loadedVersion is not None and session.loadedVersion != currentVersion:
+        raise vaultConflictError("The vault was changed by another session, reload the entries")
+    return header
+
+def _writeSnapshot(session: vaultSession, userEntries: list, header: vaultHeader|None, compression: tuple|None = None) -> bool:
+    generation = (header.generation if header else 0) + 1
+    # Snapshots keep the compression the user chose for the file
+    compression = compression or ((header.compression, header.level) if header else (COMPRESSION_NONE, COMPRESSION_LEVEL))
+    if not writeVault(session.username, session.useKey(), session.salt, userEntries, session.iterations, generation, *compression):
+        return False
+    clearJournal(session.username)
+    session.loadedVersion = (generation, 0)
+    return True
+
+def loadSessionFromDisk(session: vaultSession) -> list:
+    """
+    Load the user's entries from disk with the key of an unlocked session
+
+    Raises:
+    - ValueError: if an entry can't be decrypted, none of the entries are returned then.
+    """
+    return list(iterSessionFromDisk(session))
+
+def iterSessionFromDisk(session: vaultSession) -> Iterator[entry]:
+    """
+    Load the user's entries from disk one at a time, the first entries are available before the rest is decrypted
+    Saves of other sessions wait until all entries are loaded
+
+    Raises:
+    - ValueError: if an entry can't be decrypted, the entries loaded so far must not be saved as the whole vault.
+    """
+    with vaultLock(session.username):
+        header = readHeader(session.username)
+        if header is None or header.version == 0:
+            snapshot = None
+            userEntries = _loadLegacyEntries(session, header)
+        else:
+            snapshot = _openSnapshot(session, header)
+            userEntries = []
+    yield from userEntries
+    if snapshot is None:
+        return
+    vaultFile, index, changes = snapshot
+    changedWebsites = {website for _, website, _ in changes} | {changed.website for _, _, changed in changes if changed is not None}
+    changedEntries: list = []
+    replayChanges(changedEntries, changes)
+    with vaultFile:
+        for _entry in iterRecords(session.username, session.useKey(), index, vaultFile):
+            if _entry.website not in changedWebsites:
+                yield _entry
+    yield from changedEntries
+
+def _loadLegacyEntries(session: vaultSession, header: vaultHeader|None) -> list:
+    """
+    Load the entries of a file written before the indexed format, it holds one encrypted list and is migrated on the next save
+    """
+    if header is None:
+        session.loadedVersion = (0, getJournalSize(session.username))
+        return []
+    decryptedEntries = session.decrypt()
+    userEntries = _parseEntries(decryptedEntries)
+    if decryptedEntries:
+        replayChanges(userEntries, readChanges(session.username, session.subkey(JOURNAL_KEY_INFO), header.snapshotId))
+        session.loadedVersion = (header.generation, getJournalSize(session.username))
     return userEntries
 
+def _openSnapshot(session: vaultSession, header: vaultHeader) -> tuple|None:
+    """
+    Read the index and the journal of the user's file, the lock has to be held by the caller
+
+    Returns:
+    - (open file, index, changes) or None if the key doesn't match the file.
+      The records are read from the open file after the lock is released, it stays on this snapshot.
+    """
+    try:
+        index = readIndex(session.username, session.useKey())
+    except ValueError:
+        return None
+    # The journal is only read once the index proved that the key is right
+    changes = readChanges(session.username, session.subkey(JOURNAL_KEY_INFO), header.snapshotId)
+    session.loadedVersion = (header.generation, getJournalSize(session.username))
+    return open(getVaultPath(session.username), "rb", buffering=CHUNK_SIZE), index, changes  # pylint: disable=R1732
+
+def loadEntryFromDisk(session: vaultSession, website: str) -> entry|None:
+    """
+    Load a single entry from disk without decrypting the other entries
+
+    Parameters:
+    - session: The unlocked vault session of the user.
+    - website: The website of the entry.
+
+    Returns:
+    - The entry or None if there is no entry for the website.
+    """
+    with vaultLock(session.username):
+        return _loadEntry(session, website)
+
+def _loadEntry(session: vaultSession, website: str) -> entry|None:
+    header = readHeader(session.username)
+    if header is None or header.version == 0:
+        matches: list[entry] = [_entry for _entry in loadSessionFromDisk(session) if _entry.website == website]
+        return matches[0] if matches else None
+    try:
+        index = readIndex(session.username, session.useKey())
+    except ValueError:
+        return None
+    # Newer changes in the journal win over the snapshot
+    changes = readChanges(session.username, session.subkey(JOURNAL_KEY_INFO), header.snapshotId)
+    changedEntry: entry|None
+    for operation, changedWebsite, changedEntry in reversed(changes):
+        if changedEntry is not None and changedEntry.website == website and operation != DELETE:
+            return changedEntry
+        if changedWebsite == website:
+            return None
+    for indexedWebsite, _, offset, length in index:
+        if indexedWebsite == website:
+            return readRecord(session.username, session.useKey(), offset, length)
+    return None
+
+def replayChanges(userEntries: list, changes: list) -> None:
+    """
+    Apply the changes of the journal (or of a session that has to reload) to the entries of the snapshot
+    The entries touched by a change are moved to the end of the list
+    """
+    for operation, website, changedEntry in changes:
+        _entry = _findChanged(userEntries, website, changedEntry)
+        if _entry is not None:
+            userEntries.remove(_entry)
+        if operation in (ADD, EDIT):
+            userEntries.append(changedEntry)
+        elif operation != DELETE:
+            raise ValueError(f"Invalid journal operation {operation}")
+
+def _findChanged(userEntries: list, website: str, changedEntry: entry|None) -> entry|None:
+    """
+    Find the entry a change replaces, by the website before or after the change
+    """
+    if isinstance(userEntries, vault):
+        found = userEntries.get(website)
+        if found is None and changedEntry is not None:
+            found = userEntries.get(changedEntry.website)
+        return found
+    _entry: entry
+    for _entry in userEntries:
+        if _entry.website == website or (changedEntry is not None and _entry.website == changedEntry.website):
+            return _entry
+    return None
+
+def _parseEntries(decryptedEntries: str) -> list:
+    """
+    Parse the decrypted content of the user's file into entries
+    """
+    try:
+        return parseLegacyEntries(decryptedEntries)
+    except ValueError:
+        return []
+
 def createFile(user: str) -> bool:
     """
     Create a file for the user's entries
@@ -55,12 +281,7 @@ def loadEntryFromFile(filepath: str, userEntries: list) -> list:
         contents = json.load(file)
     try:
         for value in contents:
-            website = value["website"]
-            password = value["password"]
-            username = value["username"]
-            notes = value["notes"]
-            oldPasswords = value["oldPasswords"]
-            userEntries.append(entry(website, password, username, notes=notes, oldPasswords=oldPasswords))
+            userEntries.append(entryFromValues(value))
     except json.JSONDecodeError:
         raise ValueError("Invalid file format") from None
     return userEntries
@@ -77,6 +298,6 @@ def exportToDisk(user: str, userEntries: list) -> str:
     """
     filename = os.getcwd() + f"/resources/{user}_exports.json"
     with open(filename, "w", encoding="utf-8") as file:
-        json.dump([entry.__dict__ for entry in userEntries], file, indent=4)
+        json.dump([entry.toDict() for entry in userEntries], file, indent=4)
     return filename
          
\ No newline at end of file
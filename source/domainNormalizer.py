@@ -0,0 +1,120 @@
+""" This module reduces URLs and website names to the domain they belong to, using the rules of the Public Suffix List """
+import ipaddress
+import os
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+SUFFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "publicSuffixes.dat")
+# Characters that only appear in URLs, names without them are already a host name
+_URL_CHARACTERS = frozenset(":/?#@[]\\")
+
+def normalizeHost(url: str) -> str:
+    """
+    Reduce a URL or website name to its host name: the scheme, user, port, path, case and a leading "www." are dropped
+
+    Parameters:
+    - url: A URL like "https://www.GitHub.com/login" or a plain name like "github.com" or "My Bank".
+
+    Returns:
+    - The host name, e.g. "github.com". Names that are no URL are only lowercased and stripped.
+    """
+    text = url.strip().lower()
+    if _URL_CHARACTERS.isdisjoint(text):
+        host = text.rstrip(".")
+        return host[4:] if host.startswith("www.") else host
+    try:
+        host = urlsplit(text if "://" in text else "//" + text).hostname or ""
+    except ValueError:
+        host = ""
+    if not host:
+        return text
+    host = host.rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+def registrableDomain(host: str) -> str:
+    """
+    Reduce a host name to the domain that can be registered, the public suffix and the label in front of it
+
+    Parameters:
+    - host: A host name returned by normalizeHost.
+
+    Returns:
+    - The registrable domain, e.g. "github.com" for "gist.github.com" or "bbc.co.uk" for "news.bbc.co.uk".
+      IP addresses, names without a dot and public suffixes themselves are returned unchanged.
+    """
+    if "." not in host or _isIpAddress(host):
+        return host
+    labels = host.split(".")
+    suffixLength = _publicSuffixLength(labels)
+    if suffixLength >= len(labels):
+        return host
+    return ".".join(labels[-suffixLength - 1:])
+
+def normalizeDomain(url: str) -> str:
+    """
+    Reduce a URL or website name to its registrable domain, "https://www.github.com/login" and "GitHub.com" give "github.com"
+
+    Parameters:
+    - url: A URL or a plain website name.
+
+    Returns:
+    - The registrable domain.
+    """
+    return registrableDomain(normalizeHost(url))
+
+def _publicSuffixLength(labels: list) -> int:
+    """
+    Returns the number of labels of the longest public suffix rule that matches, one if no rule matches
+    """
+    rules, wildcards, exceptions = _loadRules()
+    # The first match is the longest one, an exception is longer than the wildcard it belongs to
+    for start in range(len(labels)):
+        candidate = ".".join(labels[start:])
+        if candidate in exceptions:
+            return len(labels) - start - 1
+        if candidate in rules:
+            return len(labels) - start
+        if start + 1 < len(labels) and ".".join(labels[start + 1:]) in wildcards:
+            return len(labels) - start
+    # Unknown top level domains are public suffixes themselves
+    return 1
+
+@lru_cache(maxsize=1)
+def _loadRules() -> tuple:
+    """
+    Reads the rules of the bundled suffix file once
+
+    Returns:
+    - (rules, wildcards, exceptions) as sets, wildcards without their "*." and exceptions without their "!".
+    """
+    rules: set = set()
+    wildcards: set = set()
+    exceptions: set = set()
+    try:
+        with open(SUFFIX_FILE, "r", encoding="utf-8") as file:
+            for line in file:
+                rule = line.split()[0] if line.split() else ""
+                if not rule or rule.startswith("//"):
+                    continue
+                if rule.startswith("!"):
+                    exceptions.add(rule[1:])
+                elif rule.startswith("*."):
+                    wildcards.add(rule[2:])
+                else:
+                    rules.add(rule)
+    except FileNotFoundError:
+        # Without the file every top level domain is treated as the suffix
+        pass
+    return rules, wildcards, exceptions
+
+def _isIpAddress(host: str) -> bool:
+    # Parsing is slow, only IPv4 addresses end with a number and only IPv6 addresses contain colons
+    if not host.rpartition(".")[2].isdigit() and ":" not in host:
+        return False
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
@@ -1,20 +1,46 @@
 """ This Model contains the entry class """
+import sys
 import time
+from array import array
+from typing import Iterable
 
 class entry:
-    """ This class represents an entry in the password manager """
-    #suppressed the warning for the following method because [] is not equal to [""]
-    #pylint: disable=W0102
-    def __init__(self, website: str, password: str, username: str, timestmaps: list = [float(0)], notes: str = "", oldPasswords: list = [""]) -> None:
-        self.website = website
+    """
+    This class represents an entry in the password manager
+    The fields are slots and the timestamps a packed array of doubles, so a large vault takes far less memory.
+    Usernames and websites are interned, the many entries of the same username share one string.
+    The container that indexes the entry by its website is kept in _owner, it is told when the website changes.
+    """
+    __slots__ = ("website", "password", "username", "notes", "oldPasswords", "timestamps", "_owner")
+
+    def __init__(self, website: str, password: str, username: str, timestmaps: Iterable[float]|None = None, notes: str = "",
+                 oldPasswords: list|None = None) -> None:
+        self.website = sys.intern(website)
         self.password = password
-        self.username = username
+        self.username = sys.intern(username)
         self.notes = notes
-        self.oldPasswords = oldPasswords
-        if timestmaps == [float(0)]:
-            self.timestamps = [time.time()]
-        else:
-            self.timestamps = timestmaps
+        # New entries get an empty placeholder for the old passwords, a fresh list each so they don't share one
+        self.oldPasswords = [""] if oldPasswords is None else oldPasswords
+        self.timestamps = array("d", () if timestmaps is None else timestmaps)
+        # [0.0] was the default of older versions and stands for the time the entry is created
+        if not self.timestamps or len(self.timestamps) == 1 and self.timestamps[0] == float(0):
+            self.timestamps = array("d", [time.time()])
+        self._owner: object = None
+
+    def toDict(self) -> dict:
+        """returns the stored values of the entry, the form entries are exported and serialized in
+
+        Returns:
+            dict: the website, password, username, notes, oldPasswords and timestamps of the entry
+        """
+        return {
+            "website": self.website,
+            "password": self.password,
+            "username": self.username,
+            "notes": self.notes,
+            "oldPasswords": self.oldPasswords,
+            "timestamps": self.timestamps.tolist(),
+        }
 
     def updatePassword(self, password: str) -> bool:
         """updates the password of the entry
@@ -33,7 +59,8 @@ class entry:
         except TypeError:
             self.oldPasswords = []
         self.oldPasswords.append(self.password)
-        self.oldPasswords.remove("")
+        if "" in self.oldPasswords:
+            self.oldPasswords.remove("")
         self.password = password
         self.timestamps.append(time.time())
         return True
@@ -50,7 +77,7 @@ class entry:
         """
         if self.username == username:
             return False
-        self.username = username
+        self.username = sys.intern(username)
         self.timestamps.append(time.time())
         return True
 
@@ -82,10 +109,33 @@ class entry:
         """
         if self.website == website:
             return False
-        self.website = website
+        oldWebsite = self.website
+        self.website = sys.intern(website)
         self.timestamps.append(time.time())
+        if self._owner is not None:
+            self._owner.websiteChanged(self, oldWebsite) # type: ignore[attr-defined]
         return True
 
+    def setOwner(self, owner: object) -> None:
+        """
+        Sets the container that has to be told when the website of the entry changes
+
+        Args:
+            owner (object): the container the entry was added to, it needs a websiteChanged(userEntry, oldWebsite) method
+        """
+        self._owner = owner
+
+    def clearOwner(self, owner: object) -> None:
+        """
+        Clears the container after the entry was removed from it, another owner of the entry is kept
+
+        Args:
+            owner (object): the container the entry was removed from
+        """
+        # Containers compare by content, only the same one is cleared
+        if self._owner is owner:
+            self._owner = None
+
     def getLastEditTime(self) -> str:
         return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.timestamps[-1]))
 
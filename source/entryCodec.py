@@ -0,0 +1,181 @@
+"""
+This module contains the versioned binary encoding of entries.
+
+Every payload starts with FORMAT_HEADER (magic and version) and stores its entries column by column:
+the number of old passwords and timestamps of every entry, the lengths of all strings,
+all strings as one UTF-8 block and all timestamps as packed doubles.
+The string lengths are counted in characters, so the block is decoded at once and then sliced,
+a payload is read in a single pass without rewriting any strings.
+"""
+import ast
+import itertools
+import struct
+
+from entry import entry
+
+FORMAT_VERSION = 1
+FORMAT_HEADER = b"PPE" + bytes([FORMAT_VERSION])
+_COUNT = struct.Struct("<I")
+_PAYLOAD_HEADER = struct.Struct("<IIII")
+
+def encodeEntry(entryO: entry) -> bytes:
+    """
+    Encode a single entry with the format header
+    """
+    return encodeEntries([entryO])
+
+def decodeEntry(data: bytes|memoryview) -> entry:
+    """
+    Decode a single entry written by encodeEntry
+
+    Raises:
+    - ValueError: if the data isn't an encoded entry.
+    """
+    decoded: list[entry] = decodeEntries(data)
+    if len(decoded) != 1:
+        raise ValueError("Invalid entry format")
+    return decoded[0]
+
+def encodeEntries(userEntries: list) -> bytes:
+    """
+    Encode a list of entries with the format header
+    """
+    counts: list[int] = []
+    strings: list[str] = []
+    timestamps: list[float] = []
+    for entryO in userEntries:
+        oldPasswords = entryO.oldPasswords or []
+        counts.append(len(oldPasswords))
+        counts.append(len(entryO.timestamps))
+        strings += (entryO.website, entryO.password, entryO.username, entryO.notes)
+        strings += oldPasswords
+        timestamps += entryO.timestamps
+    block = "".join(strings).encode()
+    return b"".join([
+        FORMAT_HEADER,
+        _PAYLOAD_HEADER.pack(len(userEntries), len(strings), len(block), len(timestamps)),
+        struct.pack(f"<{len(counts)}I", *counts),
+        struct.pack(f"<{len(strings)}I", *map(len, strings)),
+        block,
+        struct.pack(f"<{len(timestamps)}d", *timestamps),
+    ])
+
+def decodeEntries(data: bytes|memoryview) -> list:
+    """
+    Decode a list of entries written by encodeEntries
+
+    Raises:
+    - ValueError: if the data isn't an encoded list of entries.
+    """
+    counts, strings, timestamps = _readColumns(_checkHeader(data))
+    userEntries = []
+    stringIdx = 0
+    timestampIdx = 0
+    for idx in range(len(counts) // 2):
+        oldCount = counts[2 * idx]
+        timestampEnd = timestampIdx + counts[2 * idx + 1]
+        website, password, username, notes = strings[stringIdx:stringIdx + 4]
+        oldPasswords = strings[stringIdx + 4:stringIdx + 4 + oldCount]
+        userEntries.append(entry(website, password, username, timestamps[timestampIdx:timestampEnd], notes, oldPasswords))
+        stringIdx += 4 + oldCount
+        timestampIdx = timestampEnd
+    return userEntries
+
+def isEncoded(data: bytes|memoryview) -> bool:
+    """
+    Check if the data starts with the format header, older payloads are JSON or Python literals
+    """
+    return bytes(data[:len(FORMAT_HEADER) - 1]) == FORMAT_HEADER[:-1]
+
+def parseLegacyEntries(content: str) -> list:
+    """
+    Parse the list of entry dicts written by older versions with str()
+
+    Raises:
+    - ValueError: if the content isn't a list of entry dicts.
+    """
+    try:
+        values = ast.literal_eval(content)
+    except (SyntaxError, MemoryError, RecursionError) as error:
+        raise ValueError("Invalid file format") from error
+    if not isinstance(values, list):
+        raise ValueError("Invalid file format")
+    try:
+        return [entryFromValues(value) for value in values]
+    except (KeyError, TypeError) as error:
+        raise ValueError("Invalid file format") from error
+
+def entryFromValues(value: dict) -> entry:
+    """
+    Create an entry from its stored values, entries without timestamps (e.g. written by hand) get the current time
+    """
+    website = value["website"]
+    password = value["password"]
+    username = value["username"]
+    notes = value["notes"]
+    oldPasswords = value["oldPasswords"]
+    timestamps = value.get("timestamps")
+    return entry(website, password, username, timestamps, notes, oldPasswords)
+
+def writeString(buffer: bytearray, value: str) -> None:
+    """
+    Append a length prefixed UTF-8 string to the buffer
+    """
+    encoded = value.encode()
+    buffer += _COUNT.pack(len(encoded))
+    buffer += encoded
+
+def readString(view: memoryview, offset: int) -> tuple:
+    """
+    Read a string written by writeString
+
+    Returns:
+    - (value, offset after the string)
+    """
+    length, offset = _readCount(view, offset)
+    end = offset + length
+    if end > len(view):
+        raise ValueError("Invalid entry format")
+    try:
+        return str(view[offset:end], "utf-8"), end
+    except UnicodeDecodeError as error:
+        raise ValueError("Invalid entry format") from error
+
+def _readColumns(view: memoryview) -> tuple:
+    """
+    Read the counts, strings and timestamps of all entries of a payload
+    """
+    offset = len(FORMAT_HEADER)
+    try:
+        count, stringCount, blockSize, timestampCount = _PAYLOAD_HEADER.unpack_from(view, offset)
+        offset += _PAYLOAD_HEADER.size
+        counts = struct.unpack_from(f"<{2 * count}I", view, offset)
+        offset += 2 * count * _COUNT.size
+        lengths = struct.unpack_from(f"<{stringCount}I", view, offset)
+        offset += stringCount * _COUNT.size
+        if offset + blockSize > len(view):
+            raise ValueError("Invalid entry format")
+        block = str(view[offset:offset + blockSize], "utf-8")
+        timestamps = struct.unpack_from(f"<{timestampCount}d", view, offset + blockSize)
+    except (struct.error, UnicodeDecodeError) as error:
+        raise ValueError("Invalid entry format") from error
+    ends = list(itertools.accumulate(lengths))
+    if (ends[-1] if ends else 0) != len(block) or sum(counts[::2]) + 4 * count != stringCount \
+            or sum(counts[1::2]) != timestampCount:
+        raise ValueError("Invalid entry format")
+    return counts, [block[start:end] for start, end in zip([0, *ends], ends)], timestamps
+
+def _readCount(view: memoryview, offset: int) -> tuple:
+    try:
+        (count,) = _COUNT.unpack_from(view, offset)
+    except struct.error as error:
+        raise ValueError("Invalid entry format") from error
+    return count, offset + _COUNT.size
+
+def _checkHeader(data: bytes|memoryview) -> memoryview:
+    view = memoryview(data)
+    if not isEncoded(view):
+        raise ValueError("Invalid entry format")
+    if view[len(FORMAT_HEADER) - 1] > FORMAT_VERSION:
+        raise ValueError(f"Entry format version {view[len(FORMAT_HEADER) - 1]} is newer than this program")
+    return view
@@ -0,0 +1,101 @@
+""" This module contains the base class of the indexes that map keys computed from the entries back to the entries """
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+from entry import entry
+
+class entryIndex(ABC):
+    """
+    Keeps the indexed entries by id and the keys every entry was posted under, so an entry can be removed or indexed again
+    after it changed. The entries are kept by id in the order they were added, they are only equal if their websites are.
+    Subclasses compute the keys of an entry and keep the postings.
+
+    Methods
+    -------
+    rebuild(userEntries: list) -> None
+        Indexes the entries from scratch
+    add(userEntry: entry) -> None
+        Indexes a new entry
+    update(userEntry: entry) -> None
+        Indexes an entry again after it changed
+    remove(userEntry: entry) -> None
+        Removes an entry from the index
+    """
+    def __init__(self) -> None:
+        # id of an entry -> the entry and the keys it was posted under
+        self._entries: dict = {}
+        self._keys: dict = {}
+
+    def rebuild(self, userEntries: list) -> None:
+        """
+        Indexes the entries from scratch, e.g. after they were reloaded
+
+        Parameters:
+        - userEntries: A list of the users entries.
+        """
+        self._entries.clear()
+        self._keys.clear()
+        self._clear()
+        for userEntry in userEntries:
+            self.add(userEntry)
+
+    def add(self, userEntry: entry) -> None:
+        """
+        Indexes a new entry, an entry that is already indexed is indexed again
+
+        Parameters:
+        - userEntry: The entry to index.
+        """
+        key = id(userEntry)
+        if key in self._entries:
+            self.remove(userEntry)
+        keys = self._keysOf(userEntry)
+        self._post(key, keys)
+        self._entries[key] = userEntry
+        self._keys[key] = keys
+
+    def update(self, userEntry: entry) -> None:
+        """
+        Indexes an entry again after it changed
+
+        Parameters:
+        - userEntry: The changed entry.
+        """
+        self.add(userEntry)
+
+    def remove(self, userEntry: entry) -> None:
+        """
+        Removes an entry from the index, unknown entries are ignored
+
+        Parameters:
+        - userEntry: The entry to remove.
+        """
+        key = id(userEntry)
+        if key not in self._entries:
+            return
+        self._unpost(key, self._keys.pop(key))
+        del self._entries[key]
+
+    @abstractmethod
+    def _keysOf(self, userEntry: entry) -> Iterable:
+        """
+        Returns the keys the entry is posted under
+        """
+
+    @abstractmethod
+    def _post(self, key: int, keys: Iterable) -> None:
+        """
+        Adds the id of an entry to the postings of its keys
+        """
+
+    @abstractmethod
+    def _unpost(self, key: int, keys: Iterable) -> None:
+        """
+        Removes the id of an entry from the postings of the keys it was posted under
+        """
+
+    @abstractmethod
+    def _clear(self) -> None:
+        """
+        Removes all postings
+        """
@@ -0,0 +1,214 @@
+"""
+This module parses search queries like `site:github user:alice notes:"2fa" -notes:old after:2024-01-01`
+into a predicate over the entries that is compiled once and can be run many times.
+
+Syntax, terms are separated by spaces and all of them have to match:
+- text: the website, username or notes contain the text, the password too if the index includes passwords
+- site:text, user:text, notes:text, password:text: only the named field contains the text
+- "some text": quotes allow spaces, \\" is a quote inside them
+- /regex/ or field:/regex/: the field matches the regular expression, (?i) ignores case
+- before:YYYY-MM-DD, after:YYYY-MM-DD: the last change of the entry was before that day or on or after it
+- -term: the term must not match
+Plain text is compared case-sensitively like findPasswordByPattern.
+"""
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from entry import entry
+from findPasswords import trigramIndex, TRIGRAM_LENGTH
+
+QUERY_CACHE_SIZE = 32  # queries whose results are kept until the index changes
+FIELDS = {
+    "site": ("website",),
+    "website": ("website",),
+    "user": ("username",),
+    "username": ("username",),
+    "notes": ("notes",),
+    "password": ("password",),
+}
+DATE_FIELDS = ("before", "after")
+_TEXT_FIELDS = ("website", "username", "notes")
+_TERM = re.compile(r'(-?)(?:([A-Za-z]+):)?("(?:[^"\\]|\\.)*"|/(?:[^/\\]|\\.)+/|[^\s"]+)(?=\s|$)')
+_ESCAPE = re.compile(r'\\(.)')
+
+class compiledQuery:
+    """
+    A parsed query, the terms are ordered so the cheap substring tests run before regular expressions and dates
+
+    Attributes
+    ----------
+    normalized: str
+        The query with its terms in a fixed order and spacing, queries that only differ in those are the same
+    terms: list
+        (negated, fields, kind, value) tuples, kind is "text", "regex", "before" or "after"
+
+    Methods
+    -------
+    matches(userEntry: entry) -> bool
+        Checks if an entry matches all terms
+    search(index: trigramIndex) -> list
+        Returns the matching entries of an index
+    """
+    def __init__(self, terms: list, includePasswords: bool) -> None:
+        self.includePasswords = includePasswords
+        self.terms = sorted(terms, key=lambda term: (("text", "regex", "before", "after").index(term[2]), term[1], term[3]))
+        self.normalized = " ".join(_formatTerm(term) for term in self.terms)
+        self._tests = [(negated, _compileTerm(fields, kind, value)) for negated, fields, kind, value in self.terms]
+
+    def matches(self, userEntry: entry) -> bool:
+        """
+        Checks if an entry matches all terms of the query
+
+        Parameters:
+        - userEntry: The entry to check.
+
+        Returns:
+        - True if every term matches, negated terms must not match.
+        """
+        return all(test(userEntry) != negated for negated, test in self._tests)
+
+    def search(self, index: trigramIndex) -> list:
+        """
+        Returns the entries of the index that match the query.
+        The longest text term that the index covers narrows the entries to the ones sharing its trigrams,
+        only those are checked against the whole query. Without such a term all entries are checked.
+
+        Parameters:
+        - index: The search index of the entries.
+
+        Returns:
+        - The matching entries in the order they were added to the index.
+        """
+        indexed = _TEXT_FIELDS + ("password",) if index.includePasswords else _TEXT_FIELDS
+        narrowing = [value for negated, fields, kind, value in self.terms
+                     if not negated and kind == "text" and len(value) >= TRIGRAM_LENGTH and set(fields) <= set(indexed)]
+        candidates: Iterable = index
+        if narrowing:
+            candidates = index.search(max(narrowing, key=len))
+        return [userEntry for userEntry in candidates if self.matches(userEntry)]
+
+class queryCache:
+    """
+    Compiles queries and keeps the results of the last QUERY_CACHE_SIZE queries until the index changes
+
+    Methods
+    -------
+    search(text: str) -> list
+        Returns the entries of the index that match the query
+    """
+    #pylint: disable=R0903
+    def __init__(self, index: trigramIndex, size: int = QUERY_CACHE_SIZE) -> None:
+        self.index = index
+        self.size = size
+        self._version = index.version
+        self._results: OrderedDict = OrderedDict()
+
+    def search(self, text: str) -> list:
+        """
+        Returns the entries of the index that match the query, a query that was run before on the same entries
+        is answered from the cache
+
+        Parameters:
+        - text: The query.
+
+        Raises:
+        - ValueError: If the query can't be parsed.
+
+        Returns:
+        - The matching entries in the order they were added to the index.
+        """
+        query = compileQuery(text, self.index.includePasswords)
+        if self._version != self.index.version:
+            self._results.clear()
+            self._version = self.index.version
+        key = (query.normalized, query.includePasswords)
+        if key in self._results:
+            self._results.move_to_end(key)
+            return list(self._results[key])
+        results = query.search(self.index)
+        self._results[key] = results
+        if len(self._results) > self.size:
+            self._results.popitem(last=False)
+        return list(results)
+
+def compileQuery(text: str, includePasswords: bool = False) -> compiledQuery:
+    """
+    Parses a query into a compiledQuery
+
+    Parameters:
+    - text: The query, see the module documentation for the syntax.
+    - includePasswords: True if plain text terms also look at the password.
+
+    Raises:
+    - ValueError: If a field is unknown, a date or regular expression is invalid or a quote isn't closed.
+
+    Returns:
+    - The compiled query, an empty query matches every entry.
+    """
+    terms = []
+    position = 0
+    while True:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            break
+        match = _TERM.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid query at: {text[position:]}")
+        terms.append(_parseTerm(match.group(1) == "-", match.group(2), match.group(3), includePasswords))
+        position = match.end()
+    return compiledQuery(terms, includePasswords)
+
+def _parseTerm(negated: bool, name: str|None, value: str, includePasswords: bool) -> tuple:
+    if name is not None and name.lower() in DATE_FIELDS:
+        try:
+            day = time.mktime(time.strptime(_unquote(value), "%Y-%m-%d"))
+        except ValueError:
+            raise ValueError(f"Invalid date: {value}, use YYYY-MM-DD") from None
+        return (negated, (), name.lower(), day)
+    if name is None:
+        fields = _TEXT_FIELDS + ("password",) if includePasswords else _TEXT_FIELDS
+    elif name.lower() in FIELDS:
+        fields = FIELDS[name.lower()]
+    else:
+        raise ValueError(f"Unknown field: {name}")
+    if len(value) > 2 and value.startswith("/") and value.endswith("/"):
+        pattern = value[1:-1].replace("\\/", "/")
+        try:
+            re.compile(pattern)
+        except re.error as error:
+            raise ValueError(f"Invalid regular expression: {error}") from None
+        return (negated, fields, "regex", pattern)
+    return (negated, fields, "text", _unquote(value))
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return _ESCAPE.sub(r"\1", value[1:-1])
+    return value
+
+def _compileTerm(fields: tuple, kind: str, value: str|float) -> Callable:
+    if isinstance(value, float):
+        day = value
+        if kind == "before":
+            return lambda userEntry: userEntry.timestamps[-1] < day
+        return lambda userEntry: userEntry.timestamps[-1] >= day
+    if kind == "regex":
+        search = re.compile(value).search
+        return lambda userEntry: any(search(getattr(userEntry, field)) for field in fields)
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda userEntry: value in getattr(userEntry, field)
+    return lambda userEntry: any(value in getattr(userEntry, field) for field in fields)
+
+def _formatTerm(term: tuple) -> str:
+    negated, fields, kind, value = term
+    prefix = "-" if negated else ""
+    if kind in DATE_FIELDS:
+        return f"{prefix}{kind}:{time.strftime('%Y-%m-%d', time.localtime(value))}"
+    name = "" if fields in (_TEXT_FIELDS, _TEXT_FIELDS + ("password",)) else fields[0] + ":"
+    if kind == "regex":
+        return f"{prefix}{name}/{value}/"
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'{prefix}{name}"{escaped}"'
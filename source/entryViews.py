@@ -0,0 +1,339 @@
+"""
+This module contains the curses screens that display the user's entries.
+
+Functions:
+- displayEntry: Display an entry in the terminal.
+- viewAllSites: Display the entries as a scrollable, sortable table.
+- liveSearch: Filters the entries while the pattern is typed.
+- viewAudit: Displays the findings of a vault audit.
+- terminalToSmall: Displays a message if the terminal is too small.
+"""
+import curses
+import sys
+from bisect import bisect_left
+
+from entry import entry
+from findPasswords import trigramIndex, incrementalSearch
+from vaultAudit import auditReport
+
+SEARCH_DEBOUNCE = 80  # milliseconds without a key before the live search redraws its results
+WEBSITE = "website"
+USERNAME = "username"
+LAST_EDIT = "last change"
+SORT_ORDERS = (WEBSITE, USERNAME, LAST_EDIT)
+
+class entryOrders:
+    """
+    The entries sorted by each column of the table, every order is sorted once and kept until the entries change.
+    A vault tells about changes through its version, other lists are taken as unchanged.
+
+    Methods
+    -------
+    get(sortBy: str|None) -> list
+        Returns the entries sorted by a column
+    jump(sortBy: str|None, letter: str, selected: int) -> int
+        Returns the position of the next entry that starts with the letter
+    """
+    def __init__(self, userEntries: list) -> None:
+        self.userEntries = userEntries
+        self._version = getattr(userEntries, "version", None)
+        # sortBy -> (sorted entries, their lowercase sort texts for the jump to a letter)
+        self._orders: dict = {}
+
+    def get(self, sortBy: str|None) -> list:
+        """
+        Returns the entries sorted by a column
+
+        Parameters:
+        - sortBy: WEBSITE, USERNAME or LAST_EDIT, None keeps the order of the list.
+
+        Returns:
+        - The sorted entries, the list is shared and must not be changed.
+        """
+        rows: list = self._order(sortBy)[0]
+        return rows
+
+    def jump(self, sortBy: str|None, letter: str, selected: int) -> int:
+        """
+        Returns the position of the next entry after the selected one whose sort text starts with the letter.
+        The first entry with the letter is found by bisection if the entries are sorted by that text.
+
+        Parameters:
+        - sortBy: The column the entries are sorted by.
+        - letter: The typed character, case is ignored.
+        - selected: The position of the selected entry.
+
+        Returns:
+        - The position of the entry, the selected position if no entry starts with the letter.
+        """
+        rows, texts = self._order(sortBy)
+        letter = letter.lower()
+        if sortBy in (WEBSITE, USERNAME):
+            start = bisect_left(texts, letter)
+            # Pressing the letter again moves on to the next entry with it
+            if start <= selected < len(texts) - 1 and texts[selected].startswith(letter) and texts[selected + 1].startswith(letter):
+                return selected + 1
+            return start if start < len(texts) and texts[start].startswith(letter) else selected
+        for step in range(1, len(rows) + 1):
+            position = (selected + step) % len(rows)
+            if texts[position].startswith(letter):
+                return position
+        return selected
+
+    def _order(self, sortBy: str|None) -> tuple:
+        version = getattr(self.userEntries, "version", None)
+        if version != self._version:
+            self._orders.clear()
+            self._version = version
+        order = self._orders.get(sortBy)
+        if order is None:
+            if sortBy == WEBSITE:
+                rows = sorted(self.userEntries, key=lambda userEntry: userEntry.website.lower())
+            elif sortBy == USERNAME:
+                rows = sorted(self.userEntries, key=lambda userEntry: (userEntry.username.lower(), userEntry.website.lower()))
+            elif sortBy == LAST_EDIT:
+                rows = sorted(self.userEntries, key=lambda userEntry: userEntry.timestamps[-1], reverse=True)
+            else:
+                rows = list(self.userEntries)
+            field = "username" if sortBy == USERNAME else "website"
+            order = (rows, [getattr(userEntry, field).lower() for userEntry in rows])
+            self._orders[sortBy] = order
+        return order
+
+
+def displayEntry(stdscr: curses.window, entryO: entry) -> None:
+    """
+    Display an entry in the terminal.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - entryO: The entry to display.
+    """
+    stdscr.clear()
+    stdscr.addstr(1, 0, f"Website: {entryO.website}")
+    stdscr.addstr(2, 0, f"Username: {entryO.username}")
+    stdscr.addstr(3, 0, f"Password: {entryO.password}")
+    stdscr.addstr(4, 0, f"Notes: {entryO.notes}")
+    stdscr.addstr(5, 0, f"Last changed: {entryO.getLastEditTime()}")
+    stdscr.addstr(6, 0, "-" * 50)
+
+def viewAllSites(stdscr :curses.window, userEntries: list, orders: entryOrders|None = None,
+                 sortBy: str|None = WEBSITE) -> None:
+    """
+    Display the entries as a table that only draws the visible rows.
+    Arrow keys and PgUp/PgDn move the selection, Home/End jump to the first or last entry, a letter jumps to the next entry
+    starting with it, Tab changes the column the entries are sorted by, Enter shows the entry and Esc returns.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - userEntries: A list of the users entries.
+    - orders: The sort orders of the entries, they are reused while the entries don't change.
+    - sortBy: The column to sort by first, None keeps the order of the list, e.g. the ranking of a search.
+    """
+    if len(userEntries) == 0:
+        stdscr.clear()
+        stdscr.addstr(1, 0, "No entries found.")
+        stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+        stdscr.refresh()
+        stdscr.getch()
+        return
+    if orders is None:
+        orders = entryOrders(userEntries)
+    columns = ([None] if sortBy is None else []) + list(SORT_ORDERS)
+    column = columns.index(sortBy)
+    selected = 0
+    while True:
+        rows = orders.get(columns[column])
+        # The entries can't change while the table is shown, the selection only moves within them
+        selected = min(selected, len(rows) - 1)
+        visibleRows = _drawTable(stdscr, rows, selected, columns[column])
+        key = stdscr.get_wch()
+        if key == "\x1b":
+            return
+        if key in ("\n", curses.KEY_ENTER):
+            displayEntry(stdscr, rows[selected])
+            stdscr.addstr(7, 0, "Press any key to return to the list.")
+            stdscr.refresh()
+            stdscr.getch()
+        elif key == "\t":
+            column = (column + 1) % len(columns)
+            selected = 0
+        elif isinstance(key, str) and key.isprintable():
+            selected = orders.jump(columns[column], key, selected)
+        else:
+            moves = {curses.KEY_UP: -1, curses.KEY_DOWN: 1, curses.KEY_PPAGE: -visibleRows, curses.KEY_NPAGE: visibleRows,
+                     curses.KEY_HOME: -len(rows), curses.KEY_END: len(rows)}
+            move = moves.get(key, 0) if isinstance(key, int) else 0
+            selected = max(0, min(selected + move, len(rows) - 1))
+
+def _drawTable(stdscr :curses.window, rows: list, selected: int, sortBy: str|None) -> int:
+    """
+    Draws the rows around the selected one, returns the number of rows that fit on the screen
+    """
+    height, width = stdscr.getmaxyx()
+    visibleRows = max(height - 3, 1)
+    # The selected row is kept in the middle of the screen while possible
+    first = max(min(selected - visibleRows // 2, len(rows) - visibleRows), 0)
+    websiteWidth = max((width - 22) * 3 // 5, 1)
+    usernameWidth = max(width - 22 - websiteWidth, 1)
+    try:
+        stdscr.erase()
+        header = f"{'Website':<{websiteWidth}} {'Username':<{usernameWidth}} Last changed"
+        stdscr.addstr(0, 0, header[:width - 1], curses.A_BOLD)
+        for row, _entry in enumerate(rows[first:first + visibleRows], 1):
+            line = (f"{_entry.website[:websiteWidth]:<{websiteWidth}} {_entry.username[:usernameWidth]:<{usernameWidth}} "
+                    f"{_entry.getLastEditTime()}")[:width - 1]
+            if first + row - 1 == selected:
+                stdscr.attron(curses.color_pair(1))
+                stdscr.addstr(row, 0, line)
+                stdscr.attroff(curses.color_pair(1))
+            else:
+                stdscr.addstr(row, 0, line)
+        status = (f"{selected + 1}/{len(rows)} sorted by {sortBy or 'relevance'}. "
+                  "Tab changes the sorting, a letter jumps to it, Enter shows the entry, Esc returns.")
+        stdscr.addstr(min(len(rows), visibleRows) + 2, 0, status[:width - 1])
+        stdscr.refresh()
+    except curses.error:
+        terminalToSmall(stdscr)
+    return visibleRows
+
+def liveSearch(stdscr :curses.window, index: trigramIndex) -> None:
+    """
+    Filters the entries while the pattern is typed, the results are redrawn once no key was pressed for a moment.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - index: The search index of the entries.
+    """
+    search = incrementalSearch(index)
+    query = ""
+    results = search.update(query)
+    selected = 0
+    changed = True
+    stdscr.timeout(SEARCH_DEBOUNCE)
+    try:
+        while True:
+            try:
+                key = stdscr.get_wch()
+            except curses.error:
+                # No key within the debounce time, draw what was typed so far
+                if changed:
+                    _drawSearch(stdscr, query, results, selected)
+                    changed = False
+                continue
+            changed = True
+            if key == "\x1b":
+                return
+            if key in ("\n", curses.KEY_ENTER):
+                if results:
+                    stdscr.timeout(-1)
+                    displayEntry(stdscr, results[selected])
+                    stdscr.addstr(7, 0, "Press any key to return to the search.")
+                    stdscr.refresh()
+                    stdscr.getch()
+                    stdscr.timeout(SEARCH_DEBOUNCE)
+            elif key == curses.KEY_UP:
+                selected = max(selected - 1, 0)
+            elif key == curses.KEY_DOWN:
+                selected = min(selected + 1, max(len(results) - 1, 0))
+            elif key in ("\x7f", "\b", curses.KEY_BACKSPACE):
+                query = query[:-1]
+                results = search.update(query)
+                selected = 0
+            elif isinstance(key, str) and key.isprintable():
+                query += key
+                results = search.update(query)
+                selected = 0
+    finally:
+        stdscr.timeout(-1)
+
+def _drawSearch(stdscr :curses.window, query: str, results: list, selected: int) -> None:
+    # erase instead of clear, clear repaints the whole terminal which is slow over SSH
+    try:
+        stdscr.erase()
+        height, width = stdscr.getmaxyx()
+        stdscr.addstr(0, 0, f"Search: {query}"[:width - 1])
+        stdscr.addstr(1, 0, f"{len(results)} found. Enter shows the entry, Esc returns to the manager menu."[:width - 1])
+        visibleRows = max(height - 3, 1)
+        first = max(selected - visibleRows + 1, 0)
+        for row, _entry in enumerate(results[first:first + visibleRows]):
+            line = f"{_entry.website} - {_entry.username}"[:width - 1]
+            if first + row == selected:
+                stdscr.attron(curses.color_pair(1))
+                stdscr.addstr(row + 2, 0, line)
+                stdscr.attroff(curses.color_pair(1))
+            else:
+                stdscr.addstr(row + 2, 0, line)
+        stdscr.refresh()
+    except curses.error:
+        terminalToSmall(stdscr)
+
+def viewAudit(stdscr :curses.window, report: auditReport) -> None:
+    """
+    Displays the findings of a vault audit as a list that scrolls with the arrow and page keys.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - report: The findings of auditVault.
+    """
+    lines = _auditLines(report)
+    first = 0
+    while True:
+        try:
+            stdscr.erase()
+            height, width = stdscr.getmaxyx()
+            visibleRows = max(height - 2, 1)
+            for row, line in enumerate(lines[first:first + visibleRows]):
+                stdscr.addstr(row, 0, line[:width - 1])
+            stdscr.addstr(min(len(lines), visibleRows) + 1, 0,
+                          "Use the arrow keys to scroll, press Enter to return to the manager menu."[:width - 1])
+            stdscr.refresh()
+        except curses.error:
+            terminalToSmall(stdscr)
+        key = stdscr.getch()
+        lastFirst = max(len(lines) - visibleRows, 0)
+        if key == curses.KEY_UP:
+            first = max(first - 1, 0)
+        elif key == curses.KEY_DOWN:
+            first = min(first + 1, lastFirst)
+        elif key == curses.KEY_PPAGE:
+            first = max(first - visibleRows, 0)
+        elif key == curses.KEY_NPAGE:
+            first = min(first + visibleRows, lastFirst)
+        elif key in (ord("\n"), 27):
+            return
+
+def _auditLines(report: auditReport) -> list:
+    if not report:
+        return ["No weak, reused, breached or stale passwords found."]
+    lines = [f"Weak passwords: {len(report.weak)}"]
+    lines += [f"  {_entry.website} - {_entry.username}" for _entry in report.weak]
+    lines.append(f"Reused passwords: {len(report.reused)}")
+    lines += [f"  {_entry.website} - also used by {', '.join(other.website for other in others)}"
+              for _entry, others in report.reused]
+    lines.append(f"Breached passwords: {len(report.breached)}")
+    lines += [f"  {_entry.website} - found {count} times" for _entry, count in report.breached]
+    lines.append(f"Stale passwords: {len(report.stale)}")
+    lines += [f"  {_entry.website} - last changed {_entry.getLastEditTime()}" for _entry in report.stale]
+    if report.unchecked:
+        lines.append(f"Not checked for breaches: {len(report.unchecked)}")
+        lines += [f"  {error}" for error in report.errors]
+    return lines
+
+def terminalToSmall(stdscr :curses.window) -> None:
+    """
+    Displays a message if the terminal is too small, the application exits if even the message doesn't fit.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    """
+    try:
+        stdscr.clear()
+        stdscr.addstr(1, 0, "Please resize the terminal to be larger.")
+        stdscr.addstr(2, 0, "Press any key to continue.")
+        stdscr.refresh()
+        stdscr.getch()
+    except curses.error:
+        with open("error.log", "w", encoding="utf-8") as errorLog:
+            print("Please resize the terminal to be larger and restart the application.\n", file=errorLog)
+        sys.exit(1)
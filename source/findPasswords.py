@@ -1,20 +1,307 @@
 """ This module contains functions to find passwords in the user's password manager """
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Iterable, Iterator
+
 from entry import entry
+from entryIndex import entryIndex
+from vault import vault
+from domainNormalizer import normalizeHost, registrableDomain
+
+TRIGRAM_LENGTH = 3
+_DENSE_RATIO = 8
+_SEPARATOR = b"\n"
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+class trigramIndex(entryIndex):
+    """
+    Inverted index from every three character substring of the website, username and notes to the entries containing it.
+    A pattern can only be in an entry that contains all trigrams of the pattern, so only those entries are checked.
+    Passwords are only indexed if the user opts in, otherwise a search doesn't look at them.
+
+    Methods
+    -------
+    rebuild(userEntries: list) -> None
+        Indexes the entries from scratch
+    add(userEntry: entry) -> None
+        Indexes a new entry
+    update(userEntry: entry) -> None
+        Indexes an entry again after it was edited
+    remove(userEntry: entry) -> None
+        Removes an entry from the index
+    search(pattern: str) -> list
+        Returns the entries that contain the pattern
+    fuzzySearch(pattern: str, maxDistance: int|None) -> list
+        Returns the entries whose website or username nearly contain the pattern, best matches first
+    """
+    def __init__(self, userEntries: list|None = None, includePasswords: bool = False) -> None:
+        super().__init__()
+        self.includePasswords = includePasswords
+        # Counts the changes of the index, results computed from it are valid while it stays the same
+        self.version = 0
+        self._postings: defaultdict = defaultdict(set)
+        # Search results keep the order in which the entries were added
+        self._order: dict = {}
+        self._nextOrder = 0
+        # Built on the first fuzzy search after a change
+        self._corpus: fuzzyCorpus|None = None
+        self.rebuild(userEntries or [])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[entry]:
+        return iter(list(self._entries.values()))
+
+    def search(self, pattern: str) -> list:
+        """
+        Returns the entries that contain the pattern in the website, username, notes or the indexed passwords
+
+        Parameters:
+        - pattern: The substring to look for.
+
+        Returns:
+        - The matching entries in the order they were added.
+        """
+        # Short patterns have no trigram, every entry has to be checked
+        ordered: Iterable = self._entries.values()
+        if len(pattern) >= TRIGRAM_LENGTH:
+            postings = []
+            for trigram in _trigramsOfText(pattern):
+                if trigram not in self._postings:
+                    return []
+                postings.append(self._postings[trigram])
+            postings.sort(key=len)
+            # If even the rarest trigram is in most entries, checking all of them is cheaper than intersecting
+            if len(postings[0]) * _DENSE_RATIO <= len(self._entries):
+                candidates = postings[0].intersection(*postings[1:])
+                ordered = [self._entries[key] for key in sorted(candidates, key=self._order.__getitem__)]
+        return [userEntry for userEntry in ordered if _matches(userEntry, pattern, self.includePasswords)]
+
+    def fuzzySearch(self, pattern: str, maxDistance: int|None = None) -> list:
+        """
+        Returns the entries whose website or username contain the pattern with at most maxDistance typos
+
+        Parameters:
+        - pattern: The text to look for, case is ignored.
+        - maxDistance: The most edits (insert, delete or replace a character) allowed, None allows one per three characters.
+
+        Returns:
+        - The matching entries, the ones with the fewest edits first.
+        """
+        if self._corpus is None:
+            self._corpus = fuzzyCorpus(self._entries.values())
+        return self._corpus.search(pattern, maxDistance)
+
+    def _post(self, key: int, keys: Iterable) -> None:
+        self._corpus = None
+        self.version += 1
+        postings = self._postings
+        for trigram in keys:
+            postings[trigram].add(key)
+        self._order[key] = self._nextOrder
+        self._nextOrder += 1
+
+    def _unpost(self, key: int, keys: Iterable) -> None:
+        self._corpus = None
+        self.version += 1
+        for trigram in keys:
+            postings = self._postings[trigram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[trigram]
+        del self._order[key]
+
+    def _clear(self) -> None:
+        self._postings.clear()
+        self._order.clear()
+        self._nextOrder = 0
+        self._corpus = None
+        self.version += 1
+
+    def _keysOf(self, userEntry: entry) -> set:
+        trigrams = _trigramsOfText(userEntry.website) | _trigramsOfText(userEntry.username) | _trigramsOfText(userEntry.notes)
+        if self.includePasswords:
+            trigrams |= _trigramsOfText(userEntry.password)
+        return trigrams
+
+class incrementalSearch:
+    """
+    Search-as-you-type over a trigramIndex. A query that extends the previous one only filters the previous results,
+    because every entry containing the longer query also contains the shorter one. The results of the shorter queries
+    are kept, so deleting characters doesn't search again either.
+
+    Methods
+    -------
+    update(query: str) -> list
+        Returns the entries that contain the query
+    """
+    #pylint: disable=R0903
+    def __init__(self, index: trigramIndex) -> None:
+        self.index = index
+        # (query, results) for the prefixes of the current query that were searched, shortest first
+        self._history: list = []
+
+    def update(self, query: str) -> list:
+        """
+        Returns the entries that contain the query, like trigramIndex.search
+
+        Parameters:
+        - query: The current text of the search field.
+
+        Returns:
+        - The matching entries in the order they were added to the index.
+        """
+        while self._history and not query.startswith(self._history[-1][0]):
+            self._history.pop()
+        if self._history and self._history[-1][0] == query:
+            return list(self._history[-1][1])
+        # Queries shorter than a trigram match most entries, the first query with a trigram goes through the index instead
+        if self._history and (len(self._history[-1][0]) >= TRIGRAM_LENGTH or len(query) < TRIGRAM_LENGTH):
+            results = [userEntry for userEntry in self._history[-1][1] if _matches(userEntry, query, self.index.includePasswords)]
+        else:
+            results = self.index.search(query)
+        self._history.append((query, results))
+        return list(results)
+
+class fuzzyCorpus:
+    """
+    The lowercased websites and usernames of the entries in one byte string, searched with the bitap algorithm of Wu and Manber.
+    The bit vectors span the whole string instead of the pattern, so every step of the algorithm handles all entries at once
+    in a single operation on a large int and the time grows with the length of the pattern instead of the number of entries.
+    Edits are counted in UTF-8 bytes, a typo in a non-ASCII character may count twice.
+
+    Methods
+    -------
+    search(pattern: str, maxDistance: int|None) -> list
+        Returns the entries that nearly contain the pattern, best matches first
+    """
+    #pylint: disable=R0903
+    def __init__(self, userEntries: Iterable) -> None:
+        self._entries = list(userEntries)
+        parts = []
+        self._starts = []
+        position = 0
+        for userEntry in self._entries:
+            for text in (userEntry.website, userEntry.username):
+                data = text.lower().encode().replace(_SEPARATOR, b" ")
+                self._starts.append(position)
+                parts.append(data + _SEPARATOR)
+                position += len(data) + 1
+        # Bit j of a vector stands for byte j of the text, int() reads the most significant bit first
+        self._reversed = b"".join(parts)[::-1]
+        self._all = (1 << position) - 1
+        # Bit vector of the bytes that are a certain character, built on the first search with it
+        self._masks: dict = {}
+        # A match may not consume a separator, so it can't run from one field into the next
+        self._valid = self._all & ~self._charMask(_SEPARATOR[0])
+
+    def search(self, pattern: str, maxDistance: int|None = None) -> list:
+        """
+        Returns the entries whose website or username contain the pattern with at most maxDistance edits
+
+        Parameters:
+        - pattern: The text to look for, case is ignored.
+        - maxDistance: The most edits allowed, None allows one per three characters.
+
+        Returns:
+        - The matching entries ranked by the number of edits, matches in the website before matches in the username.
+        """
+        data = pattern.lower().encode()
+        if not data or not self._entries:
+            return []
+        if maxDistance is None:
+            maxDistance = len(data) // 3
+        # With as many edits as characters every entry would match
+        maxDistance = max(0, min(maxDistance, len(data) - 1))
+        scores: dict = {}
+        matched = 0
+        for distance, ends in enumerate(self._matchEnds(data, maxDistance)):
+            # Adding a match end to the bytes of its field carries into the separator behind the field
+            fields = (self._valid + (ends & self._valid)) & ~self._valid & self._all
+            for position in self._bitPositions(fields & ~matched):
+                field = bisect_right(self._starts, position) - 1
+                # Fields are website, username for every entry, a lower score is a better match
+                scores.setdefault(field // 2, (distance, field % 2))
+            matched |= fields
+        ranked = sorted(scores, key=lambda entryIdx: (scores[entryIdx], entryIdx))
+        return [self._entries[entryIdx] for entryIdx in ranked]
+
+    def _matchEnds(self, data: bytes, maxDistance: int) -> list:
+        """
+        Returns a vector of the positions where a match of the pattern ends for every number of edits up to maxDistance,
+        each vector contains the one before
+        """
+        # rows[d] holds the ends of the pattern prefix handled so far with up to d edits, the empty prefix ends everywhere
+        rows = [self._all] * (maxDistance + 1)
+        for length, char in enumerate(data):
+            charMask = self._charMask(char)
+            previous = rows
+            # The prefix also ends in front of the first byte while all of it can be deleted, shifting sets bit 0 then
+            rows = [((previous[0] << 1) | (length == 0)) & charMask]
+            for distance in range(1, maxDistance + 1):
+                # Match, replace a character, insert a text character: each consumes a byte of the text
+                consumed = (((previous[distance] << 1) | (length <= distance)) & charMask
+                            | (previous[distance - 1] << 1) | (length <= distance - 1)
+                            | (rows[distance - 1] << 1) | (length < distance - 1)) & self._valid
+                # Delete a pattern character: the prefix ends where the shorter prefix ended
+                rows.append(consumed | previous[distance - 1])
+            if not rows[-1]:
+                return rows
+        return rows
+
+    def _charMask(self, char: int) -> int:
+        mask = self._masks.get(char)
+        if mask is None:
+            table = bytearray(b"0" * 256)
+            table[char] = ord("1")
+            mask = int(self._reversed.translate(table) or b"0", 2)
+            self._masks[char] = mask
+        return mask
+
+    def _bitPositions(self, vector: int) -> Iterable:
+        data = vector.to_bytes((vector.bit_length() + 7) // 8, "little")
+        for match in _NONZERO_BYTE.finditer(data):
+            byteIdx = match.start()
+            byte = data[byteIdx]
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield byteIdx * 8 + bit
+
+def _trigramsOfText(text: str) -> set:
+    return {text[start:start + TRIGRAM_LENGTH] for start in range(len(text) - TRIGRAM_LENGTH + 1)}
+
+def _matches(userEntry: entry, pattern: str, includePasswords: bool) -> bool:
+    return (pattern in userEntry.website or pattern in userEntry.username or pattern in userEntry.notes
+            or includePasswords and pattern in userEntry.password)
 
 def findPasswordByUrl(userEntries: list, url: str) -> entry|None:
     """
     Find the password for a given website
+    A full URL like "https://www.github.com/login" finds the entry of its host or, failing that, of its domain
     """
+    if isinstance(userEntries, vault):
+        return userEntries.getByUrl(url)
     userEntry: entry
     for userEntry in userEntries:
         if userEntry.website == url:
             return userEntry
+    host = normalizeHost(url)
+    hosts = [normalizeHost(userEntry.website) for userEntry in userEntries]
+    for key, keys in ((host, hosts), (registrableDomain(host), [registrableDomain(entryHost) for entryHost in hosts])):
+        if key in keys:
+            userEntry = userEntries[keys.index(key)]
+            return userEntry
     return None
 
-def findPasswordByPattern(userEntries: list, pattern: str) -> list:
+def findPasswordByPattern(userEntries: list, pattern: str, index: trigramIndex|None = None) -> list:
     """
     Find the password for a given pattern
+    With an index of the entries only the entries sharing the trigrams of the pattern are checked
     """
+    if index is not None:
+        return index.search(pattern)
     entries = []
     for userEntry in userEntries:
         if pattern in userEntry.website:
@@ -0,0 +1,141 @@
+""" This module contains the append-only change journal of the user's entries """
+import json
+import os
+import struct
+
+from entry import entry
+from cryptographyManager import NONCE_SIZE, decryptAeadInto, encryptAead, wipeBuffer
+from entryCodec import FORMAT_HEADER, decodeEntry, encodeEntry, entryFromValues, isEncoded, readString, writeString
+
+ADD = "add"
+EDIT = "edit"
+DELETE = "delete"
+_OPERATIONS = (ADD, EDIT, DELETE)
+
+JOURNAL_KEY_INFO = b"PPP-PM journal"
+JOURNAL_LIMIT = 64 * 1024  # compact the journal once it is larger than 64 KiB
+_LENGTH = struct.Struct(">I")
+_OFFSET = struct.Struct(">Q")
+
+def getJournalPath(user: str) -> str:
+    """
+    Get the filepath for the user's journal
+    """
+    return os.getcwd() + f"/resources/{user}_entries.journal"
+
+def getJournalSize(user: str) -> int:
+    """
+    Get the size of the user's journal in bytes
+    """
+    try:
+        return os.path.getsize(getJournalPath(user))
+    except FileNotFoundError:
+        return 0
+
+def appendChanges(user: str, key: bytes|bytearray, snapshotId: bytes, changes: list) -> int:
+    """
+    Append encrypted change records to the user's journal
+
+    Parameters:
+    - user: The username of the user.
+    - key: The journal key of the user.
+    - snapshotId: Id of the snapshot the changes apply to.
+    - changes: List of (operation, website, changedEntry) tuples.
+
+    Returns:
+    - The size of the journal after the write.
+    """
+    # The writer holds the exclusive lock, so it cuts off a torn or foreign tail that readers only stop at
+    _, offset, size = _readRecords(user, key, snapshotId, False)
+    if offset < size:
+        with open(getJournalPath(user), "r+b") as file:
+            file.truncate(offset)
+    records = bytearray()
+    for operation, website, changedEntry in changes:
+        payload = _encodeChange(operation, website, changedEntry)
+        encrypted = encryptAead(payload, key, snapshotId + _OFFSET.pack(offset + len(records)))
+        records += _LENGTH.pack(len(encrypted)) + encrypted
+    with open(getJournalPath(user), "ab") as file:
+        file.write(records)
+        file.flush()
+        os.fsync(file.fileno())
+    return offset + len(records)
+
+def readChanges(user: str, key: bytes|bytearray, snapshotId: bytes) -> list:
+    """
+    Read the change records of the user's journal.
+    Reading stops at the first torn or foreign record, the next appendChanges cuts the journal back to the record before.
+
+    Parameters:
+    - user: The username of the user.
+    - key: The journal key of the user.
+    - snapshotId: Id of the snapshot the changes have to belong to.
+
+    Returns:
+    - List of (operation, website, changedEntry) tuples.
+    """
+    changes, _, _ = _readRecords(user, key, snapshotId, True)
+    return changes
+
+def _readRecords(user: str, key: bytes|bytearray, snapshotId: bytes, decode: bool) -> tuple[list, int, int]:
+    """
+    Returns the changes if decode is set, the end of the last complete record and the size of the journal
+    """
+    try:
+        with open(getJournalPath(user), "rb") as file:
+            content = bytearray(os.fstat(file.fileno()).st_size)
+            content = content[:file.readinto(content)]
+    except FileNotFoundError:
+        return [], 0, 0
+    view = memoryview(content)
+    # Every record is decrypted into the same buffer, it is wiped once the change is decoded
+    buffer = bytearray(len(content))
+    changes = []
+    offset = 0
+    try:
+        while offset + _LENGTH.size <= len(content):
+            (length,) = _LENGTH.unpack_from(content, offset)
+            start = offset + _LENGTH.size
+            encrypted = view[start:start + length]
+            if length <= NONCE_SIZE or len(encrypted) < length:
+                break
+            try:
+                payload = decryptAeadInto(encrypted, key, snapshotId + _OFFSET.pack(offset), buffer)
+            except ValueError:
+                break
+            if decode:
+                changes.append(_decodeChange(payload))
+            wipeBuffer(payload)
+            offset = start + length
+    finally:
+        wipeBuffer(buffer)
+    return changes, offset, len(content)
+
+def _encodeChange(operation: str, website: str, changedEntry: entry|None) -> bytes:
+    payload = bytearray(FORMAT_HEADER)
+    payload.append(_OPERATIONS.index(operation))
+    writeString(payload, website)
+    if changedEntry is not None:
+        payload += encodeEntry(changedEntry)
+    return bytes(payload)
+
+def _decodeChange(payload: memoryview) -> tuple:
+    if not isEncoded(payload):
+        # Records written before the binary encoding are JSON
+        record = json.loads(bytes(payload))
+        values = record["entry"]
+        return record["op"], record["website"], None if values is None else entryFromValues(values)
+    view = memoryview(payload)
+    operation = _OPERATIONS[view[len(FORMAT_HEADER)]]
+    website, offset = readString(view, len(FORMAT_HEADER) + 1)
+    changedEntry = decodeEntry(view[offset:]) if offset < len(view) else None
+    return operation, website, changedEntry
+
+def clearJournal(user: str) -> None:
+    """
+    Remove the user's journal after its changes were written to a new snapshot
+    """
+    try:
+        os.remove(getJournalPath(user))
+    except FileNotFoundError:
+        pass
@@ -10,29 +10,62 @@ Functions:
 - editPassword: Edits an existing password.
 - deletePassword: Deletes a password entry.
 - findPassword: Finds and displays a password for a site.
-- viewAllSites: Display all entries in the terminal.
 - passwordManager: The password manager menu for a logged-in user.
-- _terminalToSmall: Displays a message if the terminal is too small.
+- unlockSession: Asks for the master password after the session was locked.
+- reloadEntries: Reloads the entries after another session saved and applies the pending changes.
 - main: The main function to run the password manager.
-- displayEntry: Display an entry in the terminal.
 - exportToFile: Export the user's entries to a file.
+- changeCompression: Change the compression of the user's file.
 - getInputLong: Prompts the user for input. That may be longer than the terminal width.
+
+The screens that display entries are in entryViews.
 """
 import curses
 import random
 import string
-import sys
+import threading
 
 from secondFactor import secondFactor as SecondFactor
 from checkPwned import checkPawned
-from checkPassword import checkDuplicate, checkPassword
-from diskManagement import loadFromDisk, saveToDisk, loadEntryFromFile, exportToDisk
+from pwnedCache import CACHE_KEY_INFO, openCache, closeCache
+from checkPassword import checkPassword, reuseIndex
+from diskManagement import iterSessionFromDisk, saveSessionToDisk, loadEntryFromFile, exportToDisk
+from journal import ADD, EDIT, DELETE
 from userManagement import saveUser, validateUser, userExists
 from entry import entry
-from findPasswords import findPasswordByUrl, findPasswordByPattern
-
-
-def printMenu(stdscr :curses.window, selectedRowIdx :int, menu :list) -> None:
+from vaultSession import vaultSession
+from vault import vault
+from vaultFormat import COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_LZMA
+from backgroundSaver import backgroundSaver, PENDING, SAVED, FAILED, CONFLICT
+from findPasswords import findPasswordByUrl, trigramIndex
+from vaultAudit import auditVault
+from entryQuery import queryCache
+from entryViews import displayEntry, viewAllSites, liveSearch, viewAudit, terminalToSmall, entryOrders
+
+MAX_UNLOCK_ATTEMPTS = 3
+STATUS_REFRESH = 250  # milliseconds the menu waits for a key before it checks the save state
+MANAGER_MENU = [
+    "Add Password",
+    "Generate Password",
+    "Edit Password",
+    "Delete Password",
+    "Find Password",
+    "View All Sites",
+    "Load from File",
+    "Export to File",
+    "Audit Passwords",
+    "Options",
+    "Logout",
+]
+SAVE_MESSAGES = {
+    PENDING: "Saving changes...",
+    SAVED: "All changes saved.",
+    FAILED: "Saving failed, changes are kept and written with the next change.",
+    CONFLICT: "The vault was changed in another session, reloading entries...",
+}
+
+
+def printMenu(stdscr :curses.window, selectedRowIdx :int, menu :list, status: str = "") -> None:
     """
     Displays a menu in the terminal.
 
@@ -40,9 +73,10 @@ def printMenu(stdscr :curses.window, selectedRowIdx :int, menu :list) -> None:
     - stdscr: The standard screen object from curses.
     - selectedRowIdx: Index of the currently selected row.
     - menu: List of menu items to display.
+    - status: Line shown at the bottom of the terminal, e.g. the save state.
     """
     try:
-        stdscr.clear()
+        stdscr.erase()  # clear would make curses repaint the whole terminal on the next refresh
         height, width = stdscr.getmaxyx()
 
         for idx, row in enumerate(menu):
@@ -54,9 +88,11 @@ def printMenu(stdscr :curses.window, selectedRowIdx :int, menu :list) -> None:
                 stdscr.attroff(curses.color_pair(1))
             else:
                 stdscr.addstr(yCordinate, xCordinate, row)
+        if status:
+            stdscr.addstr(height - 1, 0, status[:width - 1])
         stdscr.refresh()
     except curses.error:
-        _terminalToSmall(stdscr)
+        terminalToSmall(stdscr)
 def exportToFile(stdscr :curses.window,username: str, userEntries: list) -> None:
     """
     Export the user's entries to a file.
@@ -74,18 +110,6 @@ def exportToFile(stdscr :curses.window,username: str, userEntries: list) -> None
     stdscr.getch()
 
 
-def _terminalToSmall(stdscr :curses.window) -> None:
-    try:
-        stdscr.clear()
-        stdscr.addstr(1, 0, "Please resize the terminal to be larger.")
-        stdscr.addstr(2, 0, "Press any key to continue.")
-        stdscr.refresh()
-        stdscr.getch()
-    except curses.error:
-        with open("error.log", "w", encoding="utf-8") as errorLog:
-            print("Please resize the terminal to be larger and restart the application.\n", file=errorLog)
-        sys.exit(1)
-
 def getInput(stdscr :curses.window, prompt: str) -> str:
     """
     Prompts the user for input.
@@ -125,15 +149,17 @@ def getInputLong(stdscr :curses.window, prompt: str) -> str:
     return userInput
 
 
-def addSitePassword(stdscr :curses.window, username: str, masterPassword: str, userEntries: list) -> None:
+def addSitePassword(stdscr :curses.window, saver: backgroundSaver, userEntries: list, index: trigramIndex,
+                    reuse: reuseIndex) -> None:
     """
     Adds a new password for a site.
 
     Parameters:
     - stdscr: The standard screen object from curses.
-    - username: The username of the user.
-    - masterPassword: The masterPassword of the user.
+    - saver: The background saver of the user's session.
     - userEntries: A list of the users entries.
+    - index: The search index of the entries.
+    - reuse: The password reuse index of the entries.
     """
     site = getInput(stdscr, "Enter the name/web-URL/site you want to add: ")
     user = getInput(stdscr, "Enter the username: ")
@@ -145,7 +171,7 @@ def addSitePassword(stdscr :curses.window, username: str, masterPassword: str, u
         stdscr.refresh()
         stdscr.getch()
         return
-    if not evaluatePassword(stdscr, password, userEntries):
+    if not evaluatePassword(stdscr, password, reuse):
         return
 
     note = getInput(stdscr, "Enter any notes: ")
@@ -153,6 +179,8 @@ def addSitePassword(stdscr :curses.window, username: str, masterPassword: str, u
     newEntry = entry(site, password, user, notes=note)
     if not newEntry in userEntries:
         userEntries.append(newEntry)
+        index.add(newEntry)
+        reuse.add(newEntry)
     else:
         stdscr.clear()
         stdscr.addstr(1, 0, f"Entry for website {site} already exists.")
@@ -161,26 +189,21 @@ def addSitePassword(stdscr :curses.window, username: str, masterPassword: str, u
         stdscr.getch()
         return
 
+    saver.submit(userEntries, [(ADD, site, newEntry)])
     stdscr.clear()
-    if saveToDisk(username, masterPassword, userEntries):
-        stdscr.addstr(1, 0, "Entry saved!")
-        stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
-        stdscr.refresh()
-        stdscr.getch()
-    else:
-        stdscr.addstr(1, 0, "Failed to save entry.")
-        stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
-        stdscr.refresh()
-        stdscr.getch()
+    stdscr.addstr(1, 0, "Entry added!")
+    stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+    stdscr.refresh()
+    stdscr.getch()
 
-def evaluatePassword(stdscr :curses.window, password: str, userEntries: list) -> bool:
+def evaluatePassword(stdscr :curses.window, password: str, reuse: reuseIndex) -> bool:
     """
     Evaluates the password for security.
 
     Parameters:
     - stdscr: The standard screen object from curses.
     - password: The password to evaluate.
-    - userEntries: A list of the users entries.
+    - reuse: The password reuse index of the entries.
     """
     if not checkPassword(password):
         stdscr.clear()
@@ -237,10 +260,13 @@ def evaluatePassword(stdscr :curses.window, password: str, userEntries: list) ->
         if not answer2:
             return False
 
-    if checkDuplicate(password, userEntries):
+    sharedWith = reuse.entriesUsing(password)
+    if sharedWith:
+        websites = ", ".join(_entry.website for _entry in sharedWith)
         stdscr.clear()
         stdscr.addstr(1, 0, "Password already exists.")
-        stdscr.addstr(2, 0, "Do you want to continue anyway? (y/n)")
+        stdscr.addstr(2, 0, f"Used by: {websites}"[:stdscr.getmaxyx()[1] - 1])
+        stdscr.addstr(3, 0, "Do you want to continue anyway? (y/n)")
         answer4: bool = False
         while True:
             key = stdscr.getch()
@@ -255,22 +281,29 @@ def evaluatePassword(stdscr :curses.window, password: str, userEntries: list) ->
             return False
     return True
 
-def loadFromFile(stdscr :curses.window, username: str, password: str, userEntries: list) -> list:
+def loadFromFile(stdscr :curses.window, saver: backgroundSaver, userEntries: list, index: trigramIndex,
+                 reuse: reuseIndex) -> list:
     """
     Load the user's entries from disk
 
     Parameters:
     - stdscr: The standard screen object from curses.
-    - username: The username of the user.
-    - password: The password of the user.
+    - saver: The background saver of the user's session.
+    - index: The search index of the entries.
+    - reuse: The password reuse index of the entries.
 
     Returns:
     - userEntries: A list of the users entries.
     """
     filepath = getInputLong(stdscr, "Enter the file path: ")
+    loadedCount = len(userEntries)
     try:
         userEntries = loadEntryFromFile(filepath, userEntries)
-        saveToDisk(username, password, userEntries)
+        for _entry in userEntries[loadedCount:]:
+            index.add(_entry)
+            reuse.add(_entry)
+        # The loaded entries are added one by one, so they merge with changes of other sessions
+        saver.submit(userEntries, [(ADD, _entry.website, _entry) for _entry in userEntries[loadedCount:]])
     except FileNotFoundError:
         stdscr.clear()
         stdscr.addstr(1, 0, "File not found.")
@@ -304,7 +337,7 @@ def loadFromFile(stdscr :curses.window, username: str, password: str, userEntrie
                     stdscr.addstr(yCor, 2, line)
                 break
             except curses.error:
-                _terminalToSmall(stdscr)
+                terminalToSmall(stdscr)
         stdscr.refresh()
         stdscr.getch()
     return userEntries
@@ -381,23 +414,24 @@ def generatePassword(stdscr :curses.window) -> None:
     stdscr.getch()
 
 
-def editPassword(stdscr :curses.window, username: str, password : str, userEntries: list) -> None:
+def editPassword(stdscr :curses.window, saver: backgroundSaver, userEntries: vault, index: trigramIndex,
+                 reuse: reuseIndex) -> None:
     """
     Edits an existing password.
 
     Parameters:
     - stdscr: The standard screen object from curses.
-    - username: The username of the user.
-    - password: The password of the user.
+    - saver: The background saver of the user's session.
     - userEntries: A list of the users entries.
+    - index: The search index of the entries.
+    - reuse: The password reuse index of the entries.
     """
     site = getInput(stdscr, "Enter the name/web-URL/site you want to edit: ")
-    currentEntry = None
-    for _entry in userEntries:
-        if _entry.website == site:
-            currentEntry = _entry
-            userEntries.remove(_entry)
-            break
+    currentEntry = userEntries.get(site)
+    if currentEntry is not None:
+        # Like the list, the reuse index leaves the entry out while it is edited, its own passwords are no reuse
+        userEntries.remove(currentEntry)
+        reuse.remove(currentEntry)
     if currentEntry is None:
         stdscr.clear()
         stdscr.addstr(1, 0, "Site not found.")
@@ -420,8 +454,7 @@ def editPassword(stdscr :curses.window, username: str, password : str, userEntri
     stdscr.refresh()
     if not answer:
         userEntries.append(currentEntry)
-        if saveToDisk(username, password, userEntries):
-            pass
+        reuse.add(currentEntry)
         return
     stdscr.clear()
     stdscr.addstr(1, 0, "What do you want to edit? (use number to select and press Enter to confirm)")
@@ -434,12 +467,7 @@ def editPassword(stdscr :curses.window, username: str, password : str, userEntri
     key = stdscr.getch()
     if key == ord("1"):
         newSite = getInput(stdscr, "Enter the new website: ")
-        changeable = True
-        for _entry in userEntries:
-            if _entry.website == newSite:
-                changeable = False
-                break
-        if changeable and currentEntry.updateWebsite(newSite):
+        if userEntries.get(newSite) is None and currentEntry.updateWebsite(newSite):
             stdscr.clear()
             stdscr.addstr(1, 0, "Website updated!")
             stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
@@ -467,7 +495,7 @@ def editPassword(stdscr :curses.window, username: str, password : str, userEntri
             stdscr.getch()
     elif key == ord("3"):
         newPassword = getInput(stdscr, "Enter the new password: ")
-        if evaluatePassword(stdscr, newPassword, userEntries) and currentEntry.updatePassword(newPassword):
+        if evaluatePassword(stdscr, newPassword, reuse) and currentEntry.updatePassword(newPassword):
             stdscr.clear()
             stdscr.addstr(1, 0, "Password updated!")
             stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
@@ -495,41 +523,40 @@ def editPassword(stdscr :curses.window, username: str, password : str, userEntri
             stdscr.getch()
     elif key == ord("5"):
         userEntries.append(currentEntry)
+        reuse.add(currentEntry)
         return
     userEntries.append(currentEntry)
-    if saveToDisk(username, password, userEntries):
-        pass
+    index.update(currentEntry)
+    reuse.add(currentEntry)
+    saver.submit(userEntries, [(EDIT, site, currentEntry)])
 
 
-def deletePassword(stdscr :curses.window, username: str, password : str, userEntries: list) -> None:
+def deletePassword(stdscr :curses.window, saver: backgroundSaver, userEntries: vault, index: trigramIndex,
+                   reuse: reuseIndex) -> None:
     """
     Deletes a password entry.
 
     Parameters:
     - stdscr: The standard screen object from curses.
-    - username: The username of the user.
-    - password: The password of the user.
+    - saver: The background saver of the user's session.
     - userEntries: A list of the users entries.
+    - index: The search index of the entries.
+    - reuse: The password reuse index of the entries.
     """
 
     site = getInput(stdscr, "Enter the name/web-URL/site you want to delete: ")
-    for _entry in userEntries:
-        if _entry.website == site:
-            userEntries.remove(_entry)
-            stdscr.clear()
-            stdscr.addstr(1, 0, "Entry deleted!")
-            stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
-            stdscr.refresh()
-            stdscr.getch()
-            if saveToDisk(username, password, userEntries):
-                pass
-            else:
-                stdscr.clear()
-                stdscr.addstr(1, 0, "Failed to delete entry.")
-                stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
-                stdscr.refresh()
-                stdscr.getch()
-            return
+    _entry = userEntries.get(site)
+    if _entry is not None:
+        userEntries.remove(_entry)
+        index.remove(_entry)
+        reuse.remove(_entry)
+        saver.submit(userEntries, [(DELETE, site, None)])
+        stdscr.clear()
+        stdscr.addstr(1, 0, "Entry deleted!")
+        stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+        stdscr.refresh()
+        stdscr.getch()
+        return
 
     stdscr.clear()
     stdscr.addstr(1, 0, "Entry not found.")
@@ -538,15 +565,17 @@ def deletePassword(stdscr :curses.window, username: str, password : str, userEnt
     stdscr.getch()
 
 
-def findPassword(stdscr :curses.window, userEntries: list) -> None:
+def findPassword(stdscr :curses.window, userEntries: list, index: trigramIndex, queries: queryCache) -> None:
     """
     Finds and displays a password for a site.
 
     Parameters:
     - stdscr: The standard screen object from curses.
     - userEntries: A list of the users entries.
+    - index: The search index of the entries.
+    - queries: The query cache of the search index.
     """
-    menu = ["Find by URL", "Find by pattern"]
+    menu = ["Find by URL", "Find by pattern", "Find by similar name (tolerates typos)", "Find by query"]
     currentRow = 0
     while True:
         printMenu(stdscr, currentRow, menu)
@@ -559,20 +588,37 @@ def findPassword(stdscr :curses.window, userEntries: list) -> None:
             break
     if currentRow == 0:
         site = getInput(stdscr, "Enter the name/web-URL/site you want to find: ")
+        # Full URLs find the entry of their domain, e.g. https://www.github.com/login finds github.com
         _entry = findPasswordByUrl(userEntries, site)
         if _entry is not None:
-            if _entry.website == site:
-                stdscr.clear()
-                stdscr.addstr(1, 0, f"Password for {site}: {_entry.password}")
-                stdscr.addstr(2, 0, f"Username: {_entry.username}")
-                stdscr.addstr(3, 0, f"Notes: {_entry.notes}")
-                stdscr.addstr(4, 0, "Press any key to return to the manager menu.")
-                stdscr.refresh()
-                stdscr.getch()
-                return
+            stdscr.clear()
+            stdscr.addstr(1, 0, f"Password for {_entry.website}: {_entry.password}")
+            stdscr.addstr(2, 0, f"Username: {_entry.username}")
+            stdscr.addstr(3, 0, f"Notes: {_entry.notes}")
+            stdscr.addstr(4, 0, "Press any key to return to the manager menu.")
+            stdscr.refresh()
+            stdscr.getch()
+            return
     elif currentRow == 1:
-        pattern = getInput(stdscr, "Enter the pattern you want to find: ")
-        entries = findPasswordByPattern(userEntries, pattern)
+        liveSearch(stdscr, index)
+        return
+    elif currentRow == 2:
+        name = getInput(stdscr, "Enter the website or username you want to find: ")
+        entries = index.fuzzySearch(name)
+        if len(entries) > 0:
+            viewAllSites(stdscr, entries, sortBy=None)
+            return
+    elif currentRow == 3:
+        query = getInput(stdscr, 'Enter a query, e.g. site:github user:alice -notes:"old" after:2024-01-01: ')
+        try:
+            entries = queries.search(query)
+        except ValueError as error:
+            stdscr.clear()
+            stdscr.addstr(1, 0, f"Invalid query: {error}")
+            stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+            stdscr.refresh()
+            stdscr.getch()
+            return
         if len(entries) > 0:
             viewAllSites(stdscr, entries)
             return
@@ -583,6 +629,20 @@ def findPassword(stdscr :curses.window, userEntries: list) -> None:
     stdscr.refresh()
     stdscr.getch()
 
+def auditPasswords(stdscr :curses.window, userEntries: list, reuse: reuseIndex) -> None:
+    """
+    Checks all entries for weak, reused, breached and stale passwords and displays the findings.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - userEntries: A list of the users entries.
+    - reuse: The password reuse index of the entries.
+    """
+    stdscr.clear()
+    stdscr.addstr(1, 0, f"Checking {len(userEntries)} entries...")
+    stdscr.refresh()
+    viewAudit(stdscr, auditVault(userEntries, reuse))
+
 def activate2FA(stdscr: curses.window, username: str) -> None:
     """
     Activate 2FA for the user.
@@ -607,14 +667,69 @@ def activate2FA(stdscr: curses.window, username: str) -> None:
     stdscr.clear()
 
 
-def options(stdscr: curses.window, username: str) -> None:
+def changeCompression(stdscr: curses.window, saver: backgroundSaver, userEntries: list) -> None:
+    """
+    Change the compression of the user's file, the entries are written again with it.
+
+    Parameters:
+    - stdscr: The standard screen object from curses.
+    - saver: The background saver of the user's session.
+    - userEntries: A list of the users entries.
+    """
+    menu = ["No compression", "zlib (fast)", "lzma (smallest, slow at high levels)", "Return to Options"]
+    compressions = [COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_LZMA]
+    currentRow = 0
+    while True:
+        printMenu(stdscr, currentRow, menu)
+        key = stdscr.getch()
+        if key == curses.KEY_UP and currentRow > 0:
+            currentRow -= 1
+        elif key == curses.KEY_DOWN and currentRow < len(menu) - 1:
+            currentRow += 1
+        elif key == ord("\n"):
+            break
+    if currentRow == len(compressions):
+        return
+    level = 0
+    if compressions[currentRow] != COMPRESSION_NONE:
+        levelInput = getInput(stdscr, "Enter the compression level (0 = fastest, 9 = smallest): ")
+        if not levelInput.isdigit() or int(levelInput) > 9:
+            stdscr.clear()
+            stdscr.addstr(1, 0, "Invalid compression level.")
+            stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+            stdscr.refresh()
+            stdscr.getch()
+            return
+        level = int(levelInput)
+    stdscr.clear()
+    try:
+        # Pending changes are written first, the new snapshot contains them
+        changed = saver.flush() and saveSessionToDisk(saver.session, userEntries, compressions[currentRow], level)
+    except RuntimeError:
+        # Another session saved in between, the entries have to be reloaded first
+        changed = False
+    if changed:
+        stdscr.addstr(1, 0, "Compression changed.")
+    else:
+        stdscr.addstr(1, 0, "Failed to change the compression.")
+    stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
+    stdscr.refresh()
+    stdscr.getch()
+
+def options(stdscr: curses.window, username: str, saver: backgroundSaver, userEntries: list, index: trigramIndex) -> None:
     """
     Display the options menu.
 
     Parameters:
     - stdscr: The standard screen object from curses.
+    - username: The username of the logged-in user.
+    - saver: The background saver of the user's session.
+    - userEntries: A list of the users entries.
+    - index: The search index of the entries.
     """
     menu = ["Activate 2FA",
+            "Compression",
+            f"Search in passwords: {'on' if index.includePasswords else 'off'}",
             "Return to Manager Menu"]
     currentRow = 0
     while True:
@@ -629,6 +744,12 @@ def options(stdscr: curses.window, username: str) -> None:
     if currentRow == 0:
         activate2FA(stdscr, username)
     elif currentRow == 1:
+        changeCompression(stdscr, saver, userEntries)
+    elif currentRow == 2:
+        # Passwords are only indexed on request, the index is rebuilt with or without them
+        index.includePasswords = not index.includePasswords
+        index.rebuild(userEntries)
+    elif currentRow == 3:
         return
 
 def main(stdscr: curses.window) -> None:
@@ -698,44 +819,77 @@ def main(stdscr: curses.window) -> None:
                 break
 
 
-def displayEntry(stdscr: curses.window, entryO: entry) -> None:
+def unlockSession(stdscr :curses.window, session: vaultSession) -> bool:
     """
-    Display an entry in the terminal.
+    Asks for the master password after the session was locked for being idle.
 
     Parameters:
     - stdscr: The standard screen object from curses.
-    - entryO: The entry to display.
-    """
+    - session: The locked vault session of the user.
+
+    Returns:
+    - True if the session was unlocked, False if the user has to log in again.
+    """
+    closeCache()
+    for _ in range(MAX_UNLOCK_ATTEMPTS):
+        masterPassword = getInput(stdscr, "Session locked. Enter password: ")
+        if session.unlock(masterPassword):
+            openCache(session.username, session.subkey(CACHE_KEY_INFO))
+            return True
+    session.lock()
     stdscr.clear()
-    stdscr.addstr(1, 0, f"Website: {entryO.website}")
-    stdscr.addstr(2, 0, f"Username: {entryO.username}")
-    stdscr.addstr(3, 0, f"Password: {entryO.password}")
-    stdscr.addstr(4, 0, f"Notes: {entryO.notes}")
-    stdscr.addstr(5, 0, f"Last changed: {entryO.getLastEditTime()}")
-    stdscr.addstr(6, 0, "-" * 50)
+    stdscr.addstr(1, 0, "Invalid password. You have been logged out.")
+    stdscr.addstr(2, 0, "Press any key to return to the Login menu.")
+    stdscr.refresh()
+    stdscr.getch()
+    return False
 
-def viewAllSites(stdscr :curses.window, userEntries: list) -> None:
+def reloadEntries(session: vaultSession, saver: backgroundSaver, userEntries: list, index: trigramIndex,
+                  reuse: reuseIndex) -> None:
     """
-    Display all entries in the terminal.
+    Reloads the entries after another session saved and applies the changes that are not saved yet.
 
     Parameters:
-    - stdscr: The standard screen object from curses.
-    - userEntries: A list of the users entries.
+    - session: The unlocked vault session of the user.
+    - saver: The background saver of the user's session.
+    - userEntries: A list of the users entries, it is updated in place.
+    - index: The search index of the entries, it is rebuilt.
+    - reuse: The password reuse index of the entries, it is rebuilt.
     """
-    stdscr.clear()
-    for _entry in userEntries:
-        displayEntry(stdscr, _entry)
-        if _entry != userEntries[-1]:
-            stdscr.addstr(7, 0, "Press any key to view the next entry.")
-            stdscr.getch()
-        else:
-            break
-    if len(userEntries) == 0:
-        stdscr.clear()
-        stdscr.addstr(1, 0, "No entries found.")
-    stdscr.addstr(7, 0, "Press any key to return to the manager menu.")
-    stdscr.refresh()
-    stdscr.getch()
+    reloadedEntries = vault(iterSessionFromDisk(session))
+    saver.rebase(reloadedEntries)
+    userEntries[:] = reloadedEntries
+    index.rebuild(userEntries)
+    reuse.rebuild(userEntries)
+
+def loadEntries(session: vaultSession, userEntries: list, index: trigramIndex, reuse: reuseIndex) -> tuple:
+    """
+    Decrypts the entries on a background thread, so the menu is usable meanwhile.
+
+    Parameters:
+    - session: The unlocked vault session of the user.
+    - userEntries: The empty list of the users entries, the entries are added to it.
+    - index: The search index of the entries, it is rebuilt once all entries are loaded.
+    - reuse: The password reuse index of the entries, it is rebuilt once all entries are loaded.
+
+    Returns:
+    - The started thread and a list that holds the error if the load failed.
+      The entries loaded until then would be missing from every later snapshot, so nothing may be saved then.
+    """
+    loadErrors: list = []
+
+    def load() -> None:
+        try:
+            userEntries.extend(iterSessionFromDisk(session))
+        except (RuntimeError, OSError, ValueError) as error:
+            loadErrors.append(error)
+            return
+        index.rebuild(userEntries)
+        reuse.rebuild(userEntries)
+
+    loader = threading.Thread(target=load, daemon=True)
+    loader.start()
+    return loader, loadErrors
 
 def passwordManager(stdscr :curses.window, username: str, masterPassword: str) -> None:
     """
@@ -747,58 +901,95 @@ def passwordManager(stdscr :curses.window, username: str, masterPassword: str) -
     - masterPassword: The masterPassword of the logged-in user.
     """
     currentRow = 0
-
-    menu = [
-        "Add Password",
-        "Generate Password",
-        "Edit Password",
-        "Delete Password",
-        "Find Password",
-        "View All Sites",
-        "Load from File",
-        "Export to File",
-        "Options",
-        "Logout",
-    ]
-    userEntries = loadFromDisk(username, masterPassword)
-    while True:
-        printMenu(stdscr, currentRow, menu)
-        key = stdscr.getch()
-        # Unneccessary? and courses problems with encryption
-        #if saveToDisk(username, password, userEntries):
-            #pass
-        #else:
-            #stdscr.clear()
-            #stdscr.addstr(1, 0, "Failed to save entries.")
-            #stdscr.addstr(2, 0, "Press any key to return to the manager menu.")
-            #stdscr.refresh()
-            #stdscr.getch()
-        if key == curses.KEY_UP and currentRow > 0:
-            currentRow -= 1
-        elif key == curses.KEY_DOWN and currentRow < len(menu) - 1:
-            currentRow += 1
-        elif key == ord("\n"):
-            match currentRow:
-                case 0:
-                    addSitePassword(stdscr, username, masterPassword, userEntries)
-                case 1:
-                    generatePassword(stdscr)
-                case 2:
-                    editPassword(stdscr, username, masterPassword, userEntries)
-                case 3:
-                    deletePassword(stdscr, username, masterPassword, userEntries)
-                case 4:
-                    findPassword(stdscr, userEntries)
-                case 5:
-                    viewAllSites(stdscr, userEntries)
-                case 6:
-                    userEntries = loadFromFile(stdscr,username, masterPassword, userEntries)
-                case 7:
-                    exportToFile(stdscr, username, userEntries)
-                case 8:
-                    options(stdscr, username)
-                case 9:
+    session = vaultSession(username)
+    if not session.unlock(masterPassword):
+        stdscr.clear()
+        stdscr.addstr(1, 0, "The password doesn't match the user's entries.")
+        stdscr.addstr(2, 0, "Press any key to return to the Login menu.")
+        stdscr.refresh()
+        stdscr.getch()
+        return
+    openCache(username, session.subkey(CACHE_KEY_INFO))
+
+    # The menu is usable while the entries are decrypted, actions wait until all of them are loaded
+    userEntries = vault()
+    index = trigramIndex()
+    reuse = reuseIndex()
+    queries = queryCache(index)
+    orders = entryOrders(userEntries)
+
+    loader, loadErrors = loadEntries(session, userEntries, index, reuse)
+    # Saves run in the background, the menu is only drawn again if the save state or the row changed or after a key
+    saver = backgroundSaver(session)
+    shown: tuple|None = None
+    try:
+        while True:
+            if shown != (currentRow, saver.state):
+                shown = (currentRow, saver.state)
+                printMenu(stdscr, currentRow, MANAGER_MENU, SAVE_MESSAGES.get(saver.state, ""))
+            stdscr.timeout(STATUS_REFRESH)
+            key = stdscr.getch()
+            stdscr.timeout(-1)
+            if key != -1 or not session.isUnlocked():  # the key or the unlock prompt may have used the screen
+                shown = None
+            if not session.isUnlocked():
+                if not unlockSession(stdscr, session):
+                    break
+                saver.retry()
+            if saver.state == CONFLICT:
+                reloadEntries(session, saver, userEntries, index, reuse)
+            if key == curses.KEY_UP and currentRow > 0:
+                currentRow -= 1
+            elif key == curses.KEY_DOWN and currentRow < len(MANAGER_MENU) - 1:
+                currentRow += 1
+            elif key == ord("\n"):
+                loader.join()
+                if loadErrors:
+                    stdscr.clear()
+                    stdscr.addstr(1, 0, f"Failed to load entries: {loadErrors[0]}")
+                    stdscr.addstr(2, 0, "Press any key to return to the Login menu.")
+                    stdscr.refresh()
+                    stdscr.getch()
                     break
+                match currentRow:
+                    case 0:
+                        addSitePassword(stdscr, saver, userEntries, index, reuse)
+                    case 1:
+                        generatePassword(stdscr)
+                    case 2:
+                        editPassword(stdscr, saver, userEntries, index, reuse)
+                    case 3:
+                        deletePassword(stdscr, saver, userEntries, index, reuse)
+                    case 4:
+                        findPassword(stdscr, userEntries, index, queries)
+                    case 5:
+                        viewAllSites(stdscr, userEntries, orders)
+                    case 6:
+                        # The file is loaded into the vault in place
+                        loadFromFile(stdscr, saver, userEntries, index, reuse)
+                    case 7:
+                        exportToFile(stdscr, username, userEntries)
+                    case 8:
+                        auditPasswords(stdscr, userEntries, reuse)
+                    case 9:
+                        options(stdscr, username, saver, userEntries, index)
+                    case 10:
+                        break
+        if loadErrors:
+            return
+        if not saver.flush() and saver.state == CONFLICT and session.isUnlocked():
+            reloadEntries(session, saver, userEntries, index, reuse)
+        if not saver.stop():
+            stdscr.clear()
+            stdscr.addstr(1, 0, "Failed to save entries.")
+            stdscr.addstr(2, 0, "Press any key to return to the Login menu.")
+            stdscr.refresh()
+            stdscr.getch()
+    finally:
+        # Pending changes are written on every way out, e.g. Ctrl+C
+        saver.stop()
+        closeCache()
+        session.lock()
 
 
 if __name__ == "__main__":
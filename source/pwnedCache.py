@@ -0,0 +1,233 @@
+""" This module keeps the responses of the Pwned Passwords API on disk, so a range is only fetched once a day """
+import contextlib
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from cryptographyManager import decryptAeadInto, deriveSubkey, encryptAead, wipeBuffer
+
+CACHE_KEY_INFO = b"PPP-PM breach cache"
+SHARED_CACHE_FILE = "resources/pwned_ranges.db"  # the cache of older versions, it kept the prefixes in plain text
+RANGE_TTL = 24 * 60 * 60  # seconds a range is used without asking the API if it changed
+MAX_RANGES = 4096  # ranges kept on disk, about 12 KB each when compressed
+MEMORY_RANGES = 256  # parsed ranges kept in memory for repeated checks
+
+class cachedRange:
+    """
+    A range read from the cache
+
+    Attributes
+    ----------
+    counts: dict
+        The remaining 35 characters of each hash mapped to how often it was breached
+    etag: str|None
+        The ETag the API sent with the range, it is sent back to ask if the range changed
+    fresh: bool
+        True if the range was fetched or revalidated within RANGE_TTL
+    """
+    #pylint: disable=R0903
+    def __init__(self, counts: dict, etag: str|None, fresh: bool) -> None:
+        self.counts = counts
+        self.etag = etag
+        self.fresh = fresh
+
+class rangeCache:
+    """
+    The API responses in a SQLite file only the user can read, compressed with zlib and encrypted with AES-GCM.
+    The rows are found by an HMAC of the prefix, the prefixes of the checked passwords aren't stored. The ETag is
+    encrypted with the range, as both identify the prefix. The least recently used ranges are removed once there are
+    more than maxRanges. The last ranges that were used are also kept parsed in memory.
+    The cache can be used from several threads.
+
+    Methods
+    -------
+    get(prefix: str) -> cachedRange|None
+        Returns the cached range of a prefix
+    put(prefix: str, body: bytes, etag: str|None) -> dict
+        Stores a range the API returned
+    refresh(prefix: str) -> None
+        Marks a range as fresh after the API confirmed it didn't change
+    close() -> None
+        Closes the file and wipes the keys
+    """
+    def __init__(self, path: str, key: bytes|bytearray, ttl: float = RANGE_TTL, maxRanges: int = MAX_RANGES) -> None:
+        self.ttl = ttl
+        self.maxRanges = maxRanges
+        self._lock = threading.Lock()
+        # prefix -> (counts, etag, fetched), the most recently used last
+        self._memory: OrderedDict = OrderedDict()
+        self._prefixKey = bytearray(deriveSubkey(key, b"prefix"))
+        self._rangeKey = bytearray(deriveSubkey(key, b"range"))
+        # SQLite creates the WAL and shared memory files with the permissions of the database file
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock, self._connection:
+            # The cache can be rebuilt from the API, losing the last writes on a crash is fine
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS ranges (id TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                                     "fetched REAL NOT NULL, used REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS rangesUsed ON ranges (used)")
+
+    def get(self, prefix: str) -> cachedRange|None:
+        """
+        Returns the cached range of a prefix
+
+        Parameters:
+        - prefix: The first five characters of an upper case SHA1 hash.
+
+        Returns:
+        - The range, also if it is older than the TTL. None if the prefix isn't cached.
+        """
+        now = time.time()
+        with self._lock:
+            remembered = self._memory.get(prefix)
+            if remembered is None:
+                rowId = self._rowId(prefix)
+                row = self._connection.execute("SELECT body, fetched FROM ranges WHERE id = ?", (rowId,)).fetchone()
+                if row is None:
+                    return None
+                try:
+                    body = decryptAeadInto(row[0], self._rangeKey, rowId.encode(), bytearray(len(row[0])))
+                except ValueError:
+                    # The row was changed on disk, the range is fetched again
+                    return None
+                with self._connection:
+                    self._connection.execute("UPDATE ranges SET used = ? WHERE id = ?", (now, rowId))
+                storedEtag, _, compressed = bytes(body).partition(b"\n")
+                remembered = (parseRange(zlib.decompress(compressed).decode()), storedEtag.decode() or None, row[1])
+                self._remember(prefix, remembered)
+            else:
+                self._memory.move_to_end(prefix)
+        counts, etag, fetched = remembered
+        return cachedRange(counts, etag, now - fetched < self.ttl)
+
+    def put(self, prefix: str, body: bytes, etag: str|None) -> dict:
+        """
+        Stores a range the API returned, the least recently used ranges are removed if the cache is full
+
+        Parameters:
+        - prefix: The first five characters of an upper case SHA1 hash.
+        - body: The response of the API.
+        - etag: The ETag header of the response.
+
+        Returns:
+        - The parsed range.
+        """
+        counts = parseRange(body.decode())
+        now = time.time()
+        with self._lock:
+            rowId = self._rowId(prefix)
+            # Header values can't contain a line break
+            content = (etag or "").encode() + b"\n" + zlib.compress(body)
+            with self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO ranges VALUES (?, ?, ?, ?)",
+                                         (rowId, encryptAead(content, self._rangeKey, rowId.encode()), now, now))
+                self._connection.execute("DELETE FROM ranges WHERE id IN "
+                                         "(SELECT id FROM ranges ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.maxRanges,))
+            self._remember(prefix, (counts, etag, now))
+        return counts
+
+    def refresh(self, prefix: str) -> None:
+        """
+        Marks a range as fresh after the API answered that it didn't change
+
+        Parameters:
+        - prefix: The first five characters of an upper case SHA1 hash.
+        """
+        now = time.time()
+        with self._lock:
+            with self._connection:
+                self._connection.execute("UPDATE ranges SET fetched = ?, used = ? WHERE id = ?",
+                                         (now, now, self._rowId(prefix)))
+            remembered = self._memory.get(prefix)
+            if remembered is not None:
+                self._memory[prefix] = (remembered[0], remembered[1], now)
+
+    def close(self) -> None:
+        """
+        Closes the file and wipes the keys
+        """
+        with self._lock:
+            self._connection.close()
+            self._memory.clear()
+            wipeBuffer(self._prefixKey)
+            wipeBuffer(self._rangeKey)
+
+    def _rowId(self, prefix: str) -> str:
+        return hmac.new(self._prefixKey, prefix.encode(), hashlib.sha256).hexdigest()
+
+    def _remember(self, prefix: str, remembered: tuple) -> None:
+        self._memory[prefix] = remembered
+        self._memory.move_to_end(prefix)
+        if len(self._memory) > MEMORY_RANGES:
+            self._memory.popitem(last=False)
+
+# The cache of the logged in user, see openCache
+_openCaches: list = []
+
+def getCachePath(user: str) -> str:
+    """
+    Get the filepath for the user's cache of the ranges
+    """
+    return os.getcwd() + f"/resources/{user}_pwned_ranges.db"
+
+def openCache(user: str, key: bytes|bytearray) -> rangeCache|None:
+    """
+    Opens the cache of a user after the login, it is used by default until closeCache is called
+
+    Parameters:
+    - user: The name of the user.
+    - key: The key of the cache, derived from the session key with CACHE_KEY_INFO.
+
+    Returns:
+    - The cache, None if the file can't be opened. Then the API is asked every time.
+    """
+    closeCache()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(SHARED_CACHE_FILE)
+    try:
+        cache = rangeCache(getCachePath(user), key)
+    except (sqlite3.Error, OSError):
+        return None
+    _openCaches.append(cache)
+    return cache
+
+def closeCache() -> None:
+    """
+    Closes the cache of the logged in user, e.g. when the session is locked
+    """
+    while _openCaches:
+        _openCaches.pop().close()
+
+def defaultCache() -> rangeCache|None:
+    """
+    Returns the cache of the logged in user
+
+    Returns:
+    - The cache, None if no user is logged in or the file can't be opened. Then the API is asked every time.
+    """
+    return _openCaches[-1] if _openCaches else None
+
+def parseRange(text: str) -> dict:
+    """
+    Parses a response of the range API
+
+    Parameters:
+    - text: Lines of the remaining 35 characters of a hash and its count separated by a colon.
+
+    Returns:
+    - The remaining characters of each hash mapped to its count.
+    """
+    counts = {}
+    for line in text.splitlines():
+        suffix, _, count = line.partition(":")
+        if count:
+            counts[suffix] = int(count)
+    return counts
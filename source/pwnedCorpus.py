@@ -0,0 +1,213 @@
+"""
+This module checks passwords against a local copy of the Pwned Passwords hashes, without any network access.
+
+The text file with one "SHA1:COUNT" line per hash, as the downloader of haveibeenpawned.com writes it, is converted
+once into a sorted binary file:
+- a header with MAGIC, the number of records and FANOUT_BITS
+- the fan-out table, for every 5 character hash prefix the index of its first record, followed by the record count
+- the records, the 20 byte hash and its count as a 4 byte big endian number, sorted by hash
+A lookup reads two numbers of the table and binary searches the few hundred records of the prefix in the mapped file,
+so the operating system only loads the pages that are touched.
+
+Convert a file from the command line:
+    python source/pwnedCorpus.py pwnedpasswords.txt resources/pwned_corpus.bin
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from functools import lru_cache
+from typing import Iterator
+
+MAGIC = b"PWC1"
+FANOUT_BITS = 20  # five hex characters, the prefix length of the range API
+_HEADER = struct.Struct("<4sIQ")
+_RECORD = struct.Struct(">20sI")
+_BOUNDS = struct.Struct("<QQ")
+_BUCKETS = 256
+
+class hashCorpus:
+    """
+    A converted corpus mapped into memory
+
+    Methods
+    -------
+    count(passwordHash: str) -> int
+        Returns how often a hash was breached
+    range(prefix: str) -> dict
+        Returns all hashes with a prefix like the range API
+    close() -> None
+        Unmaps the file
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, fanoutBits, self.records = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            magic, fanoutBits = b"", 0
+        self._tableOffset = _HEADER.size
+        self._recordOffset = self._tableOffset + ((1 << FANOUT_BITS) + 1) * 8
+        if magic != MAGIC or fanoutBits != FANOUT_BITS or len(self._map) != self._recordOffset + self.records * _RECORD.size:
+            self._map.close()
+            raise ValueError(f"{path} is not a converted hash corpus")
+
+    def count(self, passwordHash: str) -> int:
+        """
+        Returns how often a hash was breached
+
+        Parameters:
+        - passwordHash: The SHA1 hash of the password in hex, like hashPassword returns it.
+
+        Returns:
+        - The count, 0 if the hash isn't in the corpus.
+        """
+        digest = bytes.fromhex(passwordHash)
+        low, high = self._bounds(int(passwordHash[:FANOUT_BITS // 4], 16))
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._recordOffset + middle * _RECORD.size
+            candidate = self._map[offset:offset + 20]
+            if candidate < digest:
+                low = middle + 1
+            elif candidate > digest:
+                high = middle
+            else:
+                count: int = _RECORD.unpack_from(self._map, offset)[1]
+                return count
+        return 0
+
+    def range(self, prefix: str) -> dict:
+        """
+        Returns all hashes that start with a prefix, like the range API
+
+        Parameters:
+        - prefix: The first five characters of an upper case SHA1 hash.
+
+        Returns:
+        - The remaining 35 characters of each hash mapped to how often it was breached.
+        """
+        low, high = self._bounds(int(prefix, 16))
+        start = self._recordOffset + low * _RECORD.size
+        cut = FANOUT_BITS // 4
+        return {digest.hex().upper()[cut:]: count
+                for digest, count in _RECORD.iter_unpack(self._map[start:start + (high - low) * _RECORD.size])}
+
+    def close(self) -> None:
+        """
+        Unmaps the file
+        """
+        self._map.close()
+
+    def _bounds(self, prefix: int) -> tuple:
+        return _BOUNDS.unpack_from(self._map, self._tableOffset + prefix * 8)
+
+@lru_cache(maxsize=4)
+def openCorpus(path: str) -> hashCorpus:
+    """
+    Returns the corpus in a file, each file is only mapped once
+
+    Parameters:
+    - path: The converted corpus.
+
+    Raises:
+    - RuntimeError: If the file is missing or isn't a converted corpus.
+    """
+    try:
+        return hashCorpus(path)
+    except (OSError, ValueError) as error:
+        raise RuntimeError(f"Offline breach check failed: {error}") from error
+
+def convertCorpus(sourcePath: str, targetPath: str) -> int:
+    """
+    Converts a text file of "SHA1:COUNT" lines in any order into a binary corpus.
+    The records are first split into a temporary file per first byte, then each of them is sorted in memory,
+    so the memory needed is about one 256th of the records.
+
+    Parameters:
+    - sourcePath: The text file, blank lines are skipped.
+    - targetPath: The binary file to write, it is replaced once it is complete.
+
+    Raises:
+    - ValueError: If a line isn't a SHA1 hash and a count.
+
+    Returns:
+    - The number of records.
+    """
+    directory = os.path.dirname(os.path.abspath(targetPath))
+    with tempfile.TemporaryDirectory(dir=directory) as bucketDirectory:
+        buckets = [open(os.path.join(bucketDirectory, f"{idx:02x}"), "w+b") for idx in range(_BUCKETS)] #pylint: disable=R1732
+        try:
+            _splitRecords(sourcePath, buckets)
+            return _writeCorpus(buckets, targetPath)
+        finally:
+            for bucket in buckets:
+                bucket.close()
+
+def readHashes(sourcePath: str) -> Iterator[tuple]:
+    """
+    Reads a text file of "SHA1:COUNT" lines
+
+    Parameters:
+    - sourcePath: The text file, blank lines are skipped.
+
+    Raises:
+    - ValueError: If a line isn't a SHA1 hash and a count.
+
+    Returns:
+    - The 20 byte hash and the count of every line.
+    """
+    with open(sourcePath, "rb") as source:
+        for lineNumber, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            passwordHash, _, count = line.partition(b":")
+            try:
+                digest, number = bytes.fromhex(passwordHash.decode()), int(count)
+            except (ValueError, UnicodeDecodeError):
+                digest, number = b"", 0
+            if len(digest) != 20:
+                raise ValueError(f"Invalid line {lineNumber} in {sourcePath}")
+            yield digest, number
+
+def _splitRecords(sourcePath: str, buckets: list) -> None:
+    for digest, count in readHashes(sourcePath):
+        try:
+            buckets[digest[0]].write(_RECORD.pack(digest, count))
+        except struct.error:
+            raise ValueError(f"Invalid count {count} in {sourcePath}") from None
+
+def _writeCorpus(buckets: list, targetPath: str) -> int:
+    table = array("Q", bytes(((1 << FANOUT_BITS) + 1) * 8))
+    shift = 24 - FANOUT_BITS
+    temporaryPath = targetPath + ".tmp"
+    records = 0
+    with open(temporaryPath, "wb") as target:
+        target.seek(_HEADER.size + len(table) * 8)
+        for bucket in buckets:
+            bucket.seek(0)
+            data = bucket.read()
+            sortedRecords = sorted(data[offset:offset + _RECORD.size] for offset in range(0, len(data), _RECORD.size))
+            for record in sortedRecords:
+                table[(int.from_bytes(record[:3], "big") >> shift) + 1] += 1
+            target.write(b"".join(sortedRecords))
+            records += len(sortedRecords)
+        # The table holds the counts per prefix so far, summing them up gives the index of the first record of each
+        for prefix in range(1, len(table)):
+            table[prefix] += table[prefix - 1]
+        if sys.byteorder != "little":
+            table.byteswap()
+        target.seek(0)
+        target.write(_HEADER.pack(MAGIC, FANOUT_BITS, records))
+        target.write(table.tobytes())
+    os.replace(temporaryPath, targetPath)
+    return records
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python source/pwnedCorpus.py <hashes.txt> <corpus.bin>")
+        sys.exit(1)
+    print(f"Converted {convertCorpus(sys.argv[1], sys.argv[2])} hashes.")
@@ -0,0 +1,169 @@
+""" This module contains the list of the user's entries that also finds them by website """
+from typing import Iterable, SupportsIndex
+
+from entry import entry
+from domainNormalizer import normalizeHost, registrableDomain
+
+class vault(list):
+    """
+    List of the user's entries with a map from website to entry, so lookups and the duplicate check on add are O(1).
+    Two more maps from the normalized host and the registrable domain of the website let a full URL find its entry.
+    The maps follow every change of the list and renames through entry.updateWebsite.
+    Like the list, a vault may hold several entries of the same website, get returns the first one that was added.
+
+    Methods
+    -------
+    get(website: str) -> entry|None
+        Returns the entry of the website
+    getByUrl(url: str) -> entry|None
+        Returns the entry of the website, the host or the domain of the URL
+    websiteChanged(userEntry: entry, oldWebsite: str) -> None
+        Moves a renamed entry in the map, called by entry.updateWebsite
+    """
+    def __init__(self, userEntries: Iterable = ()) -> None:
+        super().__init__()
+        # website -> entries of that website, almost always a single one
+        self._websites: dict = {}
+        # normalized host and registrable domain -> entries, e.g. "mail.google.com" and "google.com"
+        self._hosts: dict = {}
+        self._domains: dict = {}
+        # Counts the changes of the vault, views computed from it are valid while it stays the same
+        self.version = 0
+        self.extend(userEntries)
+
+    def get(self, website: str) -> entry|None:
+        """
+        Returns the entry of the website
+
+        Parameters:
+        - website: The website of the entry.
+
+        Returns:
+        - The entry, None if there is no entry for the website.
+        """
+        entries = self._websites.get(website)
+        return entries[0] if entries else None
+
+    def getByUrl(self, url: str) -> entry|None:
+        """
+        Returns the entry of a URL, like "https://www.github.com/login" for the entry "GitHub.com".
+        An entry with exactly this website wins over one with the same host, which wins over one of the same domain.
+
+        Parameters:
+        - url: The URL or the name of the website.
+
+        Returns:
+        - The entry, None if no entry belongs to the domain of the URL.
+        """
+        found = self.get(url)
+        if found is not None:
+            return found
+        host = normalizeHost(url)
+        for mapping, key in ((self._hosts, host), (self._domains, registrableDomain(host))):
+            entries: list[entry] = mapping.get(key, [])
+            if entries:
+                return entries[0]
+        return None
+
+    def websiteChanged(self, userEntry: entry, oldWebsite: str) -> None:
+        """
+        Moves a renamed entry in the map, called by entry.updateWebsite
+
+        Parameters:
+        - userEntry: The renamed entry.
+        - oldWebsite: The website before the rename.
+        """
+        self._removeWebsite(userEntry, oldWebsite)
+        self._addWebsite(userEntry)
+        self.version += 1
+
+    def __contains__(self, value: object) -> bool:
+        # Entries are equal if their websites are, so the map answers the same as the list
+        if isinstance(value, entry):
+            return value.website in self._websites
+        return super().__contains__(value)
+
+    def append(self, userEntry: entry) -> None:
+        super().append(userEntry)
+        self._add(userEntry)
+
+    def extend(self, userEntries: Iterable) -> None:
+        for userEntry in userEntries:
+            self.append(userEntry)
+
+    def __iadd__(self, userEntries: Iterable) -> "vault": # type: ignore[override, misc]
+        self.extend(userEntries)
+        return self
+
+    def insert(self, index: SupportsIndex, userEntry: entry) -> None:
+        super().insert(index, userEntry)
+        self._add(userEntry)
+
+    def remove(self, userEntry: entry) -> None:
+        # Entries of the same website are equal, the given entry is removed and not the first one that equals it
+        position = next((idx for idx, other in enumerate(self) if other is userEntry), None)
+        if position is None:
+            raise ValueError("vault.remove(x): x not in vault")
+        del self[position]
+
+    def pop(self, index: SupportsIndex = -1) -> entry:
+        userEntry: entry = super().pop(index)
+        self._remove(userEntry)
+        return userEntry
+
+    def clear(self) -> None:
+        for userEntry in self:
+            userEntry.clearOwner(self)
+        super().clear()
+        self._websites.clear()
+        self._hosts.clear()
+        self._domains.clear()
+        self.version += 1
+
+    def __setitem__(self, index: SupportsIndex|slice, value: object) -> None: # type: ignore[override]
+        if isinstance(index, slice):
+            removed = super().__getitem__(index)
+            added = list(value) # type: ignore[call-overload]
+            super().__setitem__(index, added)
+        else:
+            removed = [super().__getitem__(index)]
+            added = [value]
+            super().__setitem__(index, value) # type: ignore[index]
+        for userEntry in removed:
+            self._remove(userEntry)
+        for userEntry in added:
+            self._add(userEntry)
+
+    def __delitem__(self, index: SupportsIndex|slice) -> None:
+        removed = super().__getitem__(index)
+        super().__delitem__(index)
+        for userEntry in removed if isinstance(index, slice) else [removed]:
+            self._remove(userEntry)
+
+    def _add(self, userEntry: entry) -> None:
+        self._addWebsite(userEntry)
+        userEntry.setOwner(self)
+        self.version += 1
+
+    def _remove(self, userEntry: entry) -> None:
+        self._removeWebsite(userEntry, userEntry.website)
+        if not any(candidate is userEntry for candidate in self._websites.get(userEntry.website, ())):
+            userEntry.clearOwner(self)
+        self.version += 1
+
+    def _addWebsite(self, userEntry: entry) -> None:
+        host = normalizeHost(userEntry.website)
+        for mapping, key in ((self._websites, userEntry.website), (self._hosts, host), (self._domains, registrableDomain(host))):
+            mapping.setdefault(key, []).append(userEntry)
+
+    def _removeWebsite(self, userEntry: entry, website: str) -> None:
+        host = normalizeHost(website)
+        for mapping, key in ((self._websites, website), (self._hosts, host), (self._domains, registrableDomain(host))):
+            entries = mapping[key]
+            # Compare by identity, entries of the same website are equal
+            for position, candidate in enumerate(entries):
+                if candidate is userEntry:
+                    del entries[position]
+                    break
+            if not entries:
+                del mapping[key]
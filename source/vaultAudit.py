@@ -0,0 +1,83 @@
+""" This module checks all entries of a vault for weak, reused, breached and stale passwords in one pass """
+import time
+
+from checkPassword import checkPassword, reuseIndex
+from checkPwned import fetchCounts, hashPassword, BATCH_WORKERS
+
+STALE_AGE = 365 * 24 * 60 * 60  # seconds without a change after which an entry is reported as stale
+
+class auditReport:
+    """
+    The findings of an audit, every list keeps the order of the vault, breached is sorted by count first
+
+    Attributes
+    ----------
+    weak: list
+        Entries whose password fails checkPassword
+    reused: list
+        (entry, other entries) tuples for passwords that other entries use or used before
+    breached: list
+        (entry, count) tuples for passwords that appeared in a breach
+    stale: list
+        Entries that weren't changed for STALE_AGE seconds
+    unchecked: list
+        Entries whose breach check failed
+    errors: list
+        The distinct error messages of the failed breach checks
+    """
+    #pylint: disable=R0903
+    def __init__(self) -> None:
+        self.weak: list = []
+        self.reused: list = []
+        self.breached: list = []
+        self.stale: list = []
+        self.unchecked: list = []
+        self.errors: list = []
+
+    def __bool__(self) -> bool:
+        return any((self.weak, self.reused, self.breached, self.stale, self.unchecked))
+
+def auditVault(userEntries: list, reuse: reuseIndex|None = None, checkBreaches: bool = True,
+               now: float|None = None, workers: int = BATCH_WORKERS) -> auditReport:
+    """
+    Checks the strength, reuse, breaches and age of every entry in one pass.
+    Each breach range is fetched once for all passwords whose hashes share its prefix, the ranges are fetched concurrently.
+
+    Parameters:
+    - userEntries: A list of the users entries.
+    - reuse: The password reuse index of the entries, one is built if it is missing.
+    - checkBreaches: False skips the requests to the Pwned Passwords API.
+    - now: The time the age of the entries is measured from, the current time by default.
+    - workers: The number of concurrent requests.
+
+    Returns:
+    - The report of the findings.
+    """
+    report = auditReport()
+    if reuse is None:
+        reuse = reuseIndex(userEntries)
+    now = time.time() if now is None else now
+    # SHA1 hash -> entries with that password, a password used by several entries is only looked up once
+    hashes: dict = {}
+    hashed: list = []
+    for userEntry in userEntries:
+        if not checkPassword(userEntry.password):
+            report.weak.append(userEntry)
+        others = [other for other in reuse.entriesUsing(userEntry.password) if other is not userEntry]
+        if others:
+            report.reused.append((userEntry, others))
+        if now - userEntry.timestamps[-1] > STALE_AGE:
+            report.stale.append(userEntry)
+        if checkBreaches and userEntry.password:
+            passwordHash = hashPassword(userEntry.password)
+            hashes.setdefault(passwordHash, []).append(userEntry)
+            hashed.append((userEntry, passwordHash))
+    if hashes:
+        counts = fetchCounts(hashes, report.errors, workers)
+        for userEntry, passwordHash in hashed:
+            if passwordHash not in counts:
+                report.unchecked.append(userEntry)
+            elif counts[passwordHash]:
+                report.breached.append((userEntry, counts[passwordHash]))
+        report.breached.sort(key=lambda finding: finding[1], reverse=True)
+    return report
@@ -0,0 +1,442 @@
+"""
+This module contains the indexed container format of the user's entries.
+
+Layout of the file (version 4):
+- header: MAGIC with the version, KDF id and iterations, compression and its level, salt, snapshot id, generation
+  and the length of the index
+- nonce and AES-GCM encrypted index of website, username and record position
+- the entry records, every one of them encrypted with AES-GCM on its own
+With compression the index and every record are compressed before they are encrypted,
+payloads that don't get smaller (e.g. short entries) are stored as they are.
+The header is authenticated together with the index and the records, so a wrong key fails on the first tag.
+The generation is increased with every snapshot, so sessions notice when another session saved in between.
+Files are replaced with a temporary file and a rename, a crash leaves either the old or the new snapshot.
+Version 3 files (no compression), version 2 files (no generation), version 1 files (AES-CBC, no KDF parameters) and files holding one
+encrypted list are still read, they are migrated on the next save.
+"""
+import json
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterator
+try:
+    import lzma
+except ImportError:  # Python can be built without lzma, zlib is always available
+    lzma = None  # type: ignore[assignment]
+
+from entry import entry
+from entryCodec import FORMAT_HEADER, decodeEntry, encodeEntry, entryFromValues, isEncoded, readString, writeString
+from cryptographyManager import SALT_SIZE, KDF_ITERATIONS, decryptAeadInto, decryptInto, encryptAead, wipeBuffer
+from vaultLock import writeAtomic
+
+MAGIC = b"PPPMVLT"
+VERSION = 4
+KDF_PBKDF2_SHA256 = 1
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+COMPRESSION_LEVEL = 6
+LEGACY_ITERATIONS = 100000
+CHUNK_SIZE = 64 * 1024
+DECOMPRESS_CHUNK = 4 * 1024
+_AEAD_OVERHEAD = 12 + 16  # nonce and tag
+_LENGTH = struct.Struct(">I")
+_POSITION = struct.Struct("<QI")
+_OFFSET = struct.Struct(">Q")
+_HEADER_V1 = struct.Struct(f">{len(MAGIC) + 1}s{SALT_SIZE}sI")
+_HEADER_V2 = struct.Struct(f">{len(MAGIC) + 1}sBI{SALT_SIZE}s16sI")
+_HEADER_V3 = struct.Struct(f">{len(MAGIC) + 1}sBI{SALT_SIZE}s16sQI")
+_HEADER_V4 = struct.Struct(f">{len(MAGIC) + 1}sBIBB{SALT_SIZE}s16sQI")
+# Fields of the AES-GCM headers after MAGIC and the version
+_HEADER_FIELDS = {
+    2: (_HEADER_V2, ("kdf", "iterations", "salt", "snapshotId", "indexLength")),
+    3: (_HEADER_V3, ("kdf", "iterations", "salt", "snapshotId", "generation", "indexLength")),
+    4: (_HEADER_V4, ("kdf", "iterations", "compression", "level", "salt", "snapshotId", "generation", "indexLength")),
+}
+_STORED = b"\x00"
+_DECOMPRESS_ERRORS = (zlib.error,) if lzma is None else (zlib.error, lzma.LZMAError)
+_COMPRESSED = b"\x01"
+
+class vaultHeader:
+    """
+    The header of the user's file
+
+    Attributes
+    ----------
+    version: int
+        0 for files holding one encrypted list, 1 for AES-CBC and 2 to 4 for AES-GCM indexed files
+    iterations: int
+        PBKDF2 iterations the key was derived with
+    salt: bytes
+        salt the key was derived with
+    snapshotId: bytes
+        random id that changes with every write of the file
+    generation: int
+        number of the snapshot, it is increased with every write of the file
+    compression: int
+        COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_LZMA
+    level: int
+        compression level the file was written with
+    """
+    #pylint: disable=R0903
+    def __init__(self, version: int, iterations: int, salt: bytes, snapshotId: bytes, indexLength: int = 0, raw: bytes = b"",
+                 generation: int = 0, compression: int = COMPRESSION_NONE, level: int = 0) -> None:
+        self.version = version
+        self.iterations = iterations
+        self.salt = salt
+        self.snapshotId = snapshotId
+        self.indexLength = indexLength
+        self.raw = raw
+        self.generation = generation
+        self.compression = compression
+        self.level = level
+
+    def recordsStart(self) -> int:
+        """
+        Position of the first record in the file
+        """
+        return len(self.raw) + self.indexLength
+
+def getVaultPath(user: str) -> str:
+    """
+    Get the filepath for the user's entries
+    """
+    return f"resources/{user}_entries.enc"
+
+def isIndexedVault(user: str) -> bool:
+    """
+    Check if the user's file is in the indexed format, older files hold one encrypted list
+    """
+    try:
+        with open(getVaultPath(user), "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+def readHeader(user: str) -> vaultHeader|None:
+    """
+    Read the header of the user's file
+
+    Raises:
+    - ValueError: if the file was written by a newer version.
+
+    Returns:
+    - The header or None if the file holds no encrypted content yet.
+    """
+    try:
+        with open(getVaultPath(user), "rb") as file:
+            return _parseHeader(file.read(_HEADER_V4.size))
+    except FileNotFoundError:
+        return None
+
+def _parseHeader(content: bytes) -> vaultHeader|None:
+    if not content.startswith(MAGIC):
+        # Files holding one encrypted list start with the salt and the IV
+        if len(content) < SALT_SIZE + 16:
+            return None
+        return vaultHeader(0, LEGACY_ITERATIONS, content[:SALT_SIZE], content[SALT_SIZE:SALT_SIZE + 16])
+    version = content[len(MAGIC)] if len(content) > len(MAGIC) else 0
+    if version > VERSION:
+        raise ValueError(f"File format version {version} is newer than this program")
+    if version == 1 and len(content) >= _HEADER_V1.size + 16:
+        _, salt, indexLength = _HEADER_V1.unpack_from(content)
+        # The IV of the index is new for every write, so it identifies the snapshot
+        snapshotId = content[_HEADER_V1.size:_HEADER_V1.size + 16]
+        return vaultHeader(1, LEGACY_ITERATIONS, salt, snapshotId, indexLength, content[:_HEADER_V1.size])
+    if version not in _HEADER_FIELDS or len(content) < _HEADER_FIELDS[version][0].size:
+        return None
+    layout, names = _HEADER_FIELDS[version]
+    values = dict(zip(names, layout.unpack_from(content)[1:]))
+    kdf = values.pop("kdf")
+    if kdf != KDF_PBKDF2_SHA256:
+        raise ValueError(f"Unknown key derivation {kdf}")
+    return vaultHeader(version, raw=content[:layout.size], **values)
+
+def writeVault(user: str, key: bytes|bytearray, salt: bytes, userEntries: list, iterations: int = KDF_ITERATIONS,
+               generation: int = 0, compression: int = COMPRESSION_NONE, level: int = COMPRESSION_LEVEL) -> bool:
+    """
+    Write the user's entries in the indexed format, the file is replaced at once
+
+    Parameters:
+    - user: The username of the user.
+    - key: The key derived from the master password and salt.
+    - salt: The salt the key was derived with.
+    - userEntries: A list of the users entries.
+    - iterations: The PBKDF2 iterations the key was derived with.
+    - generation: The generation of the new snapshot.
+    - compression: COMPRESSION_NONE, COMPRESSION_ZLIB or COMPRESSION_LZMA.
+    - level: The compression level from 0 (fastest) to 9 (smallest).
+
+    Raises:
+    - ValueError: if the compression or its level is unknown.
+
+    Returns:
+    - True if the file was written successfully, False otherwise.
+    """
+    if compression == COMPRESSION_NONE:
+        level = 0
+    elif compression not in (COMPRESSION_ZLIB, COMPRESSION_LZMA) or compression == COMPRESSION_LZMA and lzma is None:
+        raise ValueError(f"Unknown compression {compression}")
+    if not 0 <= level <= 9:
+        raise ValueError(f"Invalid compression level {level}")
+    snapshotId = os.urandom(16)
+    records = bytearray()
+    index = bytearray(FORMAT_HEADER)
+    index += _LENGTH.pack(len(userEntries))
+    for _entry in userEntries:
+        record = encryptAead(_compress(encodeEntry(_entry), compression, level), key, snapshotId + _OFFSET.pack(len(records)))
+        writeString(index, _entry.website)
+        writeString(index, _entry.username)
+        index += _POSITION.pack(len(records), len(record))
+        records += record
+    compressedIndex = _compress(bytes(index), compression, level)
+    header = _HEADER_V4.pack(MAGIC + bytes([VERSION]), KDF_PBKDF2_SHA256, iterations, compression, level, salt, snapshotId,
+                             generation, len(compressedIndex) + _AEAD_OVERHEAD)
+    try:
+        # One write and one sync for the whole snapshot
+        writeAtomic(getVaultPath(user), b"".join([header, encryptAead(compressedIndex, key, header), records]))
+        return True
+    except FileNotFoundError:
+        return False
+
+def checkKey(user: str, key: bytes|bytearray) -> bool:
+    """
+    Check if the key belongs to the user's file, only the tag of the index is checked.
+    Version 1 files have no tag, a wrong key fails on the padding or the JSON of their index.
+    Files holding one encrypted list are decrypted completely, a wrong key fails on the padding or the encoding.
+    A file without encrypted content accepts any key.
+    """
+    header = readHeader(user)
+    if header is None:
+        return True
+    try:
+        if header.version == 0:
+            _checkListKey(user, key)
+        else:
+            readIndex(user, key)
+    except ValueError:
+        return False
+    return True
+
+def _checkListKey(user: str, key: bytes|bytearray) -> None:
+    with open(getVaultPath(user), "rb") as file:
+        encryptedContent = file.read()
+    # The salt is in front of the IV and the encrypted list
+    buffer = bytearray(len(encryptedContent))
+    try:
+        str(decryptInto(memoryview(encryptedContent)[SALT_SIZE:], key, buffer), "utf-8")
+    except UnicodeDecodeError as error:
+        raise ValueError("Invalid file format") from error
+    finally:
+        wipeBuffer(buffer)
+
+def readIndex(user: str, key: bytes|bytearray) -> list:
+    """
+    Decrypt only the index of the user's file
+
+    Raises:
+    - ValueError: if the index can't be decrypted with the key.
+
+    Returns:
+    - List of (website, username, offset, length) tuples, offset is the position of the record in the file.
+    """
+    with open(getVaultPath(user), "rb") as file:
+        header = _parseHeader(file.read(_HEADER_V4.size))
+        if header is None or header.version == 0:
+            raise ValueError("Invalid file format")
+        file.seek(len(header.raw))
+        encryptedIndex = _readInto(file, bytearray(header.indexLength), header.indexLength)
+    buffer = bytearray(len(encryptedIndex))
+    output = bytearray()
+    try:
+        decryptedIndex = _decryptPayload(header, encryptedIndex, key, header.raw, buffer, output)
+        if not isEncoded(decryptedIndex):
+            # Indexes written before the binary encoding are JSON
+            try:
+                index = json.loads(bytes(decryptedIndex))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ValueError("Invalid file format") from None
+            return [(website, username, header.recordsStart() + offset, length) for website, username, offset, length in index]
+        return _parseIndex(memoryview(decryptedIndex), header.recordsStart())
+    finally:
+        wipeBuffer(buffer)
+        wipeBuffer(output)
+
+def _parseIndex(view: memoryview, recordsStart: int) -> list:
+    try:
+        (count,) = _LENGTH.unpack_from(view, len(FORMAT_HEADER))
+        position = len(FORMAT_HEADER) + _LENGTH.size
+        index = []
+        for _ in range(count):
+            website, position = readString(view, position)
+            username, position = readString(view, position)
+            offset, length = _POSITION.unpack_from(view, position)
+            position += _POSITION.size
+            index.append((website, username, recordsStart + offset, length))
+    except struct.error:
+        raise ValueError("Invalid file format") from None
+    return index
+
+def readRecord(user: str, key: bytes|bytearray, offset: int, length: int) -> entry:
+    """
+    Decrypt a single entry record of the user's file
+
+    Raises:
+    - ValueError: if the record can't be decrypted with the key.
+    """
+    header = readHeader(user)
+    if header is None:
+        raise ValueError("Invalid file format")
+    with open(getVaultPath(user), "rb") as file:
+        file.seek(offset)
+        encryptedRecord = _readInto(file, bytearray(length), length)
+    return _decryptRecord(header, encryptedRecord, key, offset, bytearray(length), bytearray())
+
+def readVault(user: str, key: bytes|bytearray) -> list:
+    """
+    Decrypt all entries of the user's file
+
+    Raises:
+    - ValueError: if the file can't be decrypted with the key.
+    """
+    return list(iterRecords(user, key, readIndex(user, key)))
+
+def iterRecords(user: str, key: bytes|bytearray, index: list, vaultFile: BinaryIO|None = None) -> Iterator[entry]:
+    """
+    Decrypt the entries of the user's file one record at a time.
+    Only the index and the current record are held in memory.
+
+    Parameters:
+    - user: The username of the user.
+    - key: The key derived from the master password and salt.
+    - index: The index returned by readIndex.
+    - vaultFile: Open handle of the user's file the index was read from, the file is opened by path if None.
+      A handle keeps reading the same snapshot even if another session replaces the file meanwhile.
+
+    Raises:
+    - ValueError: if a record can't be decrypted, a snapshot written from the other entries would lose it.
+    """
+    if not index:
+        return
+    if vaultFile is None:
+        with open(getVaultPath(user), "rb", buffering=CHUNK_SIZE) as file:
+            yield from _iterRecords(file, key, index)
+    else:
+        yield from _iterRecords(vaultFile, key, index)
+
+def _iterRecords(file: BinaryIO, key: bytes|bytearray, index: list) -> Iterator[entry]:
+    file.seek(0)
+    header = _parseHeader(file.read(_HEADER_V4.size))
+    if header is None:
+        return
+    # The records are stored in the order of the index, so the file is read front to back.
+    # Every record is read into and decrypted in the same two buffers, they only grow for larger records.
+    # Compressed records are decompressed into a third one that grows as needed.
+    file.seek(index[0][2])
+    encryptedBuffer = bytearray()
+    buffer = bytearray()
+    output = bytearray()
+    for website, _, offset, length in index:
+        if len(encryptedBuffer) < length:
+            encryptedBuffer = bytearray(length)
+            buffer = bytearray(length)
+        try:
+            record = _decryptRecord(header, _readInto(file, encryptedBuffer, length), key, offset, buffer, output)
+        except ValueError as error:
+            raise ValueError(f"The record of {website} can't be decrypted, the file is damaged") from error
+        yield record
+
+def _readInto(file: BinaryIO, buffer: bytearray, length: int) -> memoryview:
+    view = memoryview(buffer)[:length]
+    return view[:file.readinto(view)]  # type: ignore[attr-defined]
+
+def _decryptPayload(header: vaultHeader, encrypted: memoryview, key: bytes|bytearray, associatedData: bytes,
+                    buffer: bytearray, output: bytearray) -> memoryview:
+    """
+    Decrypt a payload into the buffer, compressed payloads are decompressed into the output.
+    The caller wipes both of them.
+    """
+    if header.version == 1:
+        return decryptInto(encrypted, key, buffer)
+    return _decompress(decryptAeadInto(encrypted, key, associatedData, buffer), header, output)
+
+def _decryptRecord(header: vaultHeader, encryptedRecord: memoryview, key: bytes|bytearray, offset: int, buffer: bytearray,
+                   output: bytearray) -> entry:
+    # Records are bound to their snapshot and position
+    associatedData = header.snapshotId + _OFFSET.pack(offset - header.recordsStart())
+    decryptedRecord = memoryview(b"")
+    try:
+        decryptedRecord = _decryptPayload(header, encryptedRecord, key, associatedData, buffer, output)
+        if isEncoded(decryptedRecord):
+            return decodeEntry(decryptedRecord)
+        # Records written before the binary encoding are JSON
+        try:
+            return entryFromValues(json.loads(bytes(decryptedRecord)))
+        except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError):
+            raise ValueError("Invalid file format") from None
+    finally:
+        # Only the part of the buffers this record used holds its plaintext
+        wipeBuffer(memoryview(buffer)[:len(encryptedRecord)])
+        wipeBuffer(memoryview(output)[:len(decryptedRecord)])
+
+def _compress(payload: bytes, compression: int, level: int) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return payload
+    if compression == COMPRESSION_ZLIB:
+        # Raw deflate, the zlib header and checksum are not needed inside an authenticated record
+        compressed = zlib.compress(payload, level, wbits=-15)
+    else:
+        compressed = lzma.compress(payload, format=lzma.FORMAT_RAW, filters=_lzmaFilters(level))
+    if len(compressed) < len(payload):
+        return _COMPRESSED + compressed
+    return _STORED + payload
+
+def _decompress(payload: memoryview, header: vaultHeader, output: bytearray) -> memoryview:
+    """
+    Decompress a payload into the output, it grows as needed.
+    The decompressors only return new bytes objects, each chunk is copied into the output and dropped at once,
+    so only the output that the caller wipes holds the whole plaintext.
+    """
+    if header.compression == COMPRESSION_NONE:
+        return payload
+    if payload[:1] == _STORED:
+        return payload[1:]
+    if payload[:1] != _COMPRESSED:
+        raise ValueError("Invalid file format")
+    decompressor: "zlib._Decompress|lzma.LZMADecompressor"
+    if header.compression == COMPRESSION_ZLIB:
+        decompressor = zlib.decompressobj(wbits=-15)
+    elif header.compression == COMPRESSION_LZMA and lzma is not None:
+        decompressor = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=_lzmaFilters(header.level))
+    else:
+        raise ValueError(f"Unknown compression {header.compression}")
+    data: memoryview|bytes = payload[1:]
+    used = 0
+    try:
+        while not decompressor.eof:
+            chunk = decompressor.decompress(data, DECOMPRESS_CHUNK)
+            # zlib hands back the input it didn't get to, lzma keeps it
+            data = getattr(decompressor, "unconsumed_tail", b"")
+            if not chunk and not data and getattr(decompressor, "needs_input", True):
+                raise ValueError("Invalid file format")
+            used = _appendChunk(output, used, chunk)
+    except (ValueError,) + _DECOMPRESS_ERRORS as error:
+        wipeBuffer(memoryview(output)[:used])
+        raise ValueError("Invalid file format") from error
+    return memoryview(output)[:used]
+
+def _appendChunk(output: bytearray, used: int, chunk: bytes) -> int:
+    end = used + len(chunk)
+    if end > len(output):
+        # Growing may move the buffer and free the old one as it is, so the plaintext is moved out and wiped first
+        grown = bytearray(max(end, 2 * len(output)))
+        grown[:used] = memoryview(output)[:used]
+        wipeBuffer(output)
+        output.extend(bytes(len(grown) - len(output)))
+        output[:used] = memoryview(grown)[:used]
+        wipeBuffer(grown)
+    output[used:end] = chunk
+    return end
+
+def _lzmaFilters(level: int) -> list:
+    return [{"id": lzma.FILTER_LZMA2, "preset": level}]
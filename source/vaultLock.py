@@ -0,0 +1,112 @@
+""" This module contains the inter-process lock and the crash-safe writes of the user's files """
+import os
+import tempfile
+import time
+try:
+    import fcntl
+except ImportError:  # fcntl is not available on Windows, the lock is skipped there
+    fcntl = None  # type: ignore[assignment]
+
+LOCK_TIMEOUT = 10  # seconds to wait for another process before giving up
+_LOCK_POLL = 0.05
+
+def getLockPath(user: str) -> str:
+    """
+    Get the filepath of the lock file of the user's files, it is kept between sessions
+    """
+    return f"resources/{user}_entries.lock"
+
+class vaultConflictError(RuntimeError):
+    """ Raised when the user's file was changed by another session since it was loaded """
+
+class vaultLock:
+    """
+    Advisory lock on the user's files, shared for loads and exclusive for saves.
+    The lock is held on a separate lock file because the vault itself is replaced on every save.
+
+    Methods
+    -------
+    acquire() -> None
+        Waits for the lock
+    release() -> None
+        Releases the lock
+    """
+    def __init__(self, user: str, exclusive: bool = False, timeout: float = LOCK_TIMEOUT) -> None:
+        self.path = getLockPath(user)
+        self.exclusive = exclusive
+        self.timeout = timeout
+        self._file: int|None = None
+
+    def acquire(self) -> None:
+        """
+        Waits for the lock
+
+        Raises:
+        - RuntimeError: if another process holds the lock for longer than the timeout.
+        """
+        if fcntl is None:
+            return
+        self._file = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        operation = (fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(self._file, operation)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self.release()
+                    raise RuntimeError("The vault is locked by another session") from None
+                time.sleep(_LOCK_POLL)
+
+    def release(self) -> None:
+        """
+        Releases the lock, closing the lock file drops it
+        """
+        if self._file is not None:
+            os.close(self._file)
+            self._file = None
+
+    def __enter__(self) -> "vaultLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.release()
+
+def writeAtomic(path: str, content: bytes) -> None:
+    """
+    Replace the file with the content, after a crash the file holds either the old or the new content
+
+    Parameters:
+    - path: The path of the file.
+    - content: The complete new content, it is written and synced at once.
+    """
+    directory = os.path.dirname(path) or "."
+    handle, temporaryPath = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporaryPath, path)
+    except BaseException:
+        try:
+            os.remove(temporaryPath)
+        except FileNotFoundError:
+            pass
+        raise
+    _syncDirectory(directory)
+
+def _syncDirectory(directory: str) -> None:
+    # The rename is only durable once the directory entry is synced, not every platform supports this
+    try:
+        handle = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(handle)
+    except OSError:
+        pass
+    finally:
+        os.close(handle)
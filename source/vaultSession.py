@@ -0,0 +1,167 @@
+""" This module contains the session class that keeps a vault unlocked between saves """
+import os
+import threading
+import time
+
+from cryptographyManager import SALT_SIZE, KDF_ITERATIONS, deriveKey, deriveSubkey, encryptWithKey, decryptWithKey
+from vaultFormat import readHeader, checkKey
+
+IDLE_TIMEOUT = 300  # 5 minutes
+
+class vaultSession:
+    """
+    Keeps the key derived at login so saves only cost the AES time
+
+    Methods
+    -------
+    unlock(password: str) -> bool
+        Derives the key once and keeps it until the session is locked
+    lock() -> None
+        Wipes the key
+    isUnlocked() -> bool
+        Returns if the key is still available
+    encrypt(content: str) -> bool
+        Encrypts the content with a fresh IV and writes it to the users file
+    decrypt() -> str
+        Decrypts the users file
+    subkey(info: bytes) -> bytearray
+        Returns a key for another purpose derived from the session key
+    useKey() -> bytearray
+        Returns the session key
+
+    Attributes
+    ----------
+    loadedVersion: tuple|None
+        (generation, journal size) of the users file the entries were loaded from, None before the first load
+    """
+    #the key material and its idle timer are kept together so lock() can wipe all of it
+    #pylint: disable=R0902
+    def __init__(self, username: str, idleTimeout: float = IDLE_TIMEOUT) -> None:
+        self.username = username
+        self.idleTimeout = idleTimeout
+        self._key = bytearray()
+        self._subkeys: dict[bytes, bytearray] = {}
+        self._salt = b""
+        self._iterations = KDF_ITERATIONS
+        self.loadedVersion: tuple|None = None
+        self._lastActivity = 0.0
+        self._timer: threading.Timer|None = None
+        self._lock = threading.RLock()
+
+    def unlock(self, password: str) -> bool:
+        """
+        Derives the key from the password and the salt and KDF parameters of the users file.
+        Every unlock checks the key against the file, nothing derived from the key is kept while the session is locked.
+        """
+        with self._lock:
+            header = readHeader(self.username)
+            salt = header.salt if header else self._salt or os.urandom(SALT_SIZE)
+            iterations = header.iterations if header else self._iterations
+            key = bytearray(deriveKey(password, salt, iterations))
+            if not checkKey(self.username, key):
+                self._wipe(key)
+                return False
+            self.lock()
+            self._key = key
+            self._salt = salt
+            self._iterations = iterations
+            self._touch()
+            return True
+
+    def lock(self) -> None:
+        """
+        Wipes the key, the session has to be unlocked again before it can be used
+        """
+        with self._lock:
+            self._wipe(self._key)
+            self._key = bytearray()
+            for subkey in self._subkeys.values():
+                self._wipe(subkey)
+            self._subkeys = {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def isUnlocked(self) -> bool:
+        """
+        Returns if the key is available, locks the session if it was idle for too long
+        """
+        with self._lock:
+            if self._key and time.monotonic() - self._lastActivity >= self.idleTimeout:
+                self.lock()
+            return bool(self._key)
+
+    def encrypt(self, content: str) -> bool:
+        """
+        Encrypts the content with the session key and a fresh IV
+        """
+        with self._lock:
+            return encryptWithKey(content, self.useKey(), self._salt, self.username)
+
+    def decrypt(self) -> str:
+        """
+        Decrypts the users file with the session key
+        """
+        with self._lock:
+            return decryptWithKey(self.useKey(), self.username)
+
+    def subkey(self, info: bytes) -> bytearray:
+        """
+        Returns a key for another purpose (e.g. the journal) derived from the session key
+        """
+        with self._lock:
+            key = self.useKey()
+            if info not in self._subkeys:
+                self._subkeys[info] = bytearray(deriveSubkey(key, info))
+            return self._subkeys[info]
+
+    @property
+    def salt(self) -> bytes:
+        """
+        The salt the session key was derived with
+        """
+        return self._salt
+
+    @property
+    def iterations(self) -> int:
+        """
+        The PBKDF2 iterations the session key was derived with
+        """
+        return self._iterations
+
+    def useKey(self) -> bytearray:
+        """
+        Returns the session key and resets the idle timeout
+
+        Raises:
+        - RuntimeError: if the session is locked.
+        """
+        if not self.isUnlocked():
+            raise RuntimeError("Vault session is locked, unlock it with the master password")
+        self._touch()
+        return self._key
+
+    def _touch(self) -> None:
+        with self._lock:
+            self._lastActivity = time.monotonic()
+            # A single timer runs per idle period, it is armed again from the last use when it fires
+            if self._timer is None:
+                self._startTimer(self.idleTimeout)
+
+    def _startTimer(self, delay: float) -> None:
+        self._timer = threading.Timer(delay, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self) -> None:
+        with self._lock:
+            # A timer that was cancelled while it waited for the lock is stale
+            if threading.current_thread() is not self._timer:
+                return
+            self._timer = None
+            if self.isUnlocked():
+                self._startTimer(self._lastActivity + self.idleTimeout - time.monotonic())
+
+    @staticmethod
+    def _wipe(buffer: bytearray) -> None:
+        buffer[:] = bytes(len(buffer))
@@ -0,0 +1,98 @@
+"""
+This file contains the tests for the backgroundSaver.py file.
+"""
+import unittest
+from unittest import mock
+import os
+
+from source.entry import entry
+from source.diskManagement import createFile, getFilepath, loadSessionFromDisk, commitChanges, saveSessionToDisk
+from source.journal import ADD, EDIT, DELETE, clearJournal
+from source.vaultSession import vaultSession
+from source.vaultLock import getLockPath
+from source.backgroundSaver import backgroundSaver, IDLE, SAVED, FAILED, CONFLICT
+
+class uTestBackgroundSaver(unittest.TestCase):
+    """
+    This class contains the tests for the backgroundSaver.py file.
+    """
+
+    def tearDown(self) -> None:
+        # The vault and the journal are removed by the tests, the lock file is left behind by every load and save
+        if os.path.exists(getLockPath("saver_user")):
+            os.remove(getLockPath("saver_user"))
+    def testCoalescing(self) -> None:
+        """
+        This method tests that changes submitted close together are written with one commit.
+        """
+        createFile("saver_user")
+        session = vaultSession("saver_user")
+        session.unlock("password")
+        saver = backgroundSaver(session, delay=0.2)
+        self.assertEqual(saver.state, IDLE)
+        entries = [entry("x", "a", "a", [float(4)], "", [])]
+        with mock.patch("source.backgroundSaver.commitChanges", wraps=commitChanges) as commit:
+            saver.submit(entries)
+            self.assertTrue(saver.flush())
+            entries.append(entry("y", "b", "b", [float(4)], "", []))
+            saver.submit(entries, [(ADD, "y", entries[1])])
+            entries[0].updateNotes("changed")
+            saver.submit(entries, [(EDIT, "x", entries[0])])
+            self.assertTrue(saver.stop())
+            commit.assert_called_once()
+        self.assertEqual(saver.state, SAVED)
+        self.assertEqual(sorted([_entry.toDict() for _entry in loadSessionFromDisk(session)], key=lambda values: values["website"]),
+                         [_entry.toDict() for _entry in entries])
+        session.lock()
+        clearJournal("saver_user")
+        os.remove(getFilepath("saver_user"))
+
+    def testFailedSave(self) -> None:
+        """
+        This method tests that changes are kept when the write fails and are written by the next attempt.
+        """
+        createFile("saver_user")
+        session = vaultSession("saver_user")
+        session.unlock("password")
+        saver = backgroundSaver(session, delay=0)
+        entries = [entry("x", "a", "a", [float(4)], "", [])]
+        session.lock()
+        saver.submit(entries)
+        self.assertFalse(saver.flush())
+        self.assertEqual(saver.state, FAILED)
+        session.unlock("password")
+        self.assertTrue(saver.flush())
+        self.assertEqual(saver.state, SAVED)
+        self.assertEqual(loadSessionFromDisk(session), entries)
+        self.assertTrue(saver.stop())
+        self.assertTrue(saver.flush())
+        session.lock()
+        os.remove(getFilepath("saver_user"))
+
+    def testConflict(self) -> None:
+        """
+        This method tests that a stale session reports a conflict and writes its changes on top of the reloaded entries.
+        """
+        createFile("saver_user")
+        first = vaultSession("saver_user")
+        first.unlock("password")
+        entries = [entry("x", "a", "a", [float(4)], "", []), entry("y", "b", "b", [float(4)], "", [])]
+        self.assertTrue(saveSessionToDisk(first, entries))
+        second = vaultSession("saver_user")
+        second.unlock("password")
+        otherEntries = loadSessionFromDisk(second)
+        self.assertTrue(commitChanges(first, entries[1:], [(DELETE, "x", None)]))
+        saver = backgroundSaver(second, delay=0)
+        added = entry("z", "c", "c", [float(4)], "", [])
+        saver.submit(otherEntries + [added], [(ADD, "z", added)])
+        self.assertFalse(saver.flush())
+        self.assertEqual(saver.state, CONFLICT)
+        reloadedEntries = loadSessionFromDisk(second)
+        saver.rebase(reloadedEntries)
+        self.assertEqual([_entry.website for _entry in reloadedEntries], ["y", "z"])
+        self.assertTrue(saver.stop())
+        self.assertEqual([_entry.website for _entry in loadSessionFromDisk(first)], ["y", "z"])
+        first.lock()
+        second.lock()
+        clearJournal("saver_user")
+        os.remove(getFilepath("saver_user"))
@@ -3,7 +3,8 @@ This file contains the tests for the checkPassword.py file.
 """
 import unittest
 from source.checkPassword import checkPassword, _checkLength, _checkLowercase, \
-    _checkUppercase, _checkDigit, _checkSpecial
+    _checkUppercase, _checkDigit, _checkSpecial, checkDuplicate, reuseIndex
+from source.entry import entry
 
 class uTestCheckPassword(unittest.TestCase):
     """
@@ -39,3 +40,37 @@ class uTestCheckPassword(unittest.TestCase):
     def testCheckSpecial(self) -> None:
         self.assertTrue(_checkSpecial("Test1234!"))
         self.assertFalse(_checkSpecial("Test1234"))
+
+    def testReuseIndex(self) -> None:
+        """
+        This method tests that the reuseIndex follows added, changed and removed entries.
+        """
+        github = entry("github.com", "shared", "user", oldPasswords=[""])
+        gitlab = entry("gitlab.com", "shared", "user", oldPasswords=[""])
+        mail = entry("mail.com", "second", "user", oldPasswords=["first"])
+        index = reuseIndex([github, gitlab, mail])
+        self.assertEqual(index.entriesUsing("shared"), [github, gitlab])
+        self.assertEqual(index.entriesUsing("first"), [mail])
+        self.assertTrue(index.isReused("second"))
+        self.assertFalse(index.isReused("other"))
+        # New entries start with an empty old password, that is no password
+        self.assertFalse(index.isReused(""))
+
+        github.password = "github"
+        github.oldPasswords = ["shared"]
+        index.update(github)
+        self.assertEqual(index.entriesUsing("shared"), [gitlab, github])
+        self.assertEqual(index.entriesUsing("github"), [github])
+        index.remove(gitlab)
+        self.assertEqual(index.entriesUsing("shared"), [github])
+        index.remove(github)
+        index.remove(github)
+        self.assertFalse(index.isReused("shared"))
+        self.assertFalse(index.isReused("github"))
+
+        # The index and the list give the same answer
+        for password in ["shared", "first", "second", "other"]:
+            self.assertEqual(checkDuplicate(password, [mail], index), checkDuplicate(password, [mail]))
+        index.rebuild([gitlab])
+        self.assertEqual(index.entriesUsing("shared"), [gitlab])
+        self.assertFalse(index.isReused("second"))
@@ -1,11 +1,28 @@
 """
 This file contains the tests for the checkPwned.py file.
 """
+import threading
 import unittest
+from http.server import ThreadingHTTPServer
+from unittest import mock
 import requests
 
-from source.checkPwned import checkPawned, hashPassword
+from testPwnedCache import rangeHandler
+from source.checkPwned import checkPawned, checkPawnedBatch, fetchCounts, hashPassword, ONLINE
 
+class keepAliveHandler(rangeHandler):
+    """
+    Answers like rangeHandler, but keeps the connection open and records the port of the client
+    """
+    protocol_version = "HTTP/1.1" #pylint: disable=C0103
+    ports: set = set()
+
+    def do_GET(self) -> None: #pylint: disable=C0103
+        """
+        Answers a range request
+        """
+        keepAliveHandler.ports.add(self.client_address[1])
+        super().do_GET()
 
 class uTestHaveIBeenPwned(unittest.TestCase):
     """
@@ -26,3 +43,50 @@ class uTestHaveIBeenPwned(unittest.TestCase):
             self.assertEqual(checkPawned("B@eiwewirw    kd!12345a"), 0)
         except requests.exceptions.RequestException:
             self.skipTest("Connection is down")
+
+    def testCheckPawnedBatch(self) -> None:
+        """
+        This method tests that a batch fetches each prefix once over a few kept open connections.
+        """
+        rangeHandler.requests = []
+        keepAliveHandler.ports = set()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), keepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        passwords = ["12345", "B@eiwewirw    kd!12345a", "12345"] + [f"password{idx}" for idx in range(20)]
+        try:
+            with mock.patch("source.checkPwned.API_URL", f"http://127.0.0.1:{server.server_address[1]}/range/"), \
+                 mock.patch("source.checkPwned.SOURCE", ONLINE):
+                self.assertEqual(checkPawnedBatch(passwords, workers=2), [42, 0, 42] + [0] * 20)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(sorted(path for path, _ in rangeHandler.requests),
+                         sorted({f"/range/{hashPassword(password)[:5]}" for password in passwords}))
+        self.assertLessEqual(len(keepAliveHandler.ports), 2)
+        self.assertEqual(checkPawnedBatch([]), [])
+
+    def testFetchCounts(self) -> None:
+        """
+        This method tests the prefix grouping, the filter and the failures of fetchCounts.
+        """
+        hashes = [hashPassword(password) for password in ["12345", "password", "12345"]]
+        sibling = hashes[0][:5] + "0" * 35
+        ranges = {hashes[0][:5]: {hashes[0][5:]: 42}, hashes[1][:5]: {hashes[1][5:]: 7}}
+        with mock.patch("source.checkPwned.fetchRange", side_effect=lambda prefix: ranges[prefix]) as fetch:
+            self.assertEqual(fetchCounts(hashes + [sibling]), {hashes[0]: 42, hashes[1]: 7, sibling: 0})
+            self.assertEqual(fetch.call_count, 2)
+            fetch.reset_mock()
+            with mock.patch("source.checkPwned.mightBeBreached", side_effect=lambda passwordHash: passwordHash == hashes[1]):
+                self.assertEqual(fetchCounts(hashes), {hashes[0]: 0, hashes[1]: 7})
+            fetch.assert_called_once_with(hashes[1][:5])
+
+        errors: list = []
+        with mock.patch("source.checkPwned.fetchRange", side_effect=RuntimeError("Error fetching: offline")):
+            self.assertEqual(fetchCounts(hashes, errors, workers=1), {})
+            self.assertEqual(errors, ["Error fetching: offline"])
+            with self.assertRaises(RuntimeError):
+                checkPawnedBatch(["12345"])
+        with mock.patch("source.checkPwned.mightBeBreached", side_effect=RuntimeError("Breach filter failed")):
+            errors = []
+            self.assertEqual(fetchCounts(hashes, errors), {})
+            self.assertEqual(errors, ["Breach filter failed"])
@@ -0,0 +1,222 @@
+"""
+This file contains the tests for the checkPwnedAsync.py file.
+The Pwned Passwords API is replaced by a local asyncio HTTP server.
+"""
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from source.checkPwned import hashPassword
+from source.checkPwnedAsync import (checkPawnedAsync, checkPawnedBatchAsync, fetchCountsAsync, fetchRangeAsync, rangeClient,
+                                    _readResponse, MAX_BODY, MAX_HEADERS, MAX_LINE)
+from source.pwnedCache import rangeCache
+
+PASSWORD_HASH = hashPassword("12345")
+
+class rangeServer:
+    """
+    Answers /range/<prefix> like the API over kept open connections, with an ETag and 304 if the client
+    already has the range. Every response waits `delay` seconds, a client that closes the connection meanwhile is counted.
+    """
+    #pylint: disable=R0902
+    def __init__(self, delay: float = 0.0, chunked: bool = False) -> None:
+        self.delay = delay
+        self.chunked = chunked
+        self.etag = '"v1"'
+        self.body = f"{PASSWORD_HASH[5:]}:42\r\n{'0' * 35}:1".encode()
+        self.requests: list = []
+        self.connections = 0
+        self.open = 0
+        self.active = 0
+        self.mostActive = 0
+        self.aborted = 0
+        self.server: asyncio.Server|None = None
+        self.url = ""
+
+    async def start(self) -> None:
+        """
+        Starts listening on a free port
+        """
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/range/"
+
+    async def stop(self) -> None:
+        """
+        Stops listening
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self.open += 1
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                self.requests.append((requestLine.split()[1].decode(), headers.get("if-none-match")))
+                self.active += 1
+                self.mostActive = max(self.mostActive, self.active)
+                try:
+                    # A closed connection ends the wait early
+                    if await asyncio.wait_for(reader.read(1), self.delay) == b"":
+                        self.aborted += 1
+                        break
+                except TimeoutError:
+                    pass
+                finally:
+                    self.active -= 1
+                writer.write(self._response(headers.get("if-none-match")))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+    def _response(self, etag: str|None) -> bytes:
+        if etag == self.etag:
+            return f"HTTP/1.1 304 Not Modified\r\nETag: {self.etag}\r\n\r\n".encode()
+        if self.chunked:
+            middle = len(self.body) // 2
+            chunks = b"".join(f"{len(part):x}\r\n".encode() + part + b"\r\n" for part in (self.body[:middle], self.body[middle:]))
+            return f"HTTP/1.1 200 OK\r\nETag: {self.etag}\r\nTransfer-Encoding: chunked\r\n\r\n".encode() + chunks + b"0\r\n\r\n"
+        return f"HTTP/1.1 200 OK\r\nETag: {self.etag}\r\nContent-Length: {len(self.body)}\r\n\r\n".encode() + self.body
+
+class uTestCheckPwnedAsync(unittest.TestCase):
+    """
+    This class contains the tests for the checkPwnedAsync.py file.
+    """
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory() #pylint: disable=R1732
+        self.cache = rangeCache(os.path.join(self.directory.name, "ranges.db"), bytes(32))
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self.directory.cleanup()
+
+    def testFetchRangeAsync(self) -> None:
+        """
+        Tests fetching, caching and revalidating a range over one kept open connection
+        """
+        async def run() -> None:
+            server = rangeServer(chunked=True)
+            await server.start()
+            async with rangeClient(server.url) as client:
+                prefix = PASSWORD_HASH[:5]
+                self.assertEqual(await fetchRangeAsync(prefix, client, self.cache), {PASSWORD_HASH[5:]: 42, "0" * 35: 1})
+                self.assertEqual(await fetchRangeAsync(prefix, client, self.cache), {PASSWORD_HASH[5:]: 42, "0" * 35: 1})
+                self.assertEqual(server.requests, [(f"/range/{prefix}", None)])
+                self.cache.ttl = 0
+                self.assertEqual(await checkPawnedAsync("12345", client, self.cache), 42)
+                self.assertEqual(server.requests[-1], (f"/range/{prefix}", '"v1"'))
+                self.assertEqual(server.connections, 1)
+            await server.stop()
+            # The API is down, the cached range is used even though it is stale
+            async with rangeClient(server.url) as client:
+                self.assertEqual(await fetchRangeAsync(prefix, client, self.cache), {PASSWORD_HASH[5:]: 42, "0" * 35: 1})
+                with self.assertRaises(RuntimeError):
+                    await fetchRangeAsync("00000", client, self.cache)
+        asyncio.run(run())
+
+    def testCheckPawnedBatchAsync(self) -> None:
+        """
+        Tests that a batch fetches each prefix once with at most `workers` requests at the same time
+        """
+        async def run() -> None:
+            server = rangeServer(delay=0.01)
+            await server.start()
+            passwords = ["12345", "B@eiwewirw    kd!12345a", "12345"] + [f"password{idx}" for idx in range(20)]
+            async with rangeClient(server.url) as client:
+                self.assertEqual(await checkPawnedBatchAsync(passwords, workers=4, client=client, cache=self.cache),
+                                 [42, 0, 42] + [0] * 20)
+            await server.stop()
+            self.assertEqual(sorted(path for path, _ in server.requests),
+                             sorted({f"/range/{hashPassword(password)[:5]}" for password in passwords}))
+            self.assertLessEqual(server.mostActive, 4)
+            self.assertLessEqual(server.connections, 4)
+            self.assertEqual(await checkPawnedBatchAsync([]), [])
+        asyncio.run(run())
+
+    def testTimeout(self) -> None:
+        """
+        Tests that a slow API fails the request after the timeout of the client and the error is reported
+        """
+        async def run() -> None:
+            server = rangeServer(delay=5)
+            await server.start()
+            start = time.monotonic()
+            async with rangeClient(server.url, timeout=0.1) as client:
+                errors: list = []
+                self.assertEqual(await fetchCountsAsync([PASSWORD_HASH], errors, client=client, cache=self.cache), {})
+                self.assertEqual(errors, ["Error fetching: TimeoutError, check the API and try again"])
+                with self.assertRaises(RuntimeError):
+                    await checkPawnedAsync("12345", client, self.cache)
+            self.assertLess(time.monotonic() - start, 2)
+            await server.stop()
+        asyncio.run(run())
+
+    def testCancel(self) -> None:
+        """
+        Tests that cancelling a check stops it at once and closes its connections
+        """
+        async def run() -> None:
+            server = rangeServer(delay=5)
+            await server.start()
+            client = rangeClient(server.url)
+            task = asyncio.create_task(checkPawnedBatchAsync([f"password{idx}" for idx in range(10)], workers=3,
+                                                             client=client, cache=self.cache))
+            while server.active < 3:
+                await asyncio.sleep(0.01)
+            start = time.monotonic()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertLess(time.monotonic() - start, 1)
+            while server.open:
+                await asyncio.sleep(0.01)
+            self.assertEqual(server.aborted, 3)
+            self.assertEqual(len(server.requests), 3)
+            await client.close()
+            await server.stop()
+        asyncio.run(asyncio.wait_for(run(), 10))
+
+    def testInvalidResponse(self) -> None:
+        """
+        Tests that responses that aren't HTTP or exceed the limits are rejected instead of read without bounds
+        """
+        async def read(response: bytes) -> tuple:
+            reader = asyncio.StreamReader(limit=MAX_LINE)
+            reader.feed_data(response)
+            reader.feed_eof()
+            return await _readResponse(reader)
+
+        async def run() -> None:
+            self.assertEqual(await read(b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\nA:1"), (200, {"content-length": "3"}, b"A:1"))
+            self.assertEqual((await read(b"HTTP/1.1 301 Moved\r\nLocation: /\r\nContent-Length: 0\r\n\r\n"))[0], 301)
+            invalid = [b"HTTP/1.1 2x0 OK\r\n\r\n",
+                       b"HTTP/1.1 200 OK\r\nContent-Length: abc\r\n\r\n",
+                       b"HTTP/1.1 200 OK\r\nContent-Length: -1\r\n\r\n",
+                       f"HTTP/1.1 200 OK\r\nContent-Length: {MAX_BODY + 1}\r\n\r\n".encode(),
+                       b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n",
+                       b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n" + f"{MAX_BODY + 1:x}\r\n".encode(),
+                       b"HTTP/1.1 200 OK\r\nX-Long: " + b"a" * MAX_LINE + b"\r\n\r\n",
+                       b"HTTP/1.1 200 OK\r\n" + b"X-Many: 1\r\n" * (MAX_HEADERS + 1) + b"\r\n",
+                       b"HTTP/1.1 200 OK\r\n\r\n" + b"A" * (MAX_BODY + 1)]
+            for response in invalid:
+                with self.assertRaises(ValueError, msg=response[:60]):
+                    await read(response)
+            with self.assertRaises(EOFError):
+                await read(b"HTTP/1.1 200 OK\r\nContent-Length: 3")
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,8 @@ This file contains the tests for the cryptographyManager.py file.
 import unittest
 import os
 
-from source.cryptographyManager import encryptContent, decryptContent
+from source.cryptographyManager import (encryptContent, decryptContent, encryptBytes, decryptInto, encryptAead, decryptAeadInto,
+                                        wipeBuffer)
 
 
 class uTestCryptographyManager(unittest.TestCase):
@@ -28,3 +29,31 @@ class uTestCryptographyManager(unittest.TestCase):
         os.remove("resources/username_entries.enc")
 
         self.assertEqual(decryptContent("password", "username"), "")
+
+    def testDecryptInto(self) -> None:
+        """
+        This method tests that decryptInto and decryptAeadInto decrypt into the given buffer and wipe it on errors.
+        """
+        key = bytes(range(32))
+        buffer = bytearray(64)
+        encrypted = encryptBytes(b"secret", key)
+        plaintext = decryptInto(encrypted, key, buffer)
+        self.assertEqual(bytes(plaintext), b"secret")
+        plaintext.release()
+        wipeBuffer(buffer)
+        self.assertEqual(buffer, bytearray(64))
+
+        # The buffer is reused for a longer plaintext
+        encrypted = encryptBytes(b"a longer secret", key)
+        self.assertEqual(bytes(decryptInto(memoryview(encrypted), key, buffer)), b"a longer secret")
+        with self.assertRaises(ValueError):
+            decryptInto(encrypted, key, bytearray(8))
+
+        encrypted = encryptAead(b"secret", key, b"header")
+        self.assertEqual(bytes(decryptAeadInto(encrypted, key, b"header", buffer)), b"secret")
+        with self.assertRaises(ValueError):
+            decryptAeadInto(encrypted, key, b"other header", buffer)
+        self.assertEqual(buffer, bytearray(64))
+        with self.assertRaises(ValueError):
+            decryptAeadInto(encrypted, bytes(32), b"header", buffer)
+        self.assertEqual(buffer, bytearray(64))
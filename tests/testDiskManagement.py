@@ -1,16 +1,30 @@
 """
 This file contains the tests for the diskManagement module.
 """
+import json
 import unittest
+from unittest import mock
 import os
 from source.entry import entry
-from source.diskManagement import saveToDisk, loadFromDisk, getFilepath, loadEntryFromFile, createFile, exportToDisk
+from source.diskManagement import saveToDisk, loadFromDisk, getFilepath, loadEntryFromFile, createFile, exportToDisk, \
+    saveSessionToDisk, loadSessionFromDisk, commitChanges, loadEntryFromDisk, \
+    iterSessionFromDisk
+from source.cryptographyManager import encryptContent, encryptBytes, deriveKey
+from source.vaultFormat import MAGIC, LEGACY_ITERATIONS, VERSION, COMPRESSION_LZMA, isIndexedVault, readHeader, readIndex
+from source.journal import ADD, EDIT, DELETE, getJournalSize
+from source.vaultSession import vaultSession
+from source.vaultLock import getLockPath
 
 class uTestDiskManagement(unittest.TestCase):
     """
     This class contains the tests for the diskManagement module.
     """
 
+    def tearDown(self) -> None:
+        # The vault and the journal are removed by the tests, the lock file is left behind by every load and save
+        if os.path.exists(getLockPath("test_user1")):
+            os.remove(getLockPath("test_user1"))
+
     def testGetFilepath(self) -> None:
         self.assertEqual(getFilepath("test_user"), os.getcwd()+ "/resources/test_user_entries.enc")
 
@@ -41,6 +55,205 @@ class uTestDiskManagement(unittest.TestCase):
         self.assertEqual(loadFromDisk("test_user1","user1_password"), [])
         os.remove(getFilepath("test_user1"))
 
+    def testSessionToDisk(self) -> None:
+        """
+        This method tests the saveSessionToDisk and loadSessionFromDisk methods of the diskManagement module.
+        """
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        self.assertFalse(saveSessionToDisk(session, []))
+        createFile("test_user1")
+        self.assertEqual(loadSessionFromDisk(session), [])
+        entries = [entry("x", "a", "a", [float(4)], "a", [])]
+        self.assertTrue(saveSessionToDisk(session, entries))
+        self.assertEqual(loadSessionFromDisk(session), entries)
+        self.assertEqual(loadFromDisk("test_user1", "user1_password"), entries)
+        session.lock()
+        self.assertFalse(saveSessionToDisk(session, entries))
+        os.remove(getFilepath("test_user1"))
+
+    def testCommitChanges(self) -> None:
+        """
+        This method tests the commitChanges method of the diskManagement module.
+        """
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        self.assertFalse(commitChanges(session, [], []))
+        createFile("test_user1")
+        first = entry("x", "a", "a", [float(4)], "a", [])
+        entries = [first]
+        self.assertTrue(commitChanges(session, entries, [(ADD, "x", first)]))
+        self.assertEqual(getJournalSize("test_user1"), 0)
+        second = entry("y", "b", "b", [float(4)], "b", [])
+        entries.append(second)
+        self.assertTrue(commitChanges(session, entries, [(ADD, "y", second)]))
+        first.updateWebsite("z")
+        self.assertTrue(commitChanges(session, entries, [(EDIT, "x", first)]))
+        entries.remove(second)
+        self.assertTrue(commitChanges(session, entries, [(DELETE, "y", None)]))
+        self.assertGreater(getJournalSize("test_user1"), 0)
+        loaded = loadSessionFromDisk(session)
+        self.assertEqual([_entry.website for _entry in loaded], ["z"])
+        self.assertEqual(loadFromDisk("test_user1", "user1_password"), loaded)
+        self.assertEqual(loadFromDisk("test_user1", "wrong_password"), [])
+        self.assertGreater(getJournalSize("test_user1"), 0)
+        with mock.patch("source.diskManagement.JOURNAL_LIMIT", 0):
+            self.assertTrue(commitChanges(session, entries, [(EDIT, "z", first)]))
+        self.assertEqual(getJournalSize("test_user1"), 0)
+        self.assertEqual([_entry.website for _entry in loadSessionFromDisk(session)], ["z"])
+        session.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testLoadEntryFromDisk(self) -> None:
+        """
+        This method tests the loadEntryFromDisk method of the diskManagement module.
+        """
+        createFile("test_user1")
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        self.assertIsNone(loadEntryFromDisk(session, "x"))
+        first = entry("x", "a", "a", [float(4)], "a", [])
+        second = entry("y", "b", "b", [float(4)], "b", [])
+        self.assertTrue(saveSessionToDisk(session, [first, second]))
+        loaded = loadEntryFromDisk(session, "y")
+        assert loaded is not None
+        self.assertEqual(loaded.password, "b")
+        second.updateWebsite("z")
+        commitChanges(session, [first, second], [(EDIT, "y", second)])
+        commitChanges(session, [second], [(DELETE, "x", None)])
+        self.assertIsNone(loadEntryFromDisk(session, "y"))
+        self.assertIsNone(loadEntryFromDisk(session, "x"))
+        self.assertEqual(loadEntryFromDisk(session, "z"), second)
+        session.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testConflict(self) -> None:
+        """
+        This method tests that a session doesn't overwrite the saves of another session it hasn't loaded.
+        """
+        createFile("test_user1")
+        first = vaultSession("test_user1")
+        first.unlock("user1_password")
+        entries = [entry("x", "a", "a", [float(4)], "", [])]
+        self.assertTrue(saveSessionToDisk(first, entries))
+        header = readHeader("test_user1")
+        assert header is not None
+        self.assertEqual(header.generation, 1)
+        second = vaultSession("test_user1")
+        second.unlock("user1_password")
+        otherEntries = loadSessionFromDisk(second)
+        added = entry("y", "b", "b", [float(4)], "", [])
+        self.assertTrue(commitChanges(first, entries + [added], [(ADD, "y", added)]))
+        self.assertRaises(RuntimeError, commitChanges, second, otherEntries, [(DELETE, "x", None)])
+        self.assertRaises(RuntimeError, saveSessionToDisk, second, [])
+        otherEntries = loadSessionFromDisk(second)
+        self.assertEqual([_entry.website for _entry in otherEntries], ["x", "y"])
+        self.assertTrue(saveSessionToDisk(second, otherEntries))
+        header = readHeader("test_user1")
+        assert header is not None
+        self.assertEqual(header.generation, 2)
+        self.assertRaises(RuntimeError, saveSessionToDisk, first, entries)
+        first.lock()
+        second.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testCompression(self) -> None:
+        """
+        This method tests that snapshots keep the compression the user chose.
+        """
+        createFile("test_user1")
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        entries = [entry("x", "a", "a", [float(4)], "a", [])]
+        self.assertTrue(saveSessionToDisk(session, entries, COMPRESSION_LZMA, 1))
+        self.assertTrue(saveSessionToDisk(session, entries))
+        header = readHeader("test_user1")
+        assert header is not None
+        self.assertEqual((header.compression, header.level), (COMPRESSION_LZMA, 1))
+        self.assertEqual(loadSessionFromDisk(session), entries)
+        session.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testIterSessionFromDisk(self) -> None:
+        """
+        This method tests that entries are loaded one at a time and the journal is applied to them.
+        """
+        createFile("test_user1")
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        entries = [entry(f"site{idx}", "a", "a", [float(4)], "", []) for idx in range(4)]
+        self.assertTrue(saveSessionToDisk(session, entries))
+        loader = iterSessionFromDisk(session)
+        self.assertEqual(next(loader).website, "site0")
+        entries[1].updateNotes("changed")
+        added = entry("new", "a", "a", [float(4)], "", [])
+        commitChanges(session, entries, [(EDIT, "site1", entries[1]), (DELETE, "site2", None), (ADD, "new", added)])
+        loaded = list(iterSessionFromDisk(session))
+        self.assertEqual([_entry.website for _entry in loaded], ["site0", "site3", "site1", "new"])
+        self.assertEqual(loaded[2].notes, "changed")
+        _, _, offset, _ = readIndex("test_user1", session.useKey())[3]
+        with open(getFilepath("test_user1"), "r+b") as file:
+            file.seek(offset + 20)
+            byte = file.read(1)[0]
+            file.seek(offset + 20)
+            file.write(bytes([byte ^ 1]))
+        self.assertRaises(ValueError, loadSessionFromDisk, session)
+        wrongSession = vaultSession("test_user1")
+        self.assertFalse(wrongSession.unlock("wrong_password"))
+        self.assertRaises(RuntimeError, list, iterSessionFromDisk(wrongSession))
+        session.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testMigration(self) -> None:
+        """
+        This method tests that files written before the indexed format are still loaded and migrated on save.
+        """
+        createFile("test_user1")
+        entries = [entry("x", "a", "a", [float(4)], "a", [])]
+        self.assertTrue(encryptContent(str([_entry.toDict() for _entry in entries]), "user1_password", "test_user1"))
+        session = vaultSession("test_user1")
+        session.unlock("user1_password")
+        self.assertEqual(loadSessionFromDisk(session), entries)
+        self.assertEqual(loadEntryFromDisk(session, "x"), entries[0])
+        self.assertFalse(isIndexedVault("test_user1"))
+        self.assertTrue(saveSessionToDisk(session, entries))
+        self.assertTrue(isIndexedVault("test_user1"))
+        header = readHeader("test_user1")
+        assert header is not None
+        self.assertEqual((header.version, header.salt), (VERSION, session.salt))
+        self.assertEqual(loadFromDisk("test_user1", "user1_password"), entries)
+        session.lock()
+        os.remove(getFilepath("test_user1"))
+
+    def testCommitMigration(self) -> None:
+        """
+        This method tests that the first commit to a file written before the AES-GCM format migrates it.
+        """
+        entries = [entry("x", "a", "a", [float(4)], "a", [])]
+        createFile("test_user1")
+        self.assertTrue(encryptContent(str([_entry.toDict() for _entry in entries]), "user1_password", "test_user1"))
+        key = deriveKey("user1_password", bytes(16), LEGACY_ITERATIONS)
+        record = encryptBytes(json.dumps(entries[0].toDict()).encode(), key)
+        index = encryptBytes(json.dumps([["x", "a", 0, len(record)]]).encode(), key)
+        legacyVersion1 = MAGIC + b"\x01" + bytes(16) + len(index).to_bytes(4, "big") + index + record
+        for legacyVersion in (0, 1):
+            if legacyVersion == 1:
+                with open(getFilepath("test_user1"), "wb") as file:
+                    file.write(legacyVersion1)
+            session = vaultSession("test_user1")
+            session.unlock("user1_password")
+            loaded = loadSessionFromDisk(session)
+            self.assertEqual(loaded, entries)
+            added = entry("y", "b", "b", [float(4)], "b", [])
+            self.assertTrue(commitChanges(session, loaded + [added], [(ADD, "y", added)]))
+            header = readHeader("test_user1")
+            assert header is not None
+            self.assertEqual(header.version, VERSION)
+            self.assertEqual(getJournalSize("test_user1"), 0)
+            self.assertEqual(loadFromDisk("test_user1", "user1_password"), entries + [added])
+            session.lock()
+        os.remove(getFilepath("test_user1"))
+
     def testLoadEntryFromFile(self) -> None:
         """
         This method tests the loadEntryFromFile method of the diskManagement module.
@@ -53,12 +266,23 @@ class uTestDiskManagement(unittest.TestCase):
                 "username": "a",
                 "notes": "a",
                 "oldPasswords": []
+            },
+            {
+                "website": "y",
+                "password": "b",
+                "username": "b",
+                "notes": "",
+                "oldPasswords": ["c"],
+                "timestamps": [5.0]
             }
         ]
         """
         with open("test.json", "w", encoding="utf-8") as file:
             file.write(contents)
-        self.assertEqual(loadEntryFromFile("test.json", []),[entry("x", "a", "a", notes="a", oldPasswords=[])])
+        loaded = loadEntryFromFile("test.json", [])
+        self.assertEqual(loaded, [entry("x", "a", "a", notes="a", oldPasswords=[]), entry("y", "b", "b")])
+        # Exported entries keep their timestamps
+        self.assertEqual((loaded[1].oldPasswords, loaded[1].timestamps.tolist()), (["c"], [5.0]))
         os.remove("test.json")
 
     def testExportToDisk(self) -> None:
@@ -0,0 +1,45 @@
+"""
+This file contains the tests for the domainNormalizer.py file.
+"""
+import unittest
+
+from source.domainNormalizer import normalizeHost, registrableDomain, normalizeDomain
+
+class uTestDomainNormalizer(unittest.TestCase):
+    """
+    This class contains the tests for the domainNormalizer.py file.
+    """
+    def testNormalizeHost(self) -> None:
+        """
+        This method tests that scheme, user, port, path, case and "www." are dropped.
+        """
+        self.assertEqual(normalizeHost("https://www.github.com/login"), "github.com")
+        self.assertEqual(normalizeHost("GitHub.com"), "github.com")
+        self.assertEqual(normalizeHost("http://user@Mail.Google.com:8080/mail?x=1"), "mail.google.com")
+        self.assertEqual(normalizeHost("github.com/settings"), "github.com")
+        self.assertEqual(normalizeHost("  example.org.  "), "example.org")
+        self.assertEqual(normalizeHost("My Bank"), "my bank")
+        self.assertEqual(normalizeHost(""), "")
+
+    def testRegistrableDomain(self) -> None:
+        """
+        This method tests that hosts are reduced to the public suffix and the label in front of it.
+        """
+        self.assertEqual(registrableDomain("gist.github.com"), "github.com")
+        self.assertEqual(registrableDomain("news.bbc.co.uk"), "bbc.co.uk")
+        self.assertEqual(registrableDomain("bbc.co.uk"), "bbc.co.uk")
+        self.assertEqual(registrableDomain("co.uk"), "co.uk")
+        self.assertEqual(registrableDomain("octocat.github.io"), "octocat.github.io")
+        self.assertEqual(registrableDomain("a.b.example.ck"), "b.example.ck")
+        self.assertEqual(registrableDomain("shop.www.ck"), "www.ck")
+        self.assertEqual(registrableDomain("host.unknowntld"), "host.unknowntld")
+        self.assertEqual(registrableDomain("192.168.0.1"), "192.168.0.1")
+        self.assertEqual(registrableDomain("localhost"), "localhost")
+
+    def testNormalizeDomain(self) -> None:
+        """
+        This method tests that URLs and names of the same site give the same domain.
+        """
+        for url in ["https://www.github.com/login", "github.com", "GitHub.com", "gist.github.com"]:
+            self.assertEqual(normalizeDomain(url), "github.com")
+        self.assertEqual(normalizeDomain("https://login.example.co.jp/"), "example.co.jp")
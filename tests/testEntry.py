@@ -101,3 +101,26 @@ class uTestEntry(unittest.TestCase):
     def testGetLastEditTime(self) -> None:
         entry1 = entry("testuser", "testpass", "testsite")
         self.assertEqual(entry1.getLastEditTime(), time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry1.timestamps[-1])))
+
+    def testToDict(self) -> None:
+        """
+        This method tests the toDict method and the compact layout of the entry class.
+        """
+        entry1 = entry("testsite", "testpass", "testuser", [float(1), float(2)], "testnotes", ["oldpass"])
+        self.assertEqual(entry1.toDict(), {"website": "testsite", "password": "testpass", "username": "testuser",
+                                           "notes": "testnotes", "oldPasswords": ["oldpass"], "timestamps": [1.0, 2.0]})
+        self.assertFalse(hasattr(entry1, "__dict__"))
+        entry2 = entry("othersite", "otherpass", "".join(["test", "user"]))
+        self.assertIs(entry2.username, entry1.username)
+
+    def testDefaults(self) -> None:
+        """
+        This method tests that new entries don't share their old passwords and the password can be changed repeatedly.
+        """
+        entry1 = entry("testsite", "testpass", "testuser")
+        entry2 = entry("othersite", "otherpass", "testuser")
+        self.assertTrue(entry1.updatePassword("newpass"))
+        self.assertTrue(entry1.updatePassword("newerpass"))
+        self.assertEqual(entry1.oldPasswords, ["testpass", "newpass"])
+        self.assertEqual(entry2.oldPasswords, [""])
+        self.assertEqual(len(entry2.timestamps), 1)
@@ -0,0 +1,46 @@
+"""
+This file contains the tests for the entryCodec.py file.
+"""
+import unittest
+
+from source.entry import entry
+from source.entryCodec import FORMAT_HEADER, encodeEntry, decodeEntry, encodeEntries, decodeEntries, isEncoded, \
+    parseLegacyEntries
+
+class uTestEntryCodec(unittest.TestCase):
+    """
+    This class contains the tests for the entryCodec.py file.
+    """
+    def testEncodeEntry(self) -> None:
+        """
+        This method tests the encodeEntry and decodeEntry methods of the entryCodec.py file.
+        """
+        entry1 = entry("x", "it's \"quoted\"", "üser", [float(1), 2.5], "don't\nforget", ["old'1", "old2"])
+        encoded = encodeEntry(entry1)
+        self.assertTrue(encoded.startswith(FORMAT_HEADER))
+        self.assertTrue(isEncoded(encoded))
+        self.assertEqual(decodeEntry(encoded).toDict(), entry1.toDict())
+        self.assertEqual(decodeEntry(memoryview(encoded)).toDict(), entry1.toDict())
+        self.assertRaises(ValueError, decodeEntry, encoded[:-3])
+        self.assertRaises(ValueError, decodeEntry, b'{"website": "x"}')
+        self.assertRaises(ValueError, decodeEntry, FORMAT_HEADER[:-1] + b"\xff" + encoded[len(FORMAT_HEADER):])
+
+    def testEncodeEntries(self) -> None:
+        """
+        This method tests the encodeEntries and decodeEntries methods of the entryCodec.py file.
+        """
+        entries = [entry(f"site{idx}", "a", "b", [float(idx + 1)], "", []) for idx in range(5)]
+        decoded = decodeEntries(encodeEntries(entries))
+        self.assertEqual([_entry.toDict() for _entry in decoded], [_entry.toDict() for _entry in entries])
+        self.assertEqual(decodeEntries(encodeEntries([])), [])
+
+    def testParseLegacyEntries(self) -> None:
+        """
+        This method tests that the str() output of older versions is parsed, including apostrophes.
+        """
+        entries = [entry("x", "it's", "a", [float(4)], "don't", ["\"old\""])]
+        parsed = parseLegacyEntries(str([_entry.toDict() for _entry in entries]))
+        self.assertEqual([_entry.toDict() for _entry in parsed], [_entry.toDict() for _entry in entries])
+        self.assertRaises(ValueError, parseLegacyEntries, "")
+        self.assertRaises(ValueError, parseLegacyEntries, "{'website': 'x'}")
+        self.assertRaises(ValueError, parseLegacyEntries, "[{'website': 'x'}]")
@@ -0,0 +1,68 @@
+"""
+This file contains the tests for the entryQuery.py file.
+"""
+import time
+import unittest
+from unittest import mock
+from source.entryQuery import compileQuery, queryCache
+from source.findPasswords import trigramIndex
+from source.entry import entry
+
+class uTestEntryQuery(unittest.TestCase):
+    """
+    This class contains the tests for the entryQuery.py file.
+    """
+    def setUp(self) -> None:
+        self.day = time.mktime(time.strptime("2024-01-01", "%Y-%m-%d"))
+        self.entries = [entry("github.com", "secret1", "alice", [self.day + 60], "2fa enabled", [""]),
+                        entry("gitlab.com", "secret2", "bob", [self.day - 60], "old account", [""]),
+                        entry("My Bank", "hunter22", "alice", [self.day], "", [""])]
+        self.index = trigramIndex(self.entries)
+
+    def _websites(self, query: str, includePasswords: bool = False) -> list:
+        return [userEntry.website for userEntry in compileQuery(query, includePasswords).search(self.index)]
+
+    def testCompileQuery(self) -> None:
+        """
+        This method tests that queries are normalized and invalid ones are rejected.
+        """
+        self.assertEqual(compileQuery('user:alice  site:git -notes:"old acc"').normalized,
+                         compileQuery('-notes:"old acc" site:git user:alice').normalized)
+        self.assertEqual(compileQuery('site:"say \\"hi\\""').terms, [(False, ("website",), "text", 'say "hi"')])
+        self.assertEqual(compileQuery("").normalized, "")
+        for query in ["tag:old", "after:2024-13-01", "site:/(/", '"open']:
+            with self.assertRaises(ValueError):
+                compileQuery(query)
+
+    def testSearch(self) -> None:
+        """
+        This method tests the fields, negation, regular expressions and dates of a query.
+        """
+        self.assertEqual(self._websites("site:git"), ["github.com", "gitlab.com"])
+        self.assertEqual(self._websites("site:git user:alice"), ["github.com"])
+        self.assertEqual(self._websites("alice"), ["github.com", "My Bank"])
+        self.assertEqual(self._websites('-notes:old -site:"My Bank"'), ["github.com"])
+        self.assertEqual(self._websites("site:/^git(hub|lab)/ -user:/^b/"), ["github.com"])
+        self.assertEqual(self._websites("after:2024-01-01"), ["github.com", "My Bank"])
+        self.assertEqual(self._websites("before:2024-01-01"), ["gitlab.com"])
+        self.assertEqual(self._websites("hunter"), [])
+        self.assertEqual(self._websites("hunter", includePasswords=True), ["My Bank"])
+        self.assertEqual(self._websites("password:secret"), ["github.com", "gitlab.com"])
+        self.assertEqual(self._websites(""), ["github.com", "gitlab.com", "My Bank"])
+        # The longest text term narrows the entries through the index
+        with mock.patch.object(self.index, "search", wraps=self.index.search) as searchIndex:
+            self._websites("site:git notes:enabled")
+        searchIndex.assert_called_once_with("enabled")
+
+    def testQueryCache(self) -> None:
+        """
+        This method tests that results are reused until the index changes.
+        """
+        queries = queryCache(self.index)
+        self.assertEqual(queries.search("user:alice"), [self.entries[0], self.entries[2]])
+        with mock.patch("source.entryQuery.compiledQuery.search") as search:
+            self.assertEqual(queries.search("  user:alice "), [self.entries[0], self.entries[2]])
+        search.assert_not_called()
+        newEntry = entry("alice.dev", "secret3", "alice", [self.day], "", [""])
+        self.index.add(newEntry)
+        self.assertEqual(queries.search("user:alice"), [self.entries[0], self.entries[2], newEntry])
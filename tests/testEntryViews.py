@@ -0,0 +1,39 @@
+"""
+This file contains the tests for the entryViews.py file.
+"""
+import unittest
+from source.entryViews import entryOrders, WEBSITE, USERNAME, LAST_EDIT
+from source.vault import vault, entry
+
+class uTestEntryViews(unittest.TestCase):
+    """
+    This class contains the tests for the entryViews.py file.
+    """
+    def testEntryOrders(self) -> None:
+        """
+        This method tests that the sort orders are reused until the vault changes.
+        """
+        userEntries = vault([entry("gitlab.com", "a", "carol", [float(2)], "", [""]),
+                             entry("Amazon", "b", "bob", [float(3)], "", [""]),
+                             entry("github.com", "c", "alice", [float(1)], "", [""])])
+        orders = entryOrders(userEntries)
+        self.assertEqual([userEntry.website for userEntry in orders.get(WEBSITE)], ["Amazon", "github.com", "gitlab.com"])
+        self.assertEqual([userEntry.username for userEntry in orders.get(USERNAME)], ["alice", "bob", "carol"])
+        self.assertEqual([userEntry.website for userEntry in orders.get(LAST_EDIT)], ["Amazon", "gitlab.com", "github.com"])
+        self.assertEqual(orders.get(None), list(userEntries))
+        self.assertIs(orders.get(WEBSITE), orders.get(WEBSITE))
+
+        # A letter jumps to the first entry with it, again to the next one, and wraps around
+        self.assertEqual(orders.jump(WEBSITE, "G", 0), 1)
+        self.assertEqual(orders.jump(WEBSITE, "g", 1), 2)
+        self.assertEqual(orders.jump(WEBSITE, "g", 2), 1)
+        self.assertEqual(orders.jump(WEBSITE, "z", 2), 2)
+        self.assertEqual(orders.jump(LAST_EDIT, "g", 1), 2)
+
+        websiteOrder = orders.get(WEBSITE)
+        userEntries.append(entry("bank.com", "d", "dave", [float(4)], "", [""]))
+        self.assertIsNot(orders.get(WEBSITE), websiteOrder)
+        self.assertEqual([userEntry.website for userEntry in orders.get(WEBSITE)],
+                         ["Amazon", "bank.com", "github.com", "gitlab.com"])
+        userEntries[0].updateWebsite("zulip.com")
+        self.assertEqual(orders.get(WEBSITE)[-1].website, "zulip.com")
@@ -2,7 +2,9 @@
 This file contains the tests for the findPasswords.py file.
 """
 import unittest
-from source.findPasswords import findPasswordByPattern, findPasswordByUrl
+from unittest import mock
+from source.findPasswords import findPasswordByPattern, findPasswordByUrl, trigramIndex, fuzzyCorpus, \
+    incrementalSearch
 from source.entry import entry
 
 class uTestFindPasswords(unittest.TestCase):
@@ -26,3 +28,72 @@ class uTestFindPasswords(unittest.TestCase):
                                                                 entry("v", "e", "e", [float(4)], "a", [])])
         self.assertEqual(findPasswordByPattern(entries, "b"), [entry("y", "b", "b", [float(4)], "b", [])])
         self.assertEqual(findPasswordByPattern(entries, "k"), [])
+
+    def testTrigramIndex(self) -> None:
+        """
+        This method tests that a search through the trigramIndex finds the same entries as the linear search.
+        """
+        entries = [entry("github.com", "secret1", "alice", [float(4)], "work account", []),
+                   entry("gitlab.com", "secret2", "bob", [float(4)], "", []),
+                   entry("example.org", "hunter22", "carol", [float(4)], "old github mirror", [])]
+        index = trigramIndex(entries)
+        for pattern in ["git", "github", "com", "b", "", "work", "carol", "xyz", "lab.c"]:
+            self.assertEqual([e.website for e in findPasswordByPattern(entries, pattern, index)],
+                             [e.website for e in findPasswordByPattern(entries, pattern)])
+        # Passwords are only searched if they are indexed
+        self.assertEqual(index.search("hunter"), [])
+        self.assertEqual(trigramIndex(entries, includePasswords=True).search("hunter"), [entries[2]])
+
+        index.remove(entries[0])
+        self.assertEqual([e.website for e in index.search("github")], ["example.org"])
+        entries[1].updateUsername("alice")
+        index.update(entries[1])
+        self.assertEqual([e.website for e in index.search("alice")], ["gitlab.com"])
+        self.assertEqual(index.search("bob"), [])
+        index.add(entries[0])
+        self.assertEqual([e.website for e in index.search("git")], ["example.org", "gitlab.com", "github.com"])
+        self.assertEqual(len(index), 3)
+        index.rebuild([])
+        self.assertEqual(index.search("git"), [])
+
+    def testFuzzySearch(self) -> None:
+        """
+        This method tests that the fuzzy search finds entries despite typos and ranks them by the number of edits.
+        """
+        entries = [entry("gitlab.com", "a", "bob", [float(4)], "", []),
+                   entry("github.com", "a", "alice", [float(4)], "", []),
+                   entry("example.org", "a", "octocat-github", [float(4)], "", []),
+                   entry("GitHub.io", "a", "carol", [float(4)], "", [])]
+        corpus = fuzzyCorpus(entries)
+        self.assertEqual([e.website for e in corpus.search("gtihub")], ["github.com", "GitHub.io", "example.org"])
+        self.assertEqual([e.website for e in corpus.search("github")], ["github.com", "GitHub.io", "example.org", "gitlab.com"])
+        self.assertEqual([e.website for e in corpus.search("github", 0)], ["github.com", "GitHub.io", "example.org"])
+        self.assertEqual([e.website for e in corpus.search("alcie", 2)], ["github.com"])
+        self.assertEqual(corpus.search("zzzzzz"), [])
+        self.assertEqual(corpus.search(""), [])
+        # A match may not run from the end of one field into the next one
+        self.assertEqual(corpus.search("combob", 1), [])
+        self.assertEqual(fuzzyCorpus([]).search("github"), [])
+
+        index = trigramIndex(entries)
+        self.assertEqual(index.fuzzySearch("gtihub"), corpus.search("gtihub"))
+        index.remove(entries[1])
+        self.assertEqual([e.website for e in index.fuzzySearch("gtihub")], ["GitHub.io", "example.org"])
+
+    def testIncrementalSearch(self) -> None:
+        """
+        This method tests that the search-as-you-type results match a full search for every typed query.
+        """
+        entries = [entry("github.com", "a", "alice", [float(4)], "", []), entry("gitlab.com", "a", "bob", [float(4)], "", []),
+                   entry("example.org", "a", "carol", [float(4)], "git mirror", [])]
+        index = trigramIndex(entries)
+        search = incrementalSearch(index)
+        for query in ["", "g", "gi", "git", "gith", "git", "gitl", "gitlab", "x", "ex", "exa", "ab"]:
+            self.assertEqual([e.website for e in search.update(query)], [e.website for e in index.search(query)])
+        # The results of shorter queries are reused instead of searching the index again
+        search.update("git")
+        with mock.patch.object(index, "search") as searchIndex:
+            self.assertEqual([e.website for e in search.update("gith")], ["github.com"])
+            self.assertEqual([e.website for e in search.update("gitl")], ["gitlab.com"])
+            self.assertEqual(len(search.update("gi")), 3)
+            searchIndex.assert_not_called()
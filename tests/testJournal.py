@@ -0,0 +1,62 @@
+"""
+This file contains the tests for the journal.py file.
+"""
+import unittest
+import os
+
+from source.entry import entry
+from source.journal import ADD, EDIT, DELETE, appendChanges, readChanges, clearJournal, getJournalPath, getJournalSize
+
+class uTestJournal(unittest.TestCase):
+    """
+    This class contains the tests for the journal.py file.
+    """
+    key = bytes(32)
+    snapshotId = bytes(16)
+
+    def testAppendChanges(self) -> None:
+        """
+        This method tests the appendChanges and readChanges methods of the journal.py file.
+        """
+        clearJournal("journal_user")
+        changedEntry = entry("x", "a", "a", [float(4)], "a", [])
+        size = appendChanges("journal_user", self.key, self.snapshotId, [(ADD, "x", changedEntry)])
+        self.assertEqual(size, getJournalSize("journal_user"))
+        appendChanges("journal_user", self.key, self.snapshotId, [(EDIT, "x", changedEntry), (DELETE, "x", None)])
+        changes = readChanges("journal_user", self.key, self.snapshotId)
+        self.assertEqual([(operation, website) for operation, website, _ in changes], [(ADD, "x"), (EDIT, "x"), (DELETE, "x")])
+        self.assertEqual(changes[0][2].toDict(), changedEntry.toDict())
+        self.assertIsNone(changes[2][2])
+        clearJournal("journal_user")
+        self.assertFalse(os.path.exists(getJournalPath("journal_user")))
+        self.assertEqual(readChanges("journal_user", self.key, self.snapshotId), [])
+
+    def testTornWrite(self) -> None:
+        """
+        This method tests that readers stop at a torn record and the next write cuts it off.
+        """
+        clearJournal("journal_user")
+        size = appendChanges("journal_user", self.key, self.snapshotId, [(DELETE, "x", None)])
+        appendChanges("journal_user", self.key, self.snapshotId, [(DELETE, "y", None)])
+        with open(getJournalPath("journal_user"), "r+b") as file:
+            file.truncate(getJournalSize("journal_user") - 3)
+        tornSize = getJournalSize("journal_user")
+        self.assertEqual(readChanges("journal_user", self.key, self.snapshotId), [(DELETE, "x", None)])
+        self.assertEqual(getJournalSize("journal_user"), tornSize)
+        self.assertGreater(appendChanges("journal_user", self.key, self.snapshotId, [(DELETE, "z", None)]), size)
+        self.assertEqual(readChanges("journal_user", self.key, self.snapshotId), [(DELETE, "x", None), (DELETE, "z", None)])
+        clearJournal("journal_user")
+
+    def testForeignSnapshot(self) -> None:
+        """
+        This method tests that records of another snapshot are not applied.
+        """
+        clearJournal("journal_user")
+        appendChanges("journal_user", self.key, self.snapshotId, [(DELETE, "x", None)])
+        size = getJournalSize("journal_user")
+        self.assertEqual(readChanges("journal_user", self.key, bytes(range(16))), [])
+        self.assertEqual(getJournalSize("journal_user"), size)
+        # The writer of the new snapshot drops the records of the old one
+        appendChanges("journal_user", self.key, bytes(range(16)), [(DELETE, "y", None)])
+        self.assertEqual(readChanges("journal_user", self.key, bytes(range(16))), [(DELETE, "y", None)])
+        clearJournal("journal_user")
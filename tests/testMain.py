@@ -11,6 +11,21 @@ from testsUserManagement import uTestUserManagement as TestUserManagement
 from testDiskManagement import uTestDiskManagement as TestDiskManagement
 from testCryptographyManager import uTestCryptographyManager as TestCryptographyManager
 from testSecondFactor import uTestSecondFactor as TestSecondFactor
+from testVaultSession import uTestVaultSession as TestVaultSession
+from testJournal import uTestJournal as TestJournal
+from testVaultFormat import uTestVaultFormat as TestVaultFormat
+from testEntryCodec import uTestEntryCodec as TestEntryCodec
+from testBackgroundSaver import uTestBackgroundSaver as TestBackgroundSaver
+from testVaultLock import uTestVaultLock as TestVaultLock
+from testVault import uTestVault as TestVault
+from testDomainNormalizer import uTestDomainNormalizer as TestDomainNormalizer
+from testVaultAudit import uTestVaultAudit as TestVaultAudit
+from testEntryQuery import uTestEntryQuery as TestEntryQuery
+from testEntryViews import uTestEntryViews as TestEntryViews
+from testPwnedCache import uTestPwnedCache as TestPwnedCache
+from testPwnedCorpus import uTestPwnedCorpus as TestPwnedCorpus
+from testPwnedFilter import uTestPwnedFilter as TestPwnedFilter
+from testCheckPwnedAsync import uTestCheckPwnedAsync as TestCheckPwnedAsync
 #from tests.testMenuPrototype.testMenu import testMenu
 
 def testMain() -> None:
@@ -23,6 +38,15 @@ def testMain() -> None:
     #HaveIBeenPwned tests
     suite.addTest(TestHaveIBeenPwned('testHashPassword'))
     suite.addTest(TestHaveIBeenPwned('testCheckPawned'))
+    suite.addTest(TestHaveIBeenPwned('testCheckPawnedBatch'))
+    suite.addTest(TestHaveIBeenPwned('testFetchCounts'))
+
+    #CheckPwnedAsync tests
+    suite.addTest(TestCheckPwnedAsync('testFetchRangeAsync'))
+    suite.addTest(TestCheckPwnedAsync('testCheckPawnedBatchAsync'))
+    suite.addTest(TestCheckPwnedAsync('testTimeout'))
+    suite.addTest(TestCheckPwnedAsync('testCancel'))
+    suite.addTest(TestCheckPwnedAsync('testInvalidResponse'))
 
     #UserManagement tests
     suite.addTest(TestUserManagement('testSaveUser'))
@@ -36,6 +60,7 @@ def testMain() -> None:
     suite.addTest(TestCheckPassword('testCheckUppercase'))
     suite.addTest(TestCheckPassword('testCheckDigit'))
     suite.addTest(TestCheckPassword('testCheckSpecial'))
+    suite.addTest(TestCheckPassword('testReuseIndex'))
 
     #Entry tests
     suite.addTest(TestEntry('testConstructor'))
@@ -46,19 +71,79 @@ def testMain() -> None:
     suite.addTest(TestEntry('testStr'))
     suite.addTest(TestEntry('testEq'))
     suite.addTest(TestEntry('testGetLastEditTime'))
+    suite.addTest(TestEntry('testToDict'))
+    suite.addTest(TestEntry('testDefaults'))
 
     #findPassword tests
     suite.addTest(TestFindPasswords('testFindPasswordByUrl'))
     suite.addTest(TestFindPasswords('testFindPasswordByPattern'))
+    suite.addTest(TestFindPasswords('testTrigramIndex'))
+    suite.addTest(TestFindPasswords('testFuzzySearch'))
+    suite.addTest(TestFindPasswords('testIncrementalSearch'))
 
     #DiskManagement tests
     suite.addTest(TestDiskManagement('testSaveToDisk'))
     suite.addTest(TestDiskManagement('testLoadFromDisk'))
+    suite.addTest(TestDiskManagement('testSessionToDisk'))
+    suite.addTest(TestDiskManagement('testCommitChanges'))
+    suite.addTest(TestDiskManagement('testLoadEntryFromDisk'))
+    suite.addTest(TestDiskManagement('testIterSessionFromDisk'))
+    suite.addTest(TestDiskManagement('testMigration'))
+    suite.addTest(TestDiskManagement('testCommitMigration'))
+    suite.addTest(TestDiskManagement('testConflict'))
+    suite.addTest(TestDiskManagement('testCompression'))
     suite.addTest(TestDiskManagement('testGetFilepath'))
     suite.addTest(TestDiskManagement('testCreateFile'))
     suite.addTest(TestDiskManagement('testLoadEntryFromFile'))
     suite.addTest(TestDiskManagement('testExportToDisk'))
 
+    #BackgroundSaver tests
+    suite.addTest(TestBackgroundSaver('testCoalescing'))
+    suite.addTest(TestBackgroundSaver('testFailedSave'))
+    suite.addTest(TestBackgroundSaver('testConflict'))
+
+    #VaultLock tests
+    suite.addTest(TestVaultLock('testWriteAtomic'))
+    suite.addTest(TestVaultLock('testVaultLock'))
+
+    #Vault tests
+    suite.addTest(TestVault('testLookup'))
+    suite.addTest(TestVault('testRename'))
+    suite.addTest(TestVault('testDuplicates'))
+    suite.addTest(TestVault('testGetByUrl'))
+
+    #DomainNormalizer tests
+    suite.addTest(TestDomainNormalizer('testNormalizeHost'))
+    suite.addTest(TestDomainNormalizer('testRegistrableDomain'))
+    suite.addTest(TestDomainNormalizer('testNormalizeDomain'))
+
+    #VaultAudit tests
+    suite.addTest(TestVaultAudit('testAuditVault'))
+    suite.addTest(TestVaultAudit('testAuditVaultOffline'))
+
+    #EntryQuery tests
+    suite.addTest(TestEntryQuery('testCompileQuery'))
+    suite.addTest(TestEntryQuery('testSearch'))
+    suite.addTest(TestEntryQuery('testQueryCache'))
+
+    #EntryViews tests
+    suite.addTest(TestEntryViews('testEntryOrders'))
+
+    #PwnedCache tests
+    suite.addTest(TestPwnedCache('testFetchRange'))
+    suite.addTest(TestPwnedCache('testRevalidate'))
+    suite.addTest(TestPwnedCache('testEviction'))
+    suite.addTest(TestPwnedCache('testPrivacy'))
+    suite.addTest(TestPwnedCache('testOpenCache'))
+
+    #PwnedCorpus tests
+    suite.addTest(TestPwnedCorpus('testConvertCorpus'))
+    suite.addTest(TestPwnedCorpus('testOfflineSource'))
+
+    #PwnedFilter tests
+    suite.addTest(TestPwnedFilter('testBuildFilter'))
+    suite.addTest(TestPwnedFilter('testFilterFirst'))
+
     #SecondFactor tests
     testSecondFactor = TestSecondFactor()
     suite.addTest(TestSecondFactor('testConstructor'))
@@ -70,6 +155,32 @@ def testMain() -> None:
     #CryptographyManager tests
     suite.addTest(TestCryptographyManager('testEncryptContent'))
     suite.addTest(TestCryptographyManager('testDecryptContent'))
+    suite.addTest(TestCryptographyManager('testDecryptInto'))
+
+    #VaultSession tests
+    suite.addTest(TestVaultSession('testUnlock'))
+    suite.addTest(TestVaultSession('testUnlockVault'))
+    suite.addTest(TestVaultSession('testEncrypt'))
+    suite.addTest(TestVaultSession('testLock'))
+
+    #Journal tests
+    suite.addTest(TestJournal('testAppendChanges'))
+    suite.addTest(TestJournal('testTornWrite'))
+    suite.addTest(TestJournal('testForeignSnapshot'))
+
+    #VaultFormat tests
+    suite.addTest(TestVaultFormat('testWriteVault'))
+    suite.addTest(TestVaultFormat('testReadRecord'))
+    suite.addTest(TestVaultFormat('testIterRecords'))
+    suite.addTest(TestVaultFormat('testJsonVault'))
+    suite.addTest(TestVaultFormat('testReadHeader'))
+    suite.addTest(TestVaultFormat('testCheckKey'))
+    suite.addTest(TestVaultFormat('testCompression'))
+
+    #EntryCodec tests
+    suite.addTest(TestEntryCodec('testEncodeEntry'))
+    suite.addTest(TestEntryCodec('testEncodeEntries'))
+    suite.addTest(TestEntryCodec('testParseLegacyEntries'))
 
     runner = unittest.TextTestRunner()
     runner.run(suite)
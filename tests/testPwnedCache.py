@@ -0,0 +1,151 @@
+"""
+This file contains the tests for the pwnedCache.py file and the cached fetchRange of the checkPwned.py file.
+The Pwned Passwords API is replaced by a local HTTP server.
+"""
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from source.checkPwned import fetchRange, hashPassword
+from source.pwnedCache import rangeCache, parseRange, openCache, closeCache, defaultCache
+
+PASSWORD_HASH = hashPassword("12345")
+
+class rangeHandler(BaseHTTPRequestHandler):
+    """
+    Answers /range/<prefix> like the API, with an ETag and 304 if the client already has the range
+    """
+    requests: list = []
+    body = f"{PASSWORD_HASH[5:]}:42\r\n{'0' * 35}:1".encode()
+    etag = '"v1"'
+    delay = 0.0
+
+    def do_GET(self) -> None: #pylint: disable=C0103
+        """
+        Answers a range request
+        """
+        rangeHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        time.sleep(self.delay)
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format: str, *args: object) -> None: #pylint: disable=W0622
+        pass
+
+class uTestPwnedCache(unittest.TestCase):
+    """
+    This class contains the tests for the pwnedCache.py file.
+    """
+    def setUp(self) -> None:
+        rangeHandler.requests = []
+        rangeHandler.delay = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), rangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/range/"
+        self.directory = tempfile.TemporaryDirectory() #pylint: disable=R1732
+        self.cache = rangeCache(os.path.join(self.directory.name, "ranges.db"), bytes(32))
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+        self.directory.cleanup()
+
+    def testFetchRange(self) -> None:
+        """
+        This method tests that a range is fetched once and answered from the cache after that.
+        """
+        with mock.patch("source.checkPwned.API_URL", self.url):
+            self.assertEqual(fetchRange(PASSWORD_HASH[:5], self.cache)[PASSWORD_HASH[5:]], 42)
+            start = time.perf_counter()
+            self.assertEqual(fetchRange(PASSWORD_HASH[:5], self.cache)[PASSWORD_HASH[5:]], 42)
+            self.assertLess(time.perf_counter() - start, 0.001)
+        self.assertEqual(rangeHandler.requests, [(f"/range/{PASSWORD_HASH[:5]}", None)])
+
+        # Another process opening the file finds the compressed range on disk
+        reopened = rangeCache(os.path.join(self.directory.name, "ranges.db"), bytes(32))
+        cached = reopened.get(PASSWORD_HASH[:5])
+        reopened.close()
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.counts if cached else {}, {PASSWORD_HASH[5:]: 42, "0" * 35: 1})
+        self.assertIsNone(self.cache.get("00000"))
+
+    def testRevalidate(self) -> None:
+        """
+        This method tests that a stale range is revalidated with its ETag and used if the API is down.
+        """
+        self.cache.ttl = 0
+        with mock.patch("source.checkPwned.API_URL", self.url):
+            fetchRange(PASSWORD_HASH[:5], self.cache)
+            self.assertEqual(fetchRange(PASSWORD_HASH[:5], self.cache)[PASSWORD_HASH[5:]], 42)
+        self.assertEqual(rangeHandler.requests[1], (f"/range/{PASSWORD_HASH[:5]}", '"v1"'))
+
+        # A slow or unreachable API doesn't block the check of a cached range
+        rangeHandler.delay = 0.5
+        with mock.patch("source.checkPwned.API_URL", self.url), mock.patch("source.checkPwned.REVALIDATE_TIMEOUT", 0.1):
+            self.assertEqual(fetchRange(PASSWORD_HASH[:5], self.cache)[PASSWORD_HASH[5:]], 42)
+        with mock.patch("source.checkPwned.API_URL", "http://127.0.0.1:9/range/"):
+            self.assertEqual(fetchRange(PASSWORD_HASH[:5], self.cache)[PASSWORD_HASH[5:]], 42)
+            with self.assertRaises(RuntimeError):
+                fetchRange("00000", self.cache)
+
+    def testEviction(self) -> None:
+        """
+        This method tests that the least recently used ranges are removed when the cache is full.
+        """
+        self.cache.maxRanges = 2
+        self.cache.put("AAAAA", b"A:1", None)
+        self.cache.put("BBBBB", b"B:2", None)
+        # Reading AAAAA from disk makes BBBBB the least recently used range
+        self.cache._memory.clear() #pylint: disable=W0212
+        self.assertIsNotNone(self.cache.get("AAAAA"))
+        self.cache.put("CCCCC", b"C:3", None)
+        self.cache._memory.clear() #pylint: disable=W0212
+        self.assertIsNone(self.cache.get("BBBBB"))
+        self.assertEqual([cached.counts if cached else None for cached in map(self.cache.get, ["AAAAA", "CCCCC"])],
+                         [{"A": 1}, {"C": 3}])
+        self.assertEqual(parseRange("A:1\r\n\r\nB:2\n"), {"A": 1, "B": 2})
+
+    def testPrivacy(self) -> None:
+        """
+        This method tests that only the user can read the cache and that it doesn't contain the prefixes.
+        """
+        path = os.path.join(self.directory.name, "ranges.db")
+        self.cache.put(PASSWORD_HASH[:5], rangeHandler.body, rangeHandler.etag)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute("SELECT * FROM ranges").fetchall()
+        connection.close()
+        self.assertEqual(len(rows), 1)
+        self.assertNotIn(PASSWORD_HASH[:5], repr(rows))
+        self.assertNotIn(PASSWORD_HASH[5:].encode(), rows[0][1])
+
+        # Another key can't read the ranges
+        other = rangeCache(path, b"\x01" * 32)
+        self.assertIsNone(other.get(PASSWORD_HASH[:5]))
+        other.close()
+
+    def testOpenCache(self) -> None:
+        """
+        This method tests that the cache of the logged in user is used by default until it is closed.
+        """
+        with mock.patch("source.pwnedCache.getCachePath", side_effect=lambda user: os.path.join(self.directory.name, user)):
+            self.assertIsNone(defaultCache())
+            cache = openCache("alice", bytes(32))
+            self.assertIs(defaultCache(), cache)
+            self.assertTrue(os.path.exists(os.path.join(self.directory.name, "alice")))
+            closeCache()
+        self.assertIsNone(defaultCache())
@@ -0,0 +1,84 @@
+"""
+This file contains the tests for the pwnedCorpus.py file and the offline source of the checkPwned.py file.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from source.checkPwned import checkPawned, fetchRange, hashPassword, OFFLINE
+from source.pwnedCorpus import convertCorpus, hashCorpus, openCorpus
+
+PASSWORDS = {"12345": 42, "password": 7, "hunter2": 1}
+
+class uTestPwnedCorpus(unittest.TestCase):
+    """
+    This class contains the tests for the pwnedCorpus.py file.
+    """
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory() #pylint: disable=R1732
+        self.source = os.path.join(self.directory.name, "hashes.txt")
+        self.target = os.path.join(self.directory.name, "corpus.bin")
+        # Unsorted, with neighbours of the hashes in the same prefix and a blank line
+        lines = [f"{hashPassword(password)}:{count}" for password, count in PASSWORDS.items()]
+        passwordHash = hashPassword("12345")
+        lines += [f"{passwordHash[:-1]}0:3", f"{passwordHash[:5]}{'F' * 35}:5", "", "0" * 40 + ":9"]
+        with open(self.source, "w", encoding="utf-8") as file:
+            file.write("\r\n".join(reversed(lines)))
+
+    def tearDown(self) -> None:
+        openCorpus.cache_clear()
+        self.directory.cleanup()
+
+    def testConvertCorpus(self) -> None:
+        """
+        Tests the conversion and the lookups of the hashCorpus class
+        """
+        self.assertEqual(convertCorpus(self.source, self.target), 6)
+        corpus = hashCorpus(self.target)
+        for password, count in PASSWORDS.items():
+            self.assertEqual(corpus.count(hashPassword(password)), count)
+        self.assertEqual(corpus.count(hashPassword("not breached")), 0)
+        self.assertEqual(corpus.count("0" * 40), 9)
+        self.assertEqual(corpus.count("F" * 40), 0)
+        passwordHash = hashPassword("12345")
+        self.assertEqual(corpus.range(passwordHash[:5]),
+                         {passwordHash[5:]: 42, passwordHash[5:-1] + "0": 3, "F" * 35: 5})
+        self.assertEqual(corpus.range("FFFFF"), {})
+        corpus.close()
+
+        with open(self.source, "a", encoding="utf-8") as file:
+            file.write("\nnot a hash:1")
+        with self.assertRaises(ValueError):
+            convertCorpus(self.source, self.target)
+        with open(self.source, "w", encoding="utf-8") as file:
+            file.write("ABCDE:1")
+        with self.assertRaises(ValueError):
+            convertCorpus(self.source, self.target)
+        # A failed conversion keeps the last complete file
+        self.assertEqual(hashCorpus(self.target).records, 6)
+        with self.assertRaises(ValueError):
+            hashCorpus(self.source)
+
+    def testOfflineSource(self) -> None:
+        """
+        Tests that checkPawned and fetchRange only use the corpus if the source is offline
+        """
+        convertCorpus(self.source, self.target)
+        passwordHash = hashPassword("password")
+        with mock.patch("source.checkPwned.SOURCE", OFFLINE), mock.patch("source.checkPwned.CORPUS_FILE", self.target), \
+             mock.patch("source.checkPwned.defaultSession") as session:
+            self.assertEqual(checkPawned("password"), 7)
+            self.assertEqual(checkPawned("not breached"), 0)
+            self.assertEqual(fetchRange(passwordHash[:5]), {passwordHash[5:]: 7})
+            session.assert_not_called()
+        with mock.patch("source.checkPwned.SOURCE", OFFLINE), \
+             mock.patch("source.checkPwned.CORPUS_FILE", os.path.join(self.directory.name, "missing.bin")):
+            with self.assertRaises(RuntimeError):
+                checkPawned("password")
+        with mock.patch("source.checkPwned.SOURCE", "carrier pigeon"):
+            with self.assertRaises(RuntimeError):
+                fetchRange(passwordHash[:5])
+
+if __name__ == "__main__":
+    unittest.main()
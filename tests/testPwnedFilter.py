@@ -0,0 +1,70 @@
+"""
+This file contains the tests for the pwnedFilter.py file and the filter check of the checkPwned.py file.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from source.checkPwned import checkPawned, hashPassword, mightBeBreached
+from source.pwnedFilter import buildFilter, closeFilters, filterSize, hashFilter, openFilter
+
+class uTestPwnedFilter(unittest.TestCase):
+    """
+    This class contains the tests for the pwnedFilter.py file.
+    """
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory() #pylint: disable=R1732
+        self.source = os.path.join(self.directory.name, "hashes.txt")
+        self.target = os.path.join(self.directory.name, "filter.bin")
+        self.hashes = [hashPassword(f"breached{idx}") for idx in range(2000)]
+        with open(self.source, "w", encoding="utf-8") as file:
+            file.write("\r\n".join(f"{passwordHash}:{idx + 1}" for idx, passwordHash in enumerate(self.hashes)))
+
+    def tearDown(self) -> None:
+        closeFilters()
+        self.directory.cleanup()
+
+    def testBuildFilter(self) -> None:
+        """
+        Tests that the filter lets every hash of the list through and few others
+        """
+        self.assertEqual(buildFilter(self.source, self.target, 0.01), len(self.hashes))
+        hashes = hashFilter(self.target)
+        self.assertTrue(all(hashes.mightContain(passwordHash) for passwordHash in self.hashes))
+        falsePositives = sum(hashes.mightContain(hashPassword(f"safe{idx}")) for idx in range(10000))
+        self.assertLess(falsePositives, 300)
+        hashes.close()
+
+        self.assertLess(filterSize(1000, 0.1)[0], filterSize(1000, 0.01)[0])
+        with self.assertRaises(ValueError):
+            filterSize(1000, 1)
+        with self.assertRaises(ValueError):
+            hashFilter(self.source)
+        self.assertIsNone(openFilter(os.path.join(self.directory.name, "missing.bin")))
+        # A filter built after a check that found no file is used from then on
+        os.replace(self.target, os.path.join(self.directory.name, "missing.bin"))
+        self.assertIs(openFilter(os.path.join(self.directory.name, "missing.bin")),
+                      openFilter(os.path.join(self.directory.name, "missing.bin")))
+        with self.assertRaises(RuntimeError):
+            openFilter(self.source)
+
+    def testFilterFirst(self) -> None:
+        """
+        Tests that checkPawned only looks up hashes the filter lets through
+        """
+        buildFilter(self.source, self.target, 0.001)
+        breachedHash = self.hashes[41]
+        with mock.patch("source.checkPwned.FILTER_FILE", self.target), \
+             mock.patch("source.checkPwned.fetchRange", return_value={breachedHash[5:]: 42}) as fetch:
+            self.assertEqual(checkPawned("breached41"), 42)
+            fetch.assert_called_once_with(breachedHash[:5])
+            fetch.reset_mock()
+            self.assertEqual(checkPawned("Str0ng!Passw0rd#1"), 0)
+            fetch.assert_not_called()
+            self.assertFalse(mightBeBreached(hashPassword("Str0ng!Passw0rd#1")))
+        with mock.patch("source.checkPwned.FILTER_FILE", os.path.join(self.directory.name, "missing.bin")):
+            self.assertTrue(mightBeBreached(hashPassword("Str0ng!Passw0rd#1")))
+
+if __name__ == "__main__":
+    unittest.main()
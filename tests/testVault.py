@@ -0,0 +1,108 @@
+"""
+This file contains the tests for the vault.py file.
+"""
+import unittest
+
+# The entries have to come from the same module as in vault.py, renames are reported through that module
+from source.vault import vault, entry
+from source.findPasswords import findPasswordByUrl
+
+class uTestVault(unittest.TestCase):
+    """
+    This class contains the tests for the vault.py file.
+    """
+    def testLookup(self) -> None:
+        """
+        This method tests that the website map follows every change of the list.
+        """
+        entries = [entry(f"site{idx}", "a", "a", [float(4)], "a", []) for idx in range(5)]
+        userEntries = vault(entries[:3])
+        self.assertIs(userEntries.get("site1"), entries[1])
+        self.assertIn(entry("site2", "b", "b", [float(4)], "b", []), userEntries)
+        self.assertNotIn(entries[3], userEntries)
+        self.assertIs(findPasswordByUrl(userEntries, "site0"), entries[0])
+
+        userEntries.append(entries[3])
+        userEntries.insert(0, entries[4])
+        self.assertEqual([_entry.website for _entry in userEntries], ["site4", "site0", "site1", "site2", "site3"])
+        self.assertIs(userEntries.get("site4"), entries[4])
+
+        with self.assertRaises(ValueError):
+            userEntries.remove(entry("site1", "b", "b", [float(4)], "b", []))
+        userEntries.remove(entries[1])
+        self.assertIsNone(userEntries.get("site1"))
+        self.assertIs(userEntries.pop(), entries[3])
+        self.assertIsNone(userEntries.get("site3"))
+        del userEntries[0]
+        self.assertIsNone(userEntries.get("site4"))
+        self.assertEqual([_entry.website for _entry in userEntries], ["site0", "site2"])
+
+        userEntries[:] = entries[3:]
+        self.assertIsNone(userEntries.get("site0"))
+        self.assertIs(userEntries.get("site4"), entries[4])
+        userEntries[0] = entries[1]
+        self.assertIsNone(userEntries.get("site3"))
+        self.assertIs(userEntries.get("site1"), entries[1])
+        userEntries += [entries[0]]
+        self.assertIs(userEntries.get("site0"), entries[0])
+        userEntries.clear()
+        self.assertIsNone(userEntries.get("site0"))
+        self.assertEqual(len(userEntries), 0)
+
+    def testRename(self) -> None:
+        """
+        This method tests that entry.updateWebsite moves the entry in the map of its vault.
+        """
+        renamed = entry("old", "a", "a", [float(4)], "a", [])
+        userEntries = vault([renamed])
+        self.assertTrue(renamed.updateWebsite("new"))
+        self.assertIsNone(userEntries.get("old"))
+        self.assertIs(userEntries.get("new"), renamed)
+
+        # Entries that were removed don't change the vault anymore
+        userEntries.remove(renamed)
+        self.assertTrue(renamed.updateWebsite("newer"))
+        self.assertIsNone(userEntries.get("newer"))
+        self.assertEqual(len(userEntries), 0)
+
+    def testDuplicates(self) -> None:
+        """
+        This method tests that a vault keeps entries of the same website like a list.
+        """
+        first = entry("x", "a", "a", [float(4)], "a", [])
+        second = entry("x", "b", "b", [float(4)], "b", [])
+        userEntries = vault([first, second])
+        self.assertIs(userEntries.get("x"), first)
+        # Removing an entry doesn't remove an equal one of the same website
+        userEntries.remove(second)
+        self.assertEqual(list(userEntries), [first])
+        self.assertIs(userEntries[0], first)
+        userEntries.append(second)
+        userEntries.remove(first)
+        self.assertIs(userEntries.get("x"), second)
+        self.assertTrue(second.updateWebsite("y"))
+        self.assertIsNone(userEntries.get("x"))
+        self.assertIs(userEntries.get("y"), second)
+
+    def testGetByUrl(self) -> None:
+        """
+        This method tests that full URLs find the entry of their website, host or domain.
+        """
+        github = entry("GitHub.com", "a", "a", [float(4)], "a", [])
+        mail = entry("mail.google.com", "a", "a", [float(4)], "a", [])
+        drive = entry("drive.google.com", "a", "a", [float(4)], "a", [])
+        userEntries = vault([github, drive, mail])
+        self.assertIs(userEntries.getByUrl("https://www.github.com/login"), github)
+        self.assertIs(userEntries.getByUrl("gist.github.com"), github)
+        self.assertIs(userEntries.getByUrl("https://mail.google.com/mail/u/0"), mail)
+        self.assertIs(userEntries.getByUrl("https://accounts.google.com"), drive)
+        self.assertIsNone(userEntries.getByUrl("https://gitlab.com"))
+        self.assertIs(findPasswordByUrl(userEntries, "http://GITHUB.com"), github)
+        self.assertIs(findPasswordByUrl(list(userEntries), "https://mail.google.com/"), mail)
+        self.assertIs(findPasswordByUrl(list(userEntries), "https://accounts.google.com"), drive)
+
+        self.assertTrue(github.updateWebsite("gitlab.com"))
+        self.assertIsNone(userEntries.getByUrl("https://github.com"))
+        self.assertIs(userEntries.getByUrl("https://www.gitlab.com/"), github)
+        userEntries.remove(drive)
+        self.assertIs(userEntries.getByUrl("https://accounts.google.com"), mail)
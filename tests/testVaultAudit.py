@@ -0,0 +1,58 @@
+"""
+This file contains the tests for the vaultAudit.py file.
+"""
+import unittest
+from unittest import mock
+from source.vaultAudit import auditVault, STALE_AGE
+from source.checkPwned import hashPassword
+from source.entry import entry
+
+STRONG = "Str0ng!Passw0rd#1"
+BREACHED = "Br3ached!Passw0rd#"
+
+class uTestVaultAudit(unittest.TestCase):
+    """
+    This class contains the tests for the vaultAudit.py file.
+    """
+    def setUp(self) -> None:
+        self.entries = [entry("github.com", STRONG, "alice", [float(1000)], "", [""]),
+                        entry("gitlab.com", "weak", "alice", [float(1000)], "", [""]),
+                        entry("mail.com", BREACHED, "alice", [float(1000)], "", [STRONG]),
+                        entry("bank.com", BREACHED, "alice", [float(1000) - STALE_AGE - 1], "", [""])]
+        breachedHash = hashPassword(BREACHED)
+        self.ranges = {breachedHash[:5]: {breachedHash[5:]: 42, "0" * 35: 1}}
+
+    def _fetchCounts(self, hashes: dict, errors: list, workers: int) -> dict: #pylint: disable=W0613
+        return {passwordHash: self.ranges.get(passwordHash[:5], {}).get(passwordHash[5:], 0) for passwordHash in hashes}
+
+    def testAuditVault(self) -> None:
+        """
+        This method tests that every kind of finding is reported and each password is looked up once.
+        """
+        with mock.patch("source.vaultAudit.fetchCounts", side_effect=self._fetchCounts) as fetch:
+            report = auditVault(self.entries, now=float(1000))
+        fetch.assert_called_once()
+        self.assertEqual(list(fetch.call_args[0][0]), [hashPassword(password) for password in [STRONG, "weak", BREACHED]])
+        self.assertEqual(report.weak, [self.entries[1]])
+        self.assertEqual([(found.website, [other.website for other in others]) for found, others in report.reused],
+                         [("github.com", ["mail.com"]), ("mail.com", ["bank.com"]), ("bank.com", ["mail.com"])])
+        self.assertEqual(report.breached, [(self.entries[2], 42), (self.entries[3], 42)])
+        self.assertEqual(report.stale, [self.entries[3]])
+        self.assertEqual(report.unchecked, [])
+        self.assertTrue(report)
+
+        self.assertFalse(auditVault([self.entries[0]], checkBreaches=False, now=float(1000)))
+
+    def testAuditVaultOffline(self) -> None:
+        """
+        This method tests that failed breach checks are reported and the other checks still run.
+        """
+        def failedCounts(hashes: dict, errors: list, workers: int) -> dict: #pylint: disable=W0613
+            errors.append("Error fetching: offline")
+            return {}
+        with mock.patch("source.vaultAudit.fetchCounts", side_effect=failedCounts):
+            report = auditVault(self.entries, now=float(1000), workers=1)
+        self.assertEqual(report.unchecked, self.entries)
+        self.assertEqual(report.errors, ["Error fetching: offline"])
+        self.assertEqual(report.breached, [])
+        self.assertEqual(report.weak, [self.entries[1]])
@@ -0,0 +1,153 @@
+"""
+This file contains the tests for the vaultFormat.py file.
+"""
+import unittest
+import os
+import json
+
+from source.entry import entry
+from source.cryptographyManager import encryptContent, encryptBytes, deriveKey
+from source.vaultFormat import MAGIC, VERSION, COMPRESSION_ZLIB, COMPRESSION_LZMA, writeVault, readVault, readIndex, readRecord, readHeader, isIndexedVault, \
+    getVaultPath, iterRecords, checkKey
+
+class uTestVaultFormat(unittest.TestCase):
+    """
+    This class contains the tests for the vaultFormat.py file.
+    """
+    key = bytes(range(32))
+    salt = bytes(16)
+
+    def testWriteVault(self) -> None:
+        """
+        This method tests the writeVault and readVault methods of the vaultFormat.py file.
+        """
+        entries = [entry("x", "a", "a", [float(4)], "it's", []), entry("y", "b", "b", [float(4), float(5)], "b", ["c"])]
+        self.assertTrue(writeVault("format_user", self.key, self.salt, entries))
+        self.assertTrue(isIndexedVault("format_user"))
+        loaded = readVault("format_user", self.key)
+        self.assertEqual([_entry.toDict() for _entry in loaded], [_entry.toDict() for _entry in entries])
+        self.assertRaises(ValueError, readVault, "format_user", bytes(32))
+        self.assertTrue(writeVault("format_user", self.key, self.salt, []))
+        self.assertEqual(readVault("format_user", self.key), [])
+        os.remove(getVaultPath("format_user"))
+
+    def testReadRecord(self) -> None:
+        """
+        This method tests that a single record can be decrypted through the index.
+        """
+        entries = [entry(f"site{idx}", "a", f"user{idx}", [float(4)], "", []) for idx in range(10)]
+        writeVault("format_user", self.key, self.salt, entries)
+        index = readIndex("format_user", self.key)
+        self.assertEqual([(website, username) for website, username, _, _ in index],
+                         [(_entry.website, _entry.username) for _entry in entries])
+        _, _, offset, length = index[7]
+        self.assertEqual(readRecord("format_user", self.key, offset, length).username, "user7")
+        os.remove(getVaultPath("format_user"))
+
+    def testIterRecords(self) -> None:
+        """
+        This method tests that records are decrypted one at a time and that a broken record is an error.
+        """
+        entries = [entry(f"site{idx}", "a", f"user{idx}", [float(4)], "", []) for idx in range(3)]
+        writeVault("format_user", self.key, self.salt, entries)
+        index = readIndex("format_user", self.key)
+        records = iterRecords("format_user", self.key, index)
+        self.assertEqual(next(records).website, "site0")
+        _, _, offset, _ = index[1]
+        with open(getVaultPath("format_user"), "r+b") as file:
+            # Flip a single byte of the second record
+            file.seek(offset + 20)
+            byte = file.read(1)[0]
+            file.seek(offset + 20)
+            file.write(bytes([byte ^ 1]))
+        records = iterRecords("format_user", self.key, index)
+        self.assertEqual(next(records).website, "site0")
+        self.assertRaises(ValueError, next, records)
+        self.assertRaises(ValueError, readVault, "format_user", self.key)
+        self.assertEqual(list(iterRecords("format_user", self.key, [])), [])
+        os.remove(getVaultPath("format_user"))
+
+    def testJsonVault(self) -> None:
+        """
+        This method tests that version 1 files with AES-CBC and JSON index and records are still read.
+        """
+        entry1 = entry("x", "a", "a", [float(4)], "it's", [])
+        record = encryptBytes(json.dumps(entry1.toDict()).encode(), self.key)
+        index = encryptBytes(json.dumps([["x", "a", 0, len(record)]]).encode(), self.key)
+        with open(getVaultPath("format_user"), "wb") as file:
+            file.write(MAGIC + b"\x01" + self.salt + len(index).to_bytes(4, "big") + index + record)
+        header = readHeader("format_user")
+        assert header is not None
+        self.assertEqual((header.version, header.iterations, header.snapshotId), (1, 100000, index[:16]))
+        self.assertEqual([_entry.toDict() for _entry in readVault("format_user", self.key)], [entry1.toDict()])
+        self.assertTrue(checkKey("format_user", self.key))
+        self.assertFalse(checkKey("format_user", bytes(32)))
+        os.remove(getVaultPath("format_user"))
+
+    def testReadHeader(self) -> None:
+        """
+        This method tests the readHeader method for the indexed and the older format.
+        """
+        self.assertIsNone(readHeader("format_user"))
+        self.assertTrue(encryptContent("[]", "password", "format_user"))
+        self.assertFalse(isIndexedVault("format_user"))
+        with open(getVaultPath("format_user"), "rb") as file:
+            content = file.read()
+        header = readHeader("format_user")
+        assert header is not None
+        self.assertEqual((header.version, header.salt, header.snapshotId), (0, content[:16], content[16:32]))
+        writeVault("format_user", self.key, self.salt, [], 1000)
+        header = readHeader("format_user")
+        assert header is not None
+        self.assertEqual((header.version, header.iterations, header.salt), (VERSION, 1000, self.salt))
+        writeVault("format_user", self.key, self.salt, [])
+        newHeader = readHeader("format_user")
+        assert newHeader is not None
+        self.assertNotEqual(newHeader.snapshotId, header.snapshotId)
+        with open(getVaultPath("format_user"), "r+b") as file:
+            self.assertEqual(file.read(len(MAGIC)), MAGIC)
+            file.write(bytes([VERSION + 1]))
+        self.assertRaises(ValueError, readHeader, "format_user")
+        os.remove(getVaultPath("format_user"))
+
+    def testCheckKey(self) -> None:
+        """
+        This method tests that a wrong key fails on the tag of the index, that the header is authenticated
+        and that the keys of older files are checked.
+        """
+        writeVault("format_user", self.key, self.salt, [entry("x", "a", "a", [float(4)], "", [])])
+        self.assertTrue(checkKey("format_user", self.key))
+        self.assertFalse(checkKey("format_user", bytes(32)))
+        with open(getVaultPath("format_user"), "r+b") as file:
+            # Lower the KDF iterations in the header
+            file.seek(len(MAGIC) + 2)
+            file.write((1).to_bytes(4, "big"))
+        self.assertFalse(checkKey("format_user", self.key))
+        self.assertRaises(ValueError, readIndex, "format_user", self.key)
+        # Files holding one encrypted list are checked by decrypting the list
+        self.assertTrue(encryptContent(str([entry("x", "a", "a", [float(4)], "", []).toDict()]), "password", "format_user"))
+        with open(getVaultPath("format_user"), "rb") as file:
+            salt = file.read(16)
+        self.assertTrue(checkKey("format_user", deriveKey("password", salt)))
+        self.assertFalse(checkKey("format_user", deriveKey("wrong_password", salt)))
+        os.remove(getVaultPath("format_user"))
+
+    def testCompression(self) -> None:
+        """
+        This method tests that compressed files are read back and that the compression is recorded in the header.
+        """
+        entries = [entry("x", "a", "a", [float(4)], "note " * 200, ["old"] * 50), entry("y", "b", "b", [float(4)], "", []),
+                   # Decompressed in several chunks, the buffer grows on the way
+                   entry("z", "c", "c", [float(4)], " ".join(str(idx) for idx in range(10000)), [])]
+        writeVault("format_user", self.key, self.salt, entries)
+        uncompressedSize = os.path.getsize(getVaultPath("format_user"))
+        for compression in (COMPRESSION_ZLIB, COMPRESSION_LZMA):
+            writeVault("format_user", self.key, self.salt, entries, compression=compression, level=9)
+            header = readHeader("format_user")
+            assert header is not None
+            self.assertEqual((header.compression, header.level), (compression, 9))
+            self.assertLess(os.path.getsize(getVaultPath("format_user")), uncompressedSize)
+            self.assertEqual([_entry.toDict() for _entry in readVault("format_user", self.key)], [_entry.toDict() for _entry in entries])
+        self.assertRaises(ValueError, writeVault, "format_user", self.key, self.salt, entries, compression=7)
+        self.assertRaises(ValueError, writeVault, "format_user", self.key, self.salt, entries, compression=COMPRESSION_ZLIB, level=10)
+        os.remove(getVaultPath("format_user"))
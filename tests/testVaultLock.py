@@ -0,0 +1,42 @@
+"""
+This file contains the tests for the vaultLock.py file.
+"""
+import unittest
+from unittest import mock
+import os
+
+from source.vaultLock import vaultLock, writeAtomic, getLockPath
+
+class uTestVaultLock(unittest.TestCase):
+    """
+    This class contains the tests for the vaultLock.py file.
+    """
+    def testWriteAtomic(self) -> None:
+        """
+        This method tests that the file is replaced at once and kept if the write fails.
+        """
+        path = "resources/lock_user_entries.enc"
+        writeAtomic(path, b"first")
+        writeAtomic(path, b"second")
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), b"second")
+        with mock.patch("source.vaultLock.os.replace", side_effect=OSError):
+            self.assertRaises(OSError, writeAtomic, path, b"third")
+        with open(path, "rb") as file:
+            self.assertEqual(file.read(), b"second")
+        self.assertEqual([name for name in os.listdir("resources") if name.startswith("lock_user")], ["lock_user_entries.enc"])
+        os.remove(path)
+
+    def testVaultLock(self) -> None:
+        """
+        This method tests that loads share the lock and saves wait for it.
+        """
+        with vaultLock("lock_user"):
+            with vaultLock("lock_user", timeout=0.1):
+                pass
+            self.assertRaises(RuntimeError, vaultLock("lock_user", exclusive=True, timeout=0.1).acquire)
+        with vaultLock("lock_user", exclusive=True):
+            self.assertRaises(RuntimeError, vaultLock("lock_user", timeout=0.1).acquire)
+        with vaultLock("lock_user", exclusive=True, timeout=0.1):
+            pass
+        os.remove(getLockPath("lock_user"))
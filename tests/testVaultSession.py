@@ -0,0 +1,110 @@
+"""
+This file contains the tests for the vaultSession.py file.
+"""
+import unittest
+import os
+import threading
+import time
+
+from source.cryptographyManager import encryptContent, decryptContent, readSalt, deriveKey
+from source.vaultSession import vaultSession
+from source.vaultFormat import writeVault
+
+# pylint: disable=W0212
+# Ignore access to a protected member of a client because this is a test file
+
+class uTestVaultSession(unittest.TestCase):
+    """
+    This class contains the tests for the vaultSession.py file.
+    """
+    def testUnlock(self) -> None:
+        """
+        This method tests the unlock method of the vaultSession class.
+        """
+        self.assertTrue(encryptContent("test", "password", "session_user"))
+        session = vaultSession("session_user")
+        self.assertFalse(session.isUnlocked())
+        self.assertTrue(session.unlock("password"))
+        self.assertTrue(session.isUnlocked())
+        self.assertEqual(session.decrypt(), "test")
+        session.lock()
+        self.assertFalse(session.unlock("wrong_password"))
+        self.assertFalse(session.isUnlocked())
+        self.assertTrue(session.unlock("password"))
+        session.lock()
+        os.remove("resources/session_user_entries.enc")
+
+    def testUnlockVault(self) -> None:
+        """
+        This method tests that the first unlock uses the KDF parameters of the file and checks the key.
+        """
+        salt = os.urandom(16)
+        writeVault("session_user", deriveKey("password", salt, 1000), salt, [], 1000)
+        session = vaultSession("session_user")
+        self.assertFalse(session.unlock("wrong_password"))
+        self.assertFalse(session.isUnlocked())
+        self.assertTrue(session.unlock("password"))
+        self.assertEqual((session.salt, session.iterations), (salt, 1000))
+        self.assertEqual(session.useKey(), bytearray(deriveKey("password", salt, 1000)))
+        session.lock()
+        # Nothing derived from the key survives the lock, the key is checked against the file again
+        self.assertEqual(session._subkeys, {})
+        self.assertFalse(hasattr(session, "_keyCheck"))
+        self.assertFalse(session.unlock("wrong_password"))
+        self.assertTrue(session.unlock("password"))
+        session.lock()
+        # Files written before the AES-GCM format are checked too, a wrong password must not re-encrypt them
+        self.assertTrue(encryptContent("[]", "password", "session_user"))
+        session = vaultSession("session_user")
+        self.assertFalse(session.unlock("wrong_password"))
+        self.assertFalse(session.isUnlocked())
+        self.assertTrue(session.unlock("password"))
+        session.lock()
+        os.remove("resources/session_user_entries.enc")
+
+    def testEncrypt(self) -> None:
+        """
+        This method tests that saves reuse the salt and use a fresh IV.
+        """
+        self.assertTrue(encryptContent("", "password", "session_user"))
+        salt = readSalt("session_user")
+        session = vaultSession("session_user")
+        session.unlock("password")
+        self.assertTrue(session.encrypt("first"))
+        with open("resources/session_user_entries.enc", "rb") as file:
+            first = file.read()
+        self.assertTrue(session.encrypt("first"))
+        with open("resources/session_user_entries.enc", "rb") as file:
+            second = file.read()
+        self.assertEqual(readSalt("session_user"), salt)
+        self.assertNotEqual(first[16:32], second[16:32])
+        self.assertEqual(decryptContent("password", "session_user"), "first")
+        session.lock()
+        os.remove("resources/session_user_entries.enc")
+
+    def testLock(self) -> None:
+        """
+        This method tests that the key is wiped on lock and after the idle timeout.
+        """
+        session = vaultSession("session_user", idleTimeout=0.05)
+        session.unlock("password")
+        key = session._key
+        session.lock()
+        self.assertEqual(key, bytearray(len(key)))
+        self.assertRaises(RuntimeError, session.decrypt)
+        session.unlock("password")
+        time.sleep(0.2)
+        self.assertEqual(session._key, bytearray())
+        self.assertFalse(session.isUnlocked())
+        # Using the key doesn't start a thread per use, the timer is armed again from the last use
+        session.unlock("password")
+        threads = threading.active_count()
+        for _ in range(100):
+            session.useKey()
+        self.assertLessEqual(threading.active_count(), threads)
+        time.sleep(0.03)
+        session.useKey()
+        time.sleep(0.03)
+        self.assertTrue(session.isUnlocked())
+        time.sleep(0.2)
+        self.assertEqual(session._key, bytearray())